@@ -1,3 +1,9 @@
-from app.build import build_app
+def __getattr__(name: str):
+    # Built on first access (`app:app`), so importing a submodule, as the
+    # export worker processes do, doesn't build the app and its clients
+    if name == "app":
+        from app.build import build_app
 
-app = build_app()
+        globals()["app"] = build_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
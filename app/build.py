@@ -4,23 +4,46 @@ App Builder
 
 import os
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.configs import config
+from app.models import JSONBytesResponse
 from app.routers import trips
 from app.routers import items
-from app.middleware import GlobalMiddleware
+from app.routers import exports
+from app.routers import places
+from app.routers import search
+from app.routers import metrics
+from app.middleware import GlobalMiddleware, MetricsMiddleware
+from app.utils import http, auth
+from app.services import trips as trips_service
+from app.services import exports as exports_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Mounted apps don't get lifespan events, so shared clients live here
+    await http.startup()
+    auth.check_config()
+    try:
+        yield
+    finally:
+        await exports_service.shutdown()
+        await http.shutdown()
+        trips_service.shutdown_exports()
 
 
 def build_app():
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     api = FastAPI(
         title=config.TITLE,
         version=config.SEM_VER,
         description=config.DESCRIPTION,
+        default_response_class=JSONBytesResponse,
     )
 
     api.add_middleware(
@@ -34,9 +57,16 @@ def build_app():
     # Global middleware
     api.add_middleware(GlobalMiddleware)
 
+    # Outermost, so requests GlobalMiddleware maps to 500s are counted too
+    api.add_middleware(MetricsMiddleware)
+
     # Include routes
     api.include_router(trips.router)
     api.include_router(items.router)
+    api.include_router(exports.router)
+    api.include_router(places.router)
+    api.include_router(search.router)
+    api.include_router(metrics.router)
 
     app.mount(f"/api/{config.SEM_VER}/", api)
 
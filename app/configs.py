@@ -26,6 +26,37 @@ class DBSchema:
         self.TRIP = "trip"
         self.TRIP_TRAVELER = "trip_traveler"
 
+        # Tables holding the type-specific half of an itinerary item, keyed
+        # by item_id
+        self.ITEM_SUBTYPES = (
+            self.LODGING,
+            self.TRAVEL_SEGMENT,
+            self.TRANSPORT_RENTAL,
+            self.EVENT_ACTIVITY,
+        )
+
+        # Readable columns per table, the allowlist for `fields=` projections
+        self.COLUMNS = {
+            self.TRIP: (
+                "id", "owner_user_id", "title", "description", "start_date",
+                "end_date", "home_currency", "time_zone", "notes",
+                "created_at", "updated_at"
+            ),
+            self.ITINERARY_ITEM: (
+                "id", "trip_id", "type", "name", "link", "cost_amount",
+                "cost_currency", "start_time", "end_time", "all_day",
+                "status", "notes", "created_at", "updated_at"
+            ),
+            self.BUDGET_ENTRY: (
+                "id", "trip_id", "item_id", "category", "amount", "currency",
+                "created_at"
+            ),
+            self.PLACE: (
+                "id", "name", "address", "lat", "lng", "time_zone",
+                "external_refs", "created_at", "updated_at"
+            ),
+        }
+
 
 class Config:
     """
@@ -42,6 +73,156 @@ class Config:
         self.DB_SCHEMA = DBSchema()
         self.LOGGER = 'uvicorn.error'
 
+        # Token verification: "local" checks JWTs in-process, "remote"
+        # asks Supabase Auth to introspect every token
+        self.AUTH_MODE = os.getenv("AUTH_MODE", "local")
+        self.SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+        self.JWT_AUDIENCE = os.getenv("JWT_AUDIENCE", "authenticated")
+        self.JWT_ISSUER = os.getenv(
+            "JWT_ISSUER",
+            f"{self.SUPABASE_URL}/auth/v1"
+        )
+        self.JWT_LEEWAY_SECONDS = int(os.getenv("JWT_LEEWAY_SECONDS", "30"))
+        self.JWKS_URL = os.getenv(
+            "JWKS_URL",
+            f"{self.SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+        )
+        self.JWKS_MAX_AGE_SECONDS = int(
+            os.getenv("JWKS_MAX_AGE_SECONDS", "600")
+        )
+        self.AUTH_CACHE_MAX_ENTRIES = int(
+            os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000")
+        )
+        self.AUTH_CACHE_TTL_SECONDS = int(
+            os.getenv("AUTH_CACHE_TTL_SECONDS", "300")
+        )
+        self.AUTH_NEGATIVE_TTL_SECONDS = int(
+            os.getenv("AUTH_NEGATIVE_TTL_SECONDS", "5")
+        )
+
+        # Shared outbound HTTP pool
+        self.HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.HTTP_MAX_CONNECTIONS_PER_HOST = int(
+            os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20")
+        )
+        self.HTTP_MAX_KEEPALIVE_CONNECTIONS = int(
+            os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")
+        )
+        self.HTTP_KEEPALIVE_EXPIRY_SECONDS = float(
+            os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30")
+        )
+        self.HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+        self.HTTP_CONNECT_TIMEOUT_SECONDS = float(
+            os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5")
+        )
+
+        # Keyset pagination of list endpoints
+        self.PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+        self.PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+        # Read-through trip cache
+        self.TRIP_CACHE_BACKEND = os.getenv("TRIP_CACHE_BACKEND", "memory")
+        self.TRIP_CACHE_MAX_ENTRIES = int(
+            os.getenv("TRIP_CACHE_MAX_ENTRIES", "5000")
+        )
+        self.TRIP_CACHE_TTL_SECONDS = int(
+            os.getenv("TRIP_CACHE_TTL_SECONDS", "60")
+        )
+
+        # Rendered export cache (bytes); spilling to disk is off unless a
+        # directory is given
+        self.EXPORT_CACHE_MAX_BYTES = int(
+            os.getenv("EXPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+        )
+        self.EXPORT_CACHE_MAX_ENTRY_BYTES = int(
+            os.getenv("EXPORT_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024))
+        )
+        self.EXPORT_CACHE_SPILL_DIR = os.getenv("EXPORT_CACHE_SPILL_DIR")
+        self.EXPORT_CACHE_SPILL_MAX_BYTES = int(
+            os.getenv("EXPORT_CACHE_SPILL_MAX_BYTES", str(512 * 1024 * 1024))
+        )
+        # Bytes of a streamed export held in memory for the cache; beyond
+        # that it is written through to the spill directory, if any
+        self.EXPORT_CACHE_STREAM_BUFFER_BYTES = int(
+            os.getenv("EXPORT_CACHE_STREAM_BUFFER_BYTES", str(64 * 1024))
+        )
+
+        # Worker processes for CPU-bound export renders (0 = one per core)
+        # and how many trips a batch export renders at once
+        self.EXPORT_PROCESSES = int(os.getenv("EXPORT_PROCESSES", "0"))
+        self.EXPORT_BATCH_CONCURRENCY = int(
+            os.getenv("EXPORT_BATCH_CONCURRENCY", "8")
+        )
+        self.EXPORT_BATCH_MAX_TRIPS = int(
+            os.getenv("EXPORT_BATCH_MAX_TRIPS", "100")
+        )
+
+        # Background export jobs: worker tasks, queued jobs accepted before
+        # new ones are refused, and how long finished results are kept
+        self.EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "4"))
+        self.EXPORT_JOB_MAX_PENDING = int(
+            os.getenv("EXPORT_JOB_MAX_PENDING", "100")
+        )
+        self.EXPORT_JOB_TTL_SECONDS = int(
+            os.getenv("EXPORT_JOB_TTL_SECONDS", "900")
+        )
+        # Finished jobs and bytes of results kept; the oldest go first
+        self.EXPORT_JOB_MAX_FINISHED = int(
+            os.getenv("EXPORT_JOB_MAX_FINISHED", "500")
+        )
+        self.EXPORT_JOB_MAX_RESULT_BYTES = int(
+            os.getenv("EXPORT_JOB_MAX_RESULT_BYTES", str(64 * 1024 * 1024))
+        )
+
+        # Bulk item creation: rows accepted per request and rows per insert
+        self.ITEM_BATCH_MAX_SIZE = int(os.getenv("ITEM_BATCH_MAX_SIZE", "500"))
+        self.ITEM_BATCH_CHUNK_SIZE = int(
+            os.getenv("ITEM_BATCH_CHUNK_SIZE", "100")
+        )
+
+        # FX rates for budget rollups: a JSON file of
+        # {"base": "USD", "as_of": ..., "rates": {"EUR": 0.92, ...}},
+        # re-read when it changes, at most every FX_RATES_TTL_SECONDS
+        self.FX_RATES_FILE = os.getenv("FX_RATES_FILE")
+        self.FX_RATES_TTL_SECONDS = int(os.getenv("FX_RATES_TTL_SECONDS", "300"))
+
+        # Longest from/to window of a bucketed itinerary query, in days
+        self.ITINERARY_RANGE_MAX_DAYS = int(
+            os.getenv("ITINERARY_RANGE_MAX_DAYS", "366")
+        )
+
+        # Per-trip conflict indexes kept between requests
+        self.CONFLICT_INDEX_MAX_ENTRIES = int(
+            os.getenv("CONFLICT_INDEX_MAX_ENTRIES", "1000")
+        )
+        self.CONFLICT_INDEX_TTL_SECONDS = int(
+            os.getenv("CONFLICT_INDEX_TTL_SECONDS", "600")
+        )
+
+        # Most keys a request-scoped loader puts in one in() filter
+        self.LOADER_MAX_BATCH = int(os.getenv("LOADER_MAX_BATCH", "200"))
+
+        # In-memory place catalog: grid cell size, how often changed rows
+        # are pulled in, and how often it is reloaded to drop deleted rows
+        self.PLACE_GRID_DEGREES = float(os.getenv("PLACE_GRID_DEGREES", "0.02"))
+        self.PLACE_CATALOG_REFRESH_SECONDS = int(
+            os.getenv("PLACE_CATALOG_REFRESH_SECONDS", "30")
+        )
+        self.PLACE_CATALOG_FULL_REFRESH_SECONDS = int(
+            os.getenv("PLACE_CATALOG_FULL_REFRESH_SECONDS", "3600")
+        )
+        # Rows per page when (re)loading it, independent of API page sizes
+        self.PLACE_CATALOG_FETCH_BATCH = int(
+            os.getenv("PLACE_CATALOG_FETCH_BATCH", "1000")
+        )
+
+        # Search: most results per query, most words taken from a query
+        self.SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "50"))
+        self.SEARCH_MAX_TERMS = int(os.getenv("SEARCH_MAX_TERMS", "8"))
+
+        # Threads available for blocking database round trips
+        self.DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "16"))
+
         self.ALLOWED_ORIGINS = os.getenv(
             "ALLOWED_ORIGINS",
             "http://localhost,http://localhost:8080"
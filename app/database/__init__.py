@@ -1 +1 @@
-from .core import client
\ No newline at end of file
+from .core import client, execute
@@ -2,12 +2,45 @@
 Service Dependencies
 """
 
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from supabase import create_client
 
 from app.configs import config
+from app.utils import timing
 
 
 client = create_client(
     config.SUPABASE_URL,
     config.SUPABASE_SERVICE_KEY
 )
+
+# The supabase client is synchronous, so every round trip runs on this
+# bounded pool instead of the event loop
+executor = ThreadPoolExecutor(
+    max_workers=config.DB_MAX_WORKERS,
+    thread_name_prefix="db"
+)
+
+
+async def execute(query):
+    """
+    Run a built query on the db executor and await its response
+    """
+    loop = asyncio.get_running_loop()
+    timings = timing.current()
+    if timings is None:
+        return await loop.run_in_executor(executor, query.execute)
+
+    start = time.perf_counter()
+    response = await loop.run_in_executor(executor, query.execute)
+    data = getattr(response, "data", None)
+    timings.record_query(
+        getattr(query, "path", "?").lstrip("/"),
+        getattr(query, "http_method", "?"),
+        time.perf_counter() - start,
+        len(data) if isinstance(data, list) else int(data is not None)
+    )
+    return response
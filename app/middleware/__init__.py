@@ -1 +1,2 @@
-from .global_mw import GlobalMiddleware 
\ No newline at end of file
+from .global_mw import GlobalMiddleware
+from .metrics_mw import MetricsMiddleware
@@ -4,34 +4,89 @@ Global Middleware
 
 import time
 import logging
-from fastapi import Request, Response, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException
+from starlette.datastructures import URL, MutableHeaders
 from starlette.responses import JSONResponse
 
+from app.utils import timing, loader
 
-class GlobalMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        logging.info(f"➡️ Request: {request.method} {request.url}")
+
+class _LazyURL:
+    """
+    Request URL rendered only if the log record is actually emitted
+    """
+    __slots__ = ("scope",)
+
+    def __init__(self, scope):
+        self.scope = scope
+
+    def __str__(self):
+        return str(URL(scope=self.scope))
+
+
+class GlobalMiddleware:
+    """
+    Error mapping, X-Process-Time / Server-Timing and access logging as a
+    raw ASGI app, so response bodies (including streamed ones) pass through
+    untouched. The headers carry the timings up to the response start; the
+    log is written once the last body chunk is sent, so a streamed body's
+    queries and rendering are in it
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with timing.request_scope() as timings, loader.request_scope():
+            await self._handle(scope, receive, send, timings)
+
+    async def _handle(self, scope, receive, send, timings):
+        start_time = time.perf_counter()
+        logging.info("➡️ Request: %s %s", scope["method"], _LazyURL(scope))
+
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{process_time:.3f}")
+                headers.append(
+                    "Server-Timing", timings.server_timing(process_time)
+                )
+            await send(message)
+            if message["type"] == "http.response.body" \
+                    and not message.get("more_body", False) \
+                    and logging.root.isEnabledFor(logging.INFO):
+                logging.info(
+                    "⬅️ Response status: %s (%.3fs)",
+                    status_code,
+                    time.perf_counter() - start_time,
+                    extra={"timings": timings.as_dict()}
+                )
 
         try:
-            response: Response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except HTTPException as e:
-            return JSONResponse(
+            if status_code is not None:
+                raise
+            response = JSONResponse(
                 status_code=e.status_code,
                 content={"detail": e.detail}
             )
+            await response(scope, receive, send)
         except Exception:
             logging.exception("Unhandled error")
-            return JSONResponse(
+            if status_code is not None:
+                raise
+            response = JSONResponse(
                 status_code=500,
                 content={"detail": "Internal Server Error"}
             )
-
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = f"{process_time:.3f}"
-        logging.info(
-            f"⬅️ Response status: {response.status_code} ({process_time:.3f}s)"
-        )
-
-        return response
+            await response(scope, receive, send)
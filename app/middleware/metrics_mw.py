@@ -0,0 +1,44 @@
+"""
+Metrics Middleware
+"""
+
+import time
+
+from app.utils.metrics import request_metrics
+
+
+class MetricsMiddleware:
+    """
+    Records per-route request counts, latency and in-flight requests.
+    Routes are labelled by their template (/trips/{id}), never the raw URL
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        request_metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_metrics.in_flight -= 1
+            route = scope.get("route")
+            request_metrics.observe(
+                scope["method"],
+                route.path if route is not None else "<unmatched>",
+                status_code,
+                time.perf_counter() - start_time
+            )
@@ -0,0 +1,4 @@
+from app.models.base import Model, JSONBytesResponse
+from app.models.trips import TripCreate, TripUpdate, Trip, TripPage, TripBundle
+from app.models.items import ItineraryItemCreate, ItineraryItem
+from app.models.budget import BudgetEntryCreate, BudgetEntry
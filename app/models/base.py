@@ -0,0 +1,94 @@
+"""
+Model Base
+"""
+
+import math
+from typing import Annotated
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, ValidationError
+from pydantic_core import to_json
+from fastapi.responses import JSONResponse
+
+
+class Model(BaseModel):
+    """
+    Base of the API models. Validation runs in pydantic-core's compiled
+    validators; unknown keys are dropped rather than rejected
+    """
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    @classmethod
+    def parse(cls, data):
+        """
+        Validate a JSON body (bytes / str) or an already decoded object,
+        ValueError with one line per problem if it is invalid. Instances
+        of the model are returned as they are
+        """
+        try:
+            if isinstance(data, (bytes, bytearray, str)):
+                return cls.model_validate_json(data)
+            return cls.model_validate(data)
+        except ValidationError as e:
+            raise ValueError(error_message(e))
+
+    def row(self, **extra) -> dict:
+        """
+        JSON-ready dict of the fields that were set or have defaults
+        """
+        return {**self.model_dump(mode="json"), **extra}
+
+
+def error_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'body'}: {_message(e)}"
+        for e in error.errors(include_url=False)
+    )
+
+
+def _message(error: dict) -> str:
+    # Our own validators' messages, without pydantic's "Value error, "
+    if error["type"] == "value_error":
+        return str(error["ctx"]["error"])
+    return error["msg"]
+
+
+def _number(value):
+    # bool is an int, and numeric strings would be coerced otherwise
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError("must be a number")
+    # NaN / Infinity parse from JSON but can't be sent on to PostgREST
+    if not math.isfinite(value):
+        raise ValueError("must be a finite number")
+    return value
+
+
+def _currency(value):
+    if not isinstance(value, str) or len(value.strip()) != 3 \
+            or not value.strip().isalpha():
+        raise ValueError("must be a 3-letter currency code")
+    return value.strip().upper()
+
+
+def _time_zone(value):
+    try:
+        ZoneInfo(value)
+    except (TypeError, ValueError, ZoneInfoNotFoundError):
+        raise ValueError("must be an IANA time zone name")
+    return value
+
+
+Number = Annotated[float, BeforeValidator(_number)]
+Currency = Annotated[str, BeforeValidator(_currency)]
+TimeZone = Annotated[str, BeforeValidator(_time_zone)]
+
+
+class JSONBytesResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core straight to bytes instead of
+    json.dumps and an encode. NaN and infinities, which JSON can't carry,
+    are written as null
+    """
+
+    def render(self, content) -> bytes:
+        return to_json(content, inf_nan_mode="null")
@@ -0,0 +1,29 @@
+"""
+Budget Models
+"""
+
+from typing import Optional
+
+from pydantic import Field
+
+from app.models.base import Model, Number, Currency
+
+
+class BudgetEntryCreate(Model):
+    """
+    Body of a budget entry insert
+    """
+    item_id: Optional[str] = None
+    category: str = Field(min_length=1)
+    amount: Number
+    currency: Currency
+
+
+class BudgetEntry(Model):
+    id: Optional[str] = None
+    trip_id: Optional[str] = None
+    item_id: Optional[str] = None
+    category: Optional[str] = None
+    amount: Optional[float] = None
+    currency: Optional[str] = None
+    created_at: Optional[str] = None
@@ -0,0 +1,88 @@
+"""
+Itinerary Item Models
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import Field, model_validator
+
+from app.models.base import Model, Number, Currency
+
+
+class ItineraryItemCreate(Model):
+    """
+    Body of an itinerary item insert, optionally carrying one subtype
+    payload (keyed by its table name) to be written with it
+    """
+    type: str = Field(min_length=1)
+    name: Optional[str] = None
+    link: Optional[str] = None
+    cost_amount: Optional[Number] = None
+    cost_currency: Optional[Currency] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    all_day: bool = False
+    status: str = "planned"
+    notes: Optional[str] = None
+
+    lodging: Optional[dict] = None
+    travel_segment: Optional[dict] = None
+    transport_rental: Optional[dict] = None
+    event_activity: Optional[dict] = None
+
+    @model_validator(mode="after")
+    def _times_in_order(self):
+        if self.start_time and self.end_time:
+            try:
+                backwards = self.end_time < self.start_time
+            except TypeError:
+                raise ValueError(
+                    "start_time and end_time must both carry a time zone or neither"
+                )
+            if backwards:
+                raise ValueError("end_time is before start_time")
+        return self
+
+    def row(self, **extra) -> dict:
+        """
+        The itinerary_item columns, without any subtype payload
+        """
+        return {
+            **self.model_dump(mode="json", include=_ITEM_FIELDS),
+            **extra
+        }
+
+
+_ITEM_FIELDS = frozenset((
+    "type", "name", "link", "cost_amount", "cost_currency", "start_time",
+    "end_time", "all_day", "status", "notes"
+))
+
+
+class ItineraryItem(Model):
+    """
+    An itinerary item row; every field is optional since `fields=` may
+    project any of them away
+    """
+    id: Optional[str] = None
+    trip_id: Optional[str] = None
+    type: Optional[str] = None
+    name: Optional[str] = None
+    link: Optional[str] = None
+    cost_amount: Optional[float] = None
+    cost_currency: Optional[str] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    all_day: Optional[bool] = None
+    status: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    # Subtype rows, with their places, when they are embedded
+    lodging: Optional[dict] = None
+    travel_segment: Optional[dict] = None
+    transport_rental: Optional[dict] = None
+    event_activity: Optional[dict] = None
+
@@ -0,0 +1,79 @@
+"""
+Trip Models
+"""
+
+from datetime import date
+from typing import Optional
+
+from pydantic import Field, model_validator
+
+from app.models.base import Model, Currency, TimeZone
+from app.models.items import ItineraryItem
+from app.models.budget import BudgetEntry
+
+
+class TripCreate(Model):
+    """
+    Body of a trip insert
+    """
+    title: str = Field(min_length=1)
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    home_currency: Optional[Currency] = None
+    time_zone: Optional[TimeZone] = None
+    notes: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _dates_in_order(self):
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValueError("end_date is before start_date")
+        return self
+
+
+class TripUpdate(Model):
+    """
+    Body of a trip update; fields left out (or null) are not changed
+    """
+    title: Optional[str] = Field(None, min_length=1)
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    home_currency: Optional[Currency] = None
+    time_zone: Optional[TimeZone] = None
+    notes: Optional[str] = None
+
+    def changes(self) -> dict:
+        return self.model_dump(mode="json", exclude_none=True)
+
+
+class Trip(Model):
+    """
+    A trip row; every field is optional since `fields=` may project any
+    of them away
+    """
+    id: Optional[str] = None
+    owner_user_id: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    home_currency: Optional[str] = None
+    time_zone: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+class TripPage(Model):
+    items: list[Trip]
+    next_cursor: Optional[str] = None
+
+
+class TripBundle(Trip):
+    """
+    A trip with the related rows named in `include`
+    """
+    itinerary: Optional[list[ItineraryItem]] = None
+    budget: Optional[list[BudgetEntry]] = None
+    documents: Optional[list[dict]] = None
@@ -0,0 +1,49 @@
+"""
+Exports Router
+"""
+
+from fastapi import APIRouter, Request, Response, HTTPException, Depends
+
+import app.utils.auth as auth
+import app.services.exports as exports
+
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["Exports"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+@router.get("/{job_id}")
+async def get_export_job(
+    job_id: str,
+    request: Request,
+    user_id: str = Depends(auth.resolve_user_id)
+):
+    """
+    Status of a background export job (w)
+    """
+    res = exports.get_export_job(job_id, user_id)
+    if not res:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return {
+        **res,
+        "download_url": str(request.url_for("download_export", job_id=job_id))
+    }
+
+
+@router.get("/{job_id}/download")
+async def download_export(
+    job_id: str,
+    user_id: str = Depends(auth.resolve_user_id)
+):
+    """
+    Result of a finished export job, 409 until it is done (w)
+    """
+    res = exports.get_export_result(job_id, user_id)
+    if not res:
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    body, media_type = res
+    return Response(body, media_type=media_type)
@@ -2,9 +2,11 @@
 Trip Items Router
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 
+import app.utils.auth as auth
 import app.services.items as items
+import app.services.trips as trips
 
 
 router = APIRouter(
@@ -14,11 +16,29 @@ router = APIRouter(
 )
 
 
+async def _check_owner(trip_id, user_id: str):
+    # 404 rather than 403 so other users' item ids don't leak
+    if not trip_id or not await trips.get_owned_trip(trip_id, user_id):
+        raise HTTPException(status_code=404, detail="Item not found")
+
+
+@router.get("/{item_id}")
+async def get_item(item_id: str, user_id: str = Depends(auth.resolve_user_id)):
+    """
+    Get an item by ID, with its subtype details (w)
+    """
+    res = await items.get_itinerary_item(item_id)
+    await _check_owner(res and res.get("trip_id"), user_id)
+    return res
+
+
 @router.patch("/{item_id}")
-async def update_item(item_id: str):
+async def update_item(item_id: str, user_id: str = Depends(auth.resolve_user_id)):
     """
     Update an item by ID
     """
+    await _check_owner(await items.get_item_trip_id(item_id), user_id)
+
     try:
         res = await items.update_item(item_id)
         return res
@@ -27,10 +47,12 @@ async def update_item(item_id: str):
 
 
 @router.post("/{item_id}/tickets")
-async def add_ticket_link(item_id: str):
+async def add_ticket_link(item_id: str, user_id: str = Depends(auth.resolve_user_id)):
     """
     Add ticket link to an item
     """
+    await _check_owner(await items.get_item_trip_id(item_id), user_id)
+
     try:
         res = await items.add_ticket_link(item_id)
         return res
@@ -39,10 +61,12 @@ async def add_ticket_link(item_id: str):
 
 
 @router.post("/{item_id}/attachments")
-async def add_attachment(item_id: str):
+async def add_attachment(item_id: str, user_id: str = Depends(auth.resolve_user_id)):
     """
     Add attachment to an item
     """
+    await _check_owner(await items.get_item_trip_id(item_id), user_id)
+
     try:
         res = await items.add_attachment(item_id)
         return res
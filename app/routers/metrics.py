@@ -0,0 +1,53 @@
+"""
+Metrics Router
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import app.utils.auth as auth
+import app.services.trips as trips
+import app.services.exports as exports
+import app.services.places as places
+from app.utils.metrics import request_metrics, stats_metrics
+
+
+router = APIRouter(
+    tags=["Metrics"],
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Request metrics in Prometheus text format
+    """
+    return PlainTextResponse(
+        request_metrics.render()
+        + stats_metrics(
+            "atlas_auth_token_cache",
+            "Token to user cache",
+            auth.token_cache_stats()
+        )
+        + stats_metrics(
+            "atlas_trip_cache",
+            "Read-through trip cache",
+            trips.cache_stats()
+        )
+        + stats_metrics(
+            "atlas_export_cache",
+            "Rendered export cache",
+            trips.export_cache_stats()
+        )
+        + stats_metrics(
+            "atlas_export_jobs",
+            "Background export jobs",
+            exports.job_stats()
+        )
+        + stats_metrics(
+            "atlas_place_catalog",
+            "In-memory place catalog",
+            places.catalog_stats()
+        ),
+        media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,70 @@
+"""
+Places Router
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+
+import app.utils.auth as auth
+import app.services.places as places
+from app.utils.projection import parse_fields
+
+
+router = APIRouter(
+    prefix="/places",
+    tags=["Places"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+@router.get("/near")
+async def get_places_near(
+    lat: float,
+    lng: float,
+    radius_km: float = Query(5, gt=0, le=500),
+    limit: int = Query(20, ge=1, le=200),
+    user_id: str = Depends(auth.resolve_user_id)
+):
+    """
+    Places within `radius_km` of a point, closest first (w)
+    """
+    try:
+        return await places.places_near(lat, lng, radius_km, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/suggest")
+async def suggest_places(
+    lat: float,
+    lng: float,
+    k: int = Query(5, ge=1, le=50),
+    user_id: str = Depends(auth.resolve_user_id)
+):
+    """
+    The closest places to a point, for picking one when adding lodging
+    or an event (w)
+    """
+    try:
+        return await places.suggest_places(lat, lng, k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/distances")
+async def get_distances(
+    lat: float,
+    lng: float,
+    ids: str,
+    user_id: str = Depends(auth.resolve_user_id)
+):
+    """
+    Distance in km from a point to each place in the comma separated
+    `ids` (w)
+    """
+    place_ids = parse_fields(ids)
+    if len(place_ids) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 ids")
+    try:
+        return await places.distances_km(lat, lng, place_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
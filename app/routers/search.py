@@ -0,0 +1,31 @@
+"""
+Search Router
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+
+import app.utils.auth as auth
+import app.services.search as search
+from app.configs import config
+
+
+router = APIRouter(
+    tags=["Search"],
+)
+
+
+@router.get("/search")
+async def search_trips(
+    q: str,
+    limit: int = Query(20, ge=1, le=config.SEARCH_MAX_RESULTS),
+    user_id: str = Depends(auth.resolve_user_id)
+):
+    """
+    Search the user's trips (title, notes) and itinerary items (name,
+    notes, link); every word matches as a prefix, best matches first (w)
+    """
+    try:
+        results = await search.search(user_id, q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"query": q, "results": results}
@@ -0,0 +1,24 @@
+"""
+Conflict indexes kept between requests
+"""
+
+from app.configs import config
+from app.utils.cache import TTLCache
+
+
+conflict_indexes = TTLCache(
+    max_entries=config.CONFLICT_INDEX_MAX_ENTRIES,
+    ttl=config.CONFLICT_INDEX_TTL_SECONDS
+)
+
+
+def add_created_items(trip_id: str, rows: list):
+    """
+    Index items just inserted into the trip, if its index is kept, so the
+    next conflict check doesn't have to fetch them
+    """
+    index = conflict_indexes.get(trip_id)
+    if index is None:
+        return
+    for row in rows:
+        index.add(row)
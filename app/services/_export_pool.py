@@ -0,0 +1,53 @@
+"""
+Process pool for export renders
+"""
+
+import os
+import asyncio
+import multiprocessing
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+
+from app.configs import config
+from app.services._trips_formatting import render_export
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _start_method() -> str:
+    # Workers must not be forked from the running server: a fork copies the
+    # event loop, the Supabase client's sockets and any lock another thread
+    # held at the time. forkserver forks from a clean helper process; spawn
+    # where it isn't available
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Created on first use so imports (and the Streamlit app) don't start
+    # worker processes
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=config.EXPORT_PROCESSES or os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context(_start_method()),
+        )
+    return _pool
+
+
+async def render(trip_details: dict, itinerary: list, type: str) -> bytes:
+    """
+    Render an export in a worker process, off the event loop and the GIL
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_pool(), render_export, trip_details, itinerary, type
+    )
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,261 @@
+"""
+Rendered export cache
+"""
+
+import os
+import uuid
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from app.configs import config
+
+
+class _ExportCache:
+    """
+    Rendered exports keyed by (trip_id, format), each tagged with the
+    content version it was rendered from. Memory is bounded by a byte
+    budget with LRU eviction; evicted renders spill to `spill_dir` (if
+    set) under a second budget before being dropped for good. Streamed
+    renders are kept through writer(), which holds at most
+    `stream_buffer_bytes` of each in memory
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_entry_bytes: int,
+        spill_dir: Optional[str] = None,
+        spill_max_bytes: int = 0,
+        stream_buffer_bytes: int = 0
+    ):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self.stream_buffer_bytes = stream_buffer_bytes
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._spilled = OrderedDict()
+        self._spilled_bytes = 0
+
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    async def get(self, trip_id: str, type: str, version: str) -> Optional[bytes]:
+        key = (trip_id, type)
+
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] == version:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        spilled = self._spilled.get(key)
+        if spilled is not None and spilled[0] == version:
+            try:
+                body = await asyncio.to_thread(_read, spilled[1])
+            except OSError:
+                self._drop_spilled(key)
+            else:
+                self.spill_hits += 1
+                await self.put(trip_id, type, version, body)
+                return body
+
+        self.misses += 1
+        return None
+
+    async def put(self, trip_id: str, type: str, version: str, body: bytes):
+        if len(body) > self.max_entry_bytes:
+            return
+
+        key = (trip_id, type)
+        self._drop_memory(key)
+        self._drop_spilled(key)
+
+        self._memory[key] = (version, body)
+        self._memory_bytes += len(body)
+
+        while self._memory_bytes > self.max_bytes:
+            old_key, (old_version, old_body) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_body)
+            self.evictions += 1
+            if self.spill_dir:
+                await self._spill(old_key, old_version, old_body)
+
+    def _spill_path(self, key: tuple) -> str:
+        name = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.spill_dir, name)
+
+    async def _spill(self, key: tuple, version: str, body: bytes):
+        path = self._spill_path(key)
+        try:
+            await asyncio.to_thread(_write, path, body)
+        except OSError:
+            logging.exception("Failed to spill export to %s", path)
+            return
+        self._add_spilled(key, version, path, len(body))
+
+    def _add_spilled(self, key: tuple, version: str, path: str, size: int):
+        self._spilled[key] = (version, path, size)
+        self._spilled_bytes += size
+        while self._spilled_bytes > self.spill_max_bytes:
+            self._drop_spilled(next(iter(self._spilled)))
+
+    def writer(self, trip_id: str, type: str, version: str) -> "_EntryWriter":
+        """
+        Incremental put() for a render that is being streamed
+        """
+        return _EntryWriter(self, (trip_id, type), version)
+
+    async def _adopt(self, key: tuple, version: str, part: str, size: int):
+        # A streamed render written through to `part` becomes the spilled
+        # entry for the key
+        self._drop_memory(key)
+        self._drop_spilled(key)
+        path = self._spill_path(key)
+        try:
+            await asyncio.to_thread(os.replace, part, path)
+        except OSError:
+            logging.exception("Failed to spill export to %s", path)
+            return
+        self._add_spilled(key, version, path, size)
+
+    def _drop_memory(self, key: tuple):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+
+    def _drop_spilled(self, key: tuple):
+        entry = self._spilled.pop(key, None)
+        if entry is None:
+            return
+        self._spilled_bytes -= entry[2]
+        try:
+            os.remove(entry[1])
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._memory),
+            "bytes": self._memory_bytes,
+            "max_bytes": self.max_bytes,
+            "spilled_entries": len(self._spilled),
+            "spilled_bytes": self._spilled_bytes,
+            "hits": self.hits,
+            "spill_hits": self.spill_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class _EntryWriter:
+    """
+    Collects one streamed render for the cache. Chunks are buffered up to
+    the cache's `stream_buffer_bytes`; past that they are appended to a
+    spill file, or the copy is abandoned when the cache doesn't spill or
+    the render outgrows the spill budget
+    """
+
+    def __init__(self, cache: _ExportCache, key: tuple, version: str):
+        self._cache = cache
+        self._key = key
+        self._version = version
+        self._chunks = []
+        self._buffered = 0
+        self._size = 0
+        self._part = None
+        self._done = False
+
+    async def write(self, data: bytes):
+        if self._done:
+            return
+        self._chunks.append(data)
+        self._buffered += len(data)
+        self._size += len(data)
+        if self._buffered > self._cache.stream_buffer_bytes:
+            if not self._cache.spill_dir \
+                    or self._size > self._cache.spill_max_bytes:
+                await self.discard()
+            else:
+                await self._flush()
+
+    async def _flush(self):
+        if self._part is None:
+            self._part = os.path.join(
+                self._cache.spill_dir, f"{uuid.uuid4().hex}.part"
+            )
+        data, self._chunks, self._buffered = b"".join(self._chunks), [], 0
+        try:
+            await asyncio.to_thread(_append, self._part, data)
+        except OSError:
+            logging.exception("Failed to spill export to %s", self._part)
+            await self.discard()
+
+    async def commit(self):
+        """
+        Store the complete render
+        """
+        if self._done:
+            return
+        if self._part is None:
+            self._done = True
+            await self._cache.put(
+                *self._key, self._version, b"".join(self._chunks)
+            )
+            self._chunks = []
+            return
+
+        await self._flush()
+        if not self._done:
+            self._done = True
+            await self._cache._adopt(
+                self._key, self._version, self._part, self._size
+            )
+
+    async def discard(self):
+        """
+        Drop whatever was kept; a no-op after commit()
+        """
+        if self._done:
+            return
+        self._done = True
+        self._chunks = []
+        if self._part is not None:
+            try:
+                await asyncio.to_thread(os.remove, self._part)
+            except OSError:
+                pass
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write(path: str, body: bytes):
+    with open(path, "wb") as f:
+        f.write(body)
+
+
+def _append(path: str, body: bytes):
+    with open(path, "ab") as f:
+        f.write(body)
+
+
+export_cache = _ExportCache(
+    max_bytes=config.EXPORT_CACHE_MAX_BYTES,
+    max_entry_bytes=config.EXPORT_CACHE_MAX_ENTRY_BYTES,
+    spill_dir=config.EXPORT_CACHE_SPILL_DIR,
+    spill_max_bytes=config.EXPORT_CACHE_SPILL_MAX_BYTES,
+    stream_buffer_bytes=config.EXPORT_CACHE_STREAM_BUFFER_BYTES
+)
@@ -0,0 +1,99 @@
+"""
+FX rate table for budget conversions
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Optional
+
+from app.configs import config
+
+
+class _FXRates:
+    """
+    Rates relative to one base currency, loaded from a local JSON file and
+    cached; the file is checked for changes at most every `ttl` seconds,
+    whether or not the last check succeeded, and a missing or bad file
+    keeps the last good table
+    """
+
+    def __init__(self, path: Optional[str], ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._rates = {}
+        self._as_of = None
+        self._mtime = None
+        self._checked_at = None
+
+    def _due(self) -> bool:
+        return bool(self.path) and (
+            self._checked_at is None
+            or time.monotonic() - self._checked_at >= self.ttl
+        )
+
+    def _refresh(self):
+        if not self._due():
+            return
+        self._checked_at = time.monotonic()
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return
+            with open(self.path) as f:
+                table = json.load(f)
+            rates = {
+                currency.upper(): float(rate)
+                for currency, rate in table["rates"].items()
+                if float(rate) > 0
+            }
+            rates[table["base"].upper()] = 1.0
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            logging.exception("Failed to load FX rates from %s", self.path)
+            return
+
+        self._rates, self._as_of, self._mtime = rates, table.get("as_of"), mtime
+
+    def snapshot(self) -> tuple:
+        """
+        (rates, as_of) of the current table, for a run of conversions
+        """
+        self._refresh()
+        return self._rates, self._as_of
+
+    async def snapshot_async(self) -> tuple:
+        """
+        snapshot() with the file check, a stat and a read when the file
+        changed, run off the event loop when one is due
+        """
+        if self._due():
+            await asyncio.to_thread(self._refresh)
+        return self._rates, self._as_of
+
+    def table(self) -> dict:
+        return self.snapshot()[0]
+
+    @property
+    def as_of(self):
+        return self.snapshot()[1]
+
+    def factor(self, source: str, target: str) -> Optional[float]:
+        return factor(self.table(), source, target)
+
+
+def factor(rates: dict, source: str, target: str) -> Optional[float]:
+    """
+    Multiplier taking `source` amounts to `target`, None if either
+    currency is missing from `rates`
+    """
+    if source == target:
+        return 1.0
+    if source not in rates or target not in rates:
+        return None
+    return rates[target] / rates[source]
+
+
+fx_rates = _FXRates(config.FX_RATES_FILE, config.FX_RATES_TTL_SECONDS)
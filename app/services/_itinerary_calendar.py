@@ -0,0 +1,145 @@
+"""
+Calendar arithmetic for itinerary queries
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+BUCKETS = ("day", "week")
+
+
+def trip_zone(time_zone: Optional[str]):
+    """
+    The trip's time zone, UTC if it has none or an unknown one
+    """
+    try:
+        return ZoneInfo(time_zone or "UTC")
+    except (ValueError, ZoneInfoNotFoundError):
+        return timezone.utc
+
+
+def parse_day(value: Optional[str], name: str) -> Optional[date]:
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def parse_time(value) -> Optional[datetime]:
+    """
+    Timestamp of an item field, naive values taken as UTC
+    """
+    if not value:
+        return None
+    moment = datetime.fromisoformat(str(value))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def local_midnight(day: date, zone) -> datetime:
+    return datetime.combine(day, time(), tzinfo=zone).astimezone(timezone.utc)
+
+
+def utc_stamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def item_days(item: dict, zone):
+    """
+    First and last calendar day (inclusive) an item occupies, or None if it
+    is unscheduled. All-day items are stored at midnight UTC of their dates,
+    so they keep those dates whatever the trip's zone; timed items are
+    placed in the trip's zone, and an end at exactly midnight does not
+    spill into the next day
+    """
+    start = parse_time(item.get("start_time"))
+    if start is None:
+        return None
+    end = parse_time(item.get("end_time"))
+
+    if item.get("all_day"):
+        first = start.astimezone(timezone.utc).date()
+        last = end.astimezone(timezone.utc).date() if end else first
+        return first, max(first, last)
+
+    first = start.astimezone(zone).date()
+    if end is None or end <= start:
+        return first, first
+
+    local_end = end.astimezone(zone)
+    last = local_end.date()
+    if local_end.time() == time() and last > first:
+        last -= timedelta(days=1)
+    return first, last
+
+
+def overlaps(item: dict, zone, first: Optional[date], last: Optional[date]) -> bool:
+    """
+    Whether a scheduled item touches any day of [first, last]
+    """
+    days = item_days(item, zone)
+    if days is None:
+        return False
+    return (first is None or days[1] >= first) and (last is None or days[0] <= last)
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    # Weeks start on Monday, as in ISO 8601
+    return day - timedelta(days=day.weekday()) if bucket == "week" else day
+
+
+def bucket_items(
+    items: list,
+    zone,
+    bucket: str,
+    first: Optional[date] = None,
+    last: Optional[date] = None
+) -> dict:
+    """
+    Items grouped into day or week buckets over [first, last]. An item
+    spanning several days is listed in every bucket it touches. With both
+    bounds, empty buckets are kept so calendars get every slot; items
+    outside the bounds are dropped
+    """
+    step = timedelta(days=7 if bucket == "week" else 1)
+    buckets, unscheduled = {}, []
+
+    for item in items:
+        days = item_days(item, zone)
+        if days is None:
+            unscheduled.append(item)
+            continue
+
+        start, end = days
+        if first is not None:
+            start = max(start, first)
+        if last is not None:
+            end = min(end, last)
+        if start > end:
+            continue
+
+        key = bucket_start(start, bucket)
+        while key <= end:
+            buckets.setdefault(key, []).append(item)
+            key += step
+
+    if first is not None and last is not None:
+        key = bucket_start(first, bucket)
+        while key <= last:
+            buckets.setdefault(key, [])
+            key += step
+
+    return {
+        "buckets": [
+            {
+                "start": key.isoformat(),
+                "end": (key + step - timedelta(days=1)).isoformat(),
+                "items": buckets[key],
+            }
+            for key in sorted(buckets)
+        ],
+        "unscheduled": unscheduled,
+    }
@@ -0,0 +1,257 @@
+"""
+Interval index for itinerary conflicts
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+
+from app.services import _itinerary_calendar as calendar
+
+
+# Stays and rentals run alongside everything else, so their spans only
+# clash with their own kind (lodging is compared by nights). Their start
+# and end are moments someone has to be there, though: a timed item
+# running across a check-in, check-out, pickup or drop-off clashes
+_LODGING = "lodging"
+_RENTAL = "transport_rental"
+_MOMENTS = {
+    _LODGING: ("check_in", "check_out"),
+    _RENTAL: ("pickup", "dropoff"),
+}
+_MOMENT_LABELS = {label for labels in _MOMENTS.values() for label in labels}
+
+
+class ConflictIndex:
+    """
+    A trip's items as intervals, one sorted list per group. The initial
+    build is a sweep over start-sorted intervals with a heap of running
+    ends, O(n log n + k) for k overlaps. Later items are added one at a
+    time: an interval can only overlap those starting within the group's
+    longest duration before it, so each add is a bisect plus a short scan
+    instead of a pass over every item. Timed stays and rentals also put
+    their start and end instants in a sorted list, each checked against
+    the timed intervals the same way
+    """
+
+    def __init__(self, zone, items: list = ()):
+        self.zone = zone
+        self.items = {}
+        self.versions = {}
+        self._groups = {}
+        self._longest = {}
+        self._conflicts = {}
+        self._moments = []
+
+        intervals = {}
+        for item in items:
+            interval = self._remember(item)
+            if interval:
+                intervals.setdefault(interval[0], []).append(interval[1:])
+            self._moments.extend(self._instants(item))
+
+        for group, spans in intervals.items():
+            spans.sort()
+            self._groups[group] = spans
+            self._longest[group] = max(end - start for start, end, _ in spans)
+            self._sweep(group, spans)
+
+        self._moments.sort()
+        for moment in self._moments:
+            self._check_moment(*moment)
+
+    def is_current(self, count, newest) -> bool:
+        """
+        Whether the index still matches a trip with `count` items whose
+        most recently stamped one is the `newest` row (id, updated_at).
+        updated_at moves on every write, so an edit makes the edited item
+        the newest with a version the index hasn't seen, and a delete or
+        an insert from elsewhere changes the count or the newest id
+        """
+        if count != len(self.versions):
+            return False
+        if newest is None:
+            return True
+        return (
+            newest["id"] in self.versions
+            and self.versions[newest["id"]] == newest.get("updated_at")
+        )
+
+    def _remember(self, item: dict):
+        self.items[item["id"]] = item
+        self.versions[item["id"]] = item.get("updated_at")
+        return self._interval(item)
+
+    def _interval(self, item: dict):
+        """
+        (group, start, end, id), or None for items that can't clash:
+        unscheduled, instantaneous, or all-day items other than stays
+        and rentals
+        """
+        kind = item.get("type")
+        if kind == _LODGING:
+            days = calendar.item_days(item, self.zone)
+            if days is None:
+                return None
+            # Nights from check-in up to, not including, check-out
+            first, last = days
+            last = max(last, first + timedelta(days=1))
+            return _LODGING, first.toordinal(), last.toordinal(), item["id"]
+
+        group = _RENTAL if kind == _RENTAL else "timed"
+        if item.get("all_day"):
+            if group != _RENTAL:
+                return None
+            days = calendar.item_days(item, self.zone)
+            if days is None:
+                return None
+            start = calendar.local_midnight(days[0], self.zone)
+            end = calendar.local_midnight(days[1] + timedelta(days=1), self.zone)
+        else:
+            start = calendar.parse_time(item.get("start_time"))
+            end = calendar.parse_time(item.get("end_time"))
+            if start is None or end is None or end <= start:
+                return None
+
+        return group, start.timestamp(), end.timestamp(), item["id"]
+
+    def _instants(self, item: dict) -> list:
+        """
+        (timestamp, id, label) of a timed stay's check-in and check-out or
+        a timed rental's pickup and drop-off
+        """
+        labels = _MOMENTS.get(item.get("type"))
+        if not labels or item.get("all_day"):
+            return []
+        moments = []
+        for label, key in zip(labels, ("start_time", "end_time")):
+            moment = calendar.parse_time(item.get(key))
+            if moment is not None:
+                moments.append((moment.timestamp(), item["id"], label))
+        return moments
+
+    def _check_moment(self, at: float, item_id: str, label: str):
+        # Timed intervals strictly around the instant; ones that end or
+        # start right at it leave time to get there
+        spans = self._groups.get("timed")
+        if not spans:
+            return
+        low = bisect_left(spans, (at - self._longest["timed"],))
+        high = bisect_left(spans, (at,))
+        for start, end, other_id in spans[low:high]:
+            if start < at < end:
+                self._record(label, other_id, item_id, at, at)
+
+    def _sweep(self, group: str, spans: list):
+        running = []
+        for start, end, item_id in spans:
+            while running and running[0][0] <= start:
+                heapq.heappop(running)
+            for other_end, other_id in running:
+                self._record(group, other_id, item_id, start, min(end, other_end))
+            heapq.heappush(running, (end, item_id))
+
+    def _record(self, group: str, a: str, b: str, start, end):
+        self._conflicts[min(a, b), max(a, b), group] = (start, end)
+
+    def add(self, item: dict) -> int:
+        """
+        Index one more item, returning how many new conflicts it brought
+        """
+        if item["id"] in self.items:
+            return 0
+
+        before = len(self._conflicts)
+        interval = self._remember(item)
+        if interval is not None:
+            self._add_interval(*interval)
+        for moment in self._instants(item):
+            insort(self._moments, moment)
+            self._check_moment(*moment)
+        return len(self._conflicts) - before
+
+    def _add_interval(self, group: str, start, end, item_id: str):
+        spans = self._groups.setdefault(group, [])
+        longest = self._longest.get(group, 0)
+
+        low = bisect_left(spans, (start - longest,))
+        high = bisect_left(spans, (end,))
+        for other_start, other_end, other_id in spans[low:high]:
+            if other_end > start:
+                self._record(
+                    group, other_id, item_id,
+                    max(start, other_start), min(end, other_end)
+                )
+
+        insort(spans, (start, end, item_id))
+        self._longest[group] = max(longest, end - start)
+
+        if group == "timed":
+            moments = self._moments
+            i = bisect_left(moments, (start,))
+            while i < len(moments) and moments[i][0] < end:
+                at, other_id, label = moments[i]
+                if at > start:
+                    self._record(label, other_id, item_id, at, at)
+                i += 1
+
+    def conflicts(self) -> list:
+        out = []
+        for (a, b, group), (start, end) in self._conflicts.items():
+            if group == _LODGING:
+                start = date.fromordinal(int(start)).isoformat()
+                end = date.fromordinal(int(end)).isoformat()
+                kind = "double_booked_lodging"
+            elif group in _MOMENT_LABELS:
+                start = end = _local_iso(start, self.zone)
+                kind = f"{group}_overlap"
+            else:
+                start = _local_iso(start, self.zone)
+                end = _local_iso(end, self.zone)
+                kind = "double_booked_rental" if group == _RENTAL else "overlap"
+
+            out.append({
+                "kind": kind,
+                "items": [a, b],
+                "names": [self.items[a].get("name"), self.items[b].get("name")],
+                "start": start,
+                "end": end,
+            })
+        return sorted(out, key=lambda conflict: (conflict["start"], conflict["items"]))
+
+    def lodging_gaps(self, start_date, end_date) -> list:
+        """
+        Runs of nights between the trip's start and end dates with no stay
+        booked, as [from, to) date ranges
+        """
+        try:
+            first = calendar.parse_day(start_date, "start_date")
+            last = calendar.parse_day(end_date, "end_date")
+        except ValueError:
+            return []
+        if first is None or last is None or last <= first:
+            return []
+
+        booked = set()
+        for start, end, _ in self._groups.get(_LODGING, ()):
+            booked.update(range(int(start), int(end)))
+
+        gaps, night = [], first.toordinal()
+        while night < last.toordinal():
+            if night in booked:
+                night += 1
+                continue
+            gap_start = night
+            while night < last.toordinal() and night not in booked:
+                night += 1
+            gaps.append({
+                "kind": "missing_lodging",
+                "from": date.fromordinal(gap_start).isoformat(),
+                "to": date.fromordinal(night).isoformat(),
+                "nights": night - gap_start,
+            })
+        return gaps
+
+
+def _local_iso(timestamp: float, zone) -> str:
+    return datetime.fromtimestamp(timestamp, zone).isoformat()
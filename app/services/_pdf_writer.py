@@ -0,0 +1,143 @@
+"""
+Minimal streaming PDF writer for exports
+"""
+
+import textwrap
+
+
+def _pdf_text(value) -> str:
+    """
+    PDF string literal body; non-ASCII Latin-1 as octal escapes so the
+    whole document stays ASCII, anything else replaced
+    """
+    out = []
+    for ch in str(value):
+        code = ord(ch)
+        if ch in "\\()":
+            out.append("\\" + ch)
+        elif 32 <= code < 127:
+            out.append(ch)
+        elif 160 <= code < 256:
+            out.append(f"\\{code:03o}")
+        elif ch in "\t\r\n":
+            out.append(" ")
+        else:
+            out.append("?")
+    return "".join(out)
+
+
+class PDFWriter:
+    """
+    Text-only PDF 1.4 with the standard Helvetica fonts, written
+    incrementally: each call returns the bytes (ASCII str) that are ready,
+    so a document can be streamed page by page. Object offsets are
+    tracked as it goes and the xref table is written by finish()
+    """
+
+    PAGE_WIDTH = 612
+    PAGE_HEIGHT = 792
+    MARGIN = 54
+
+    # Object ids fixed up front; pages get ids from 5 onwards
+    _CATALOG, _PAGES, _FONT, _FONT_BOLD = 1, 2, 3, 4
+
+    def __init__(self):
+        self._offset = 0
+        self._offsets = {}
+        self._next_id = 5
+        self._page_ids = []
+        self._ops = []
+        self._y = self.PAGE_HEIGHT - self.MARGIN
+
+    def _emit(self, chunk: str) -> str:
+        self._offset += len(chunk)
+        return chunk
+
+    def _object(self, obj_id: int, body: str) -> str:
+        self._offsets[obj_id] = self._offset
+        return self._emit(f"{obj_id} 0 obj\n{body}\nendobj\n")
+
+    def start(self) -> str:
+        return "".join((
+            self._emit("%PDF-1.4\n"),
+            self._object(
+                self._CATALOG,
+                f"<< /Type /Catalog /Pages {self._PAGES} 0 R >>"
+            ),
+            self._object(
+                self._FONT,
+                "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                "/Encoding /WinAnsiEncoding >>"
+            ),
+            self._object(
+                self._FONT_BOLD,
+                "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold "
+                "/Encoding /WinAnsiEncoding >>"
+            ),
+        ))
+
+    def text(self, value, size: float = 11, bold: bool = False, gap: float = 0) -> str:
+        """
+        Lay out a wrapped paragraph, returning any pages it completed
+        """
+        chunks = []
+        self._y -= gap
+        leading = size * 1.3
+        # Helvetica averages about half an em per character
+        width = max(10, int((self.PAGE_WIDTH - 2 * self.MARGIN) / (size * 0.5)))
+        font = "F2" if bold else "F1"
+
+        for line in textwrap.wrap(" ".join(str(value).split()), width) or [""]:
+            if self._y - leading < self.MARGIN:
+                chunks.append(self._flush_page())
+            self._y -= leading
+            self._ops.append(
+                f"BT /{font} {size} Tf {self.MARGIN} {self._y:.1f} Td "
+                f"({_pdf_text(line)}) Tj ET"
+            )
+        return "".join(chunks)
+
+    def _flush_page(self) -> str:
+        stream = "\n".join(self._ops) + "\n"
+        content_id, page_id = self._next_id, self._next_id + 1
+        self._next_id += 2
+        self._page_ids.append(page_id)
+        self._ops = []
+        self._y = self.PAGE_HEIGHT - self.MARGIN
+
+        return "".join((
+            self._object(
+                content_id,
+                f"<< /Length {len(stream)} >>\nstream\n{stream}endstream"
+            ),
+            self._object(
+                page_id,
+                f"<< /Type /Page /Parent {self._PAGES} 0 R "
+                f"/MediaBox [0 0 {self.PAGE_WIDTH} {self.PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 {self._FONT} 0 R "
+                f"/F2 {self._FONT_BOLD} 0 R >> >> "
+                f"/Contents {content_id} 0 R >>"
+            ),
+        ))
+
+    def finish(self) -> str:
+        chunks = []
+        if self._ops or not self._page_ids:
+            chunks.append(self._flush_page())
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        chunks.append(self._object(
+            self._PAGES,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>"
+        ))
+
+        xref_offset = self._offset
+        size = self._next_id
+        xref = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        xref += [f"{self._offsets[i]:010d} 00000 n \n" for i in range(1, size)]
+        chunks.append(self._emit("".join(xref)))
+        chunks.append(self._emit(
+            f"trailer\n<< /Size {size} /Root {self._CATALOG} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
+        ))
+        return "".join(chunks)
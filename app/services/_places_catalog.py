@@ -0,0 +1,452 @@
+"""
+In-memory place catalog with a grid index
+"""
+
+import math
+import time
+import heapq
+import asyncio
+import logging
+import contextvars
+from array import array
+
+_EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEGREE = math.pi * _EARTH_RADIUS_KM / 180
+
+# Each coarser grid level is this many times the previous cell size, up
+# to the first level of at least _COARSEST_DEGREES
+_LEVEL_SCALE = 8
+_COARSEST_DEGREES = 5
+# A radius box over more cells than this moves to a coarser level; a
+# nearest search that hasn't settled after this many rings does too
+_MAX_BOX_CELLS = 64
+_MAX_RINGS = 3
+
+
+class _Grid:
+    """
+    One level of the spatial index: square cells of `size` degrees, which
+    tile the globe, mapping to the (lat, lng, cos_lat, slot) entries of
+    the places inside them (coordinates in radians)
+    """
+
+    def __init__(self, size: float):
+        self.size = size
+        self.width = 2 * round(180 / size)
+        self.cells = {}
+
+    def cell(self, lat: float, lng: float) -> tuple:
+        lng = (lng + 180) % 360 - 180
+        return math.floor(lat / self.size), math.floor(lng / self.size)
+
+
+def _snap(degrees: float) -> float:
+    # Whole cells tile the globe, which the ring search relies on where
+    # columns wrap around the antimeridian
+    return 180 / max(round(180 / degrees), 1)
+
+
+def _grid_sizes(cell_degrees: float) -> list:
+    sizes = [_snap(cell_degrees)]
+    while sizes[-1] < _COARSEST_DEGREES:
+        sizes.append(_snap(sizes[-1] * _LEVEL_SCALE))
+    return sizes
+
+
+class PlaceCatalog:
+    """
+    Places in parallel arrays (coordinates as float arrays, in radians,
+    with cos(lat) precomputed for haversine), plus grids of square cells
+    from `cell_degrees` up to a few degrees wide, each mapping cells to
+    the coordinates and slots of their places. Lookups use the finest
+    grid that keeps the scan short, so dense areas get small cells and
+    sparse ones (open sea, empty countryside) coarse ones. Rows come from
+    `fetch(watermark)`, an async callable returning rows changed after
+    the (updated_at, id) watermark in (updated_at nulls last, id) order;
+    a refresh applies them in place, and a full reload (which also drops
+    deleted places) happens every `full_refresh_seconds`. Refreshes run
+    in the background while the current snapshot keeps being served; only
+    the very first load is waited for
+    """
+
+    _FIELDS = ("name", "address", "time_zone")
+
+    def __init__(
+        self,
+        fetch,
+        cell_degrees: float,
+        refresh_seconds: float,
+        full_refresh_seconds: float
+    ):
+        self._fetch = fetch
+        self._sizes = _grid_sizes(cell_degrees)
+        self.cell_degrees = self._sizes[0]
+        self.refresh_seconds = refresh_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self._reset()
+        self._refreshed_at = None
+        self._loaded_at = None
+        self._refresh_task = None
+
+    def _reset(self):
+        self._slots = {}
+        self._ids = []
+        self._rows = {field: [] for field in self._FIELDS}
+        self._lat = array("d")
+        self._lng = array("d")
+        self._cos_lat = array("d")
+        self._grids = [_Grid(size) for size in self._sizes]
+        self._cell_of = []
+        self._watermark = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    # Loading
+
+    async def ensure_fresh(self, wait: bool = False):
+        """
+        Start a refresh if the catalog is older than `refresh_seconds`;
+        concurrent callers share one refresh, and only wait for it if
+        nothing has been loaded yet or `wait` is set (for callers whose
+        loop closes right after, which would cancel the refresh)
+        """
+        now = time.monotonic()
+        if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return
+
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            # A fresh context, so the refresh's queries aren't charged to
+            # whichever request happened to start it
+            task = self._refresh_task = loop.create_task(
+                self._refresh(), context=contextvars.Context()
+            )
+        if self._loaded_at is None or wait:
+            await asyncio.shield(task)
+
+    async def _refresh(self):
+        full = (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.full_refresh_seconds
+        )
+        try:
+            rows = await self._fetch(None if full else self._watermark)
+            if full:
+                await self._reload(rows)
+            else:
+                for row in rows:
+                    self.upsert(row)
+        except Exception:
+            if self._loaded_at is None:
+                raise
+            logging.exception("Place catalog refresh failed")
+        self._refreshed_at = time.monotonic()
+
+    _STATE = (
+        "_slots", "_ids", "_rows", "_lat", "_lng", "_cos_lat", "_grids",
+        "_cell_of", "_watermark"
+    )
+
+    async def _reload(self, rows: list):
+        # Build the new snapshot on the side, yielding to the loop now and
+        # then, and swap it in whole
+        staged = PlaceCatalog(
+            self._fetch, self.cell_degrees,
+            self.refresh_seconds, self.full_refresh_seconds
+        )
+        for i, row in enumerate(rows, 1):
+            staged.upsert(row)
+            if i % 5000 == 0:
+                await asyncio.sleep(0)
+        for name in self._STATE:
+            setattr(self, name, getattr(staged, name))
+        self._loaded_at = time.monotonic()
+
+    def upsert(self, row: dict):
+        slot = self._slots.get(row["id"])
+        if slot is None:
+            slot = self._slots[row["id"]] = len(self._ids)
+            self._ids.append(row["id"])
+            for field in self._FIELDS:
+                self._rows[field].append(None)
+            self._lat.append(math.nan)
+            self._lng.append(math.nan)
+            self._cos_lat.append(math.nan)
+            self._cell_of.append(None)
+
+        for field in self._FIELDS:
+            self._rows[field][slot] = row.get(field)
+
+        placed = self._cell_of[slot]
+        if placed is not None:
+            entry, cells = placed
+            for grid, cell in zip(self._grids, cells):
+                grid.cells[cell].remove(entry)
+                if not grid.cells[cell]:
+                    del grid.cells[cell]
+
+        lat, lng = row.get("lat"), row.get("lng")
+        if lat is None or lng is None:
+            self._lat[slot] = self._lng[slot] = self._cos_lat[slot] = math.nan
+            self._cell_of[slot] = None
+        else:
+            lat, lng = float(lat), float(lng)
+            self._lat[slot] = math.radians(lat)
+            self._lng[slot] = math.radians(lng)
+            self._cos_lat[slot] = math.cos(self._lat[slot])
+            entry = (self._lat[slot], self._lng[slot], self._cos_lat[slot], slot)
+            cells = tuple(grid.cell(lat, lng) for grid in self._grids)
+            for grid, cell in zip(self._grids, cells):
+                grid.cells.setdefault(cell, []).append(entry)
+            self._cell_of[slot] = (entry, cells)
+
+        # Rows without updated_at come last in the fetch order, so the
+        # watermark moves into them too instead of refetching them all
+        watermark = (row.get("updated_at"), row["id"])
+        if self._watermark is None or _after(watermark, self._watermark):
+            self._watermark = watermark
+
+    # Queries
+
+    def ids(self, limit: int) -> list:
+        return self._ids[:limit]
+
+    def place(self, slot: int, distance_km: float = None) -> dict:
+        rows = self._rows
+        place = {
+            "id": self._ids[slot],
+            "name": rows["name"][slot],
+            "address": rows["address"][slot],
+            "time_zone": rows["time_zone"][slot],
+            "lat": math.degrees(self._lat[slot]),
+            "lng": math.degrees(self._lng[slot]),
+        }
+        if distance_km is not None:
+            place["distance_km"] = round(distance_km, 3)
+        return place
+
+    def distances_km(self, lat: float, lng: float, slots) -> list:
+        """
+        Haversine distances from (lat, lng) to many slots in one pass over
+        the coordinate arrays
+        """
+        lat1, lng1 = math.radians(lat), math.radians(lng)
+        cos1 = math.cos(lat1)
+        lats, lngs, coss = self._lat, self._lng, self._cos_lat
+        sin, asin, sqrt = math.sin, math.asin, math.sqrt
+        scale = 2 * _EARTH_RADIUS_KM
+        return [
+            scale * asin(min(1.0, sqrt(
+                sin((lats[s] - lat1) / 2) ** 2
+                + cos1 * coss[s] * sin((lngs[s] - lng1) / 2) ** 2
+            )))
+            for s in slots
+        ]
+
+    def distances_to(self, lat: float, lng: float, place_ids) -> dict:
+        slots = {
+            place_id: self._slots[place_id]
+            for place_id in place_ids
+            if place_id in self._slots
+            and not math.isnan(self._lat[self._slots[place_id]])
+        }
+        distances = dict(zip(slots, self.distances_km(lat, lng, slots.values())))
+        return {
+            place_id: (
+                round(distances[place_id], 3) if place_id in distances else None
+            )
+            for place_id in place_ids
+        }
+
+    def _candidates(self, lat: float, lng: float, radius_km: float) -> list:
+        """
+        Entries in the cells overlapping the radius' bounding box, on the
+        finest grid where the box spans at most _MAX_BOX_CELLS cells
+        """
+        dlat = radius_km / _KM_PER_DEGREE
+        # Longitude degrees shrink towards the poles, so size the box for
+        # the latitude nearest to one
+        widest = min(abs(lat) + dlat, 90)
+        dlng = min(radius_km / (_KM_PER_DEGREE * max(math.cos(math.radians(widest)), 1e-6)), 180)
+
+        for grid in self._grids:
+            size = grid.size
+            rows = range(math.floor((lat - dlat) / size), math.floor((lat + dlat) / size) + 1)
+            cols = range(math.floor((lng - dlng) / size), math.floor((lng + dlng) / size) + 1)
+            if len(rows) * len(cols) <= _MAX_BOX_CELLS:
+                break
+
+        cells = grid.cells
+        if len(rows) * len(cols) > len(cells):
+            # Wider than the populated grid: scanning every place is cheaper
+            return [entry for entries in cells.values() for entry in entries]
+
+        half = grid.width // 2
+        wrapped = {(c + half) % grid.width - half for c in cols}
+        entries = []
+        for r in rows:
+            for c in wrapped:
+                found = cells.get((r, c))
+                if found:
+                    entries.extend(found)
+        return entries
+
+    def near(self, lat: float, lng: float, radius_km: float, limit: int) -> list:
+        """
+        Places within `radius_km`, closest first
+        """
+        lat1, lng1 = math.radians(lat), math.radians(lng)
+        cos1 = math.cos(lat1)
+        sin = math.sin
+        # Compare haversine terms against the radius' own, and skip rows
+        # outside its latitude band before any trigonometry; only hits get
+        # converted to km
+        band = radius_km / _EARTH_RADIUS_KM
+        limit_h = sin(min(band, math.pi) / 2) ** 2
+
+        hits = []
+        for lat2, lng2, cos2, slot in self._candidates(lat, lng, radius_km):
+            dlat = lat2 - lat1
+            if -band <= dlat <= band:
+                a = sin(dlat / 2)
+                b = sin((lng2 - lng1) / 2)
+                h = a * a + cos1 * cos2 * b * b
+                if h <= limit_h:
+                    hits.append((h, slot))
+
+        scale = 2 * _EARTH_RADIUS_KM
+        return [
+            self.place(slot, scale * math.asin(math.sqrt(h)))
+            for h, slot in heapq.nsmallest(limit, hits)
+        ]
+
+    def nearest(self, lat: float, lng: float, k: int, max_km: float = 20015) -> list:
+        """
+        The `k` closest places within `max_km`, scanning a grid ring by
+        ring outwards from the point's cell. Each ring only visits its own
+        cells, and the search stops once the k-th best distance is within
+        the lower bound on anything further out. A search still going
+        after _MAX_RINGS rings starts over on the next coarser grid, so
+        sparse areas don't walk through rings of empty cells
+        """
+        if k <= 0 or not self._grids[0].cells:
+            return []
+
+        limit_h = math.sin(min(max_km / _EARTH_RADIUS_KM, math.pi) / 2) ** 2
+        for grid in self._grids[:-1]:
+            best = self._nearest_on(grid, lat, lng, k, limit_h, _MAX_RINGS)
+            if best is not None:
+                break
+        else:
+            best = self._nearest_on(self._grids[-1], lat, lng, k, limit_h, None)
+
+        scale = 2 * _EARTH_RADIUS_KM
+        return [
+            self.place(slot, scale * math.asin(math.sqrt(h)))
+            for h, slot in sorted((-h, slot) for h, slot in best)
+        ]
+
+    def _nearest_on(self, grid: _Grid, lat: float, lng: float, k: int, limit_h: float, max_rings):
+        """
+        The k best as a max-heap of (-haversine term, slot), or None if
+        the search didn't settle within `max_rings` rings. When a ring
+        would have more cells than the grid has populated ones, the
+        remaining places are scanned directly instead
+        """
+        lat1, lng1 = math.radians(lat), math.radians(lng)
+        cos1 = math.cos(lat1)
+        sin = math.sin
+        best = []
+
+        def scan(entries):
+            for lat2, lng2, cos2, slot in entries:
+                a = sin((lat2 - lat1) / 2)
+                b = sin((lng2 - lng1) / 2)
+                h = a * a + cos1 * cos2 * b * b
+                if h > limit_h:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-h, slot))
+                elif h < -best[0][0]:
+                    heapq.heapreplace(best, (-h, slot))
+
+        cells, width = grid.cells, grid.width
+        r0, c0 = grid.cell(lat, lng)
+        ring = 0
+        while True:
+            if 8 * ring > len(cells) or 2 * ring + 1 >= width:
+                for (r, c), entries in cells.items():
+                    dc = abs(c - c0) % width
+                    if max(abs(r - r0), min(dc, width - dc)) >= ring:
+                        scan(entries)
+                return best
+
+            for cell in self._ring(r0, c0, ring, width):
+                entries = cells.get(cell)
+                if entries:
+                    scan(entries)
+
+            bound = self._ring_bound(grid.size, lat, lng, cos1, r0, c0, ring + 1)
+            if bound > limit_h or (len(best) == k and -best[0][0] <= bound):
+                return best
+            ring += 1
+            if max_rings is not None and ring >= max_rings:
+                return None
+
+    @staticmethod
+    def _ring(r0: int, c0: int, n: int, width: int):
+        """
+        Cells at Chebyshev distance `n` from (r0, c0), columns wrapping
+        around the antimeridian
+        """
+        half = width // 2
+        if n == 0:
+            yield r0, c0
+            return
+        for dc in range(-n, n + 1):
+            c = (c0 + dc + half) % width - half
+            yield r0 - n, c
+            yield r0 + n, c
+        for dr in range(-n + 1, n):
+            yield r0 + dr, (c0 - n + half) % width - half
+            yield r0 + dr, (c0 + n + half) % width - half
+
+    @staticmethod
+    def _ring_bound(size: float, lat: float, lng: float, cos1: float, r0: int, c0: int, n: int) -> float:
+        """
+        Lower bound, as a haversine term, on the distance from the point
+        to any cell `n` or more rings out: such a cell is past the inner
+        block either in latitude, or in longitude, where being `g` apart
+        means at least asin(sin(g) * cos(lat)) away (the distance to the
+        nearest such meridian)
+        """
+        lng = (lng + 180) % 360 - 180
+        lat_gap = min(lat - (r0 - n + 1) * size, (r0 + n) * size - lat)
+        lng_gap = min(lng - (c0 - n + 1) * size, (c0 + n) * size - lng)
+        distance = min(
+            math.radians(lat_gap),
+            math.asin(min(1.0, math.sin(min(math.radians(lng_gap), math.pi / 2)) * cos1))
+        )
+        return math.sin(max(distance, 0.0) / 2) ** 2
+
+    def stats(self) -> dict:
+        return {
+            "places": len(self._ids),
+            "cells": len(self._grids[0].cells),
+            "grid_levels": len(self._grids),
+            "grid_degrees": self._grids[0].size,
+            "age_seconds": (
+                time.monotonic() - self._refreshed_at
+                if self._refreshed_at is not None else -1
+            ),
+        }
+
+
+def _after(a: tuple, b: tuple) -> bool:
+    """
+    Whether watermark `a` comes after `b` in (updated_at nulls last, id)
+    order
+    """
+    return (a[0] is None, a[0] or "", a[1]) > (b[0] is None, b[0] or "", b[1])
@@ -0,0 +1,113 @@
+"""
+Read-through cache for trips
+"""
+
+import time
+
+from app.configs import config
+from app.utils.cache import build_backend
+
+
+class _TripCache:
+    """
+    Single trips, per-user trip lists and per-user list pages, dropped by
+    the trip writes. An invalidation while a key is loading bumps its
+    generation so a read that raced a write never stores what it loaded;
+    generations are only kept while a load of the key is in flight
+    """
+
+    # Pages kept per user; the oldest is dropped past this
+    MAX_PAGES_PER_USER = 32
+
+    def __init__(self, backend, ttl: float):
+        self._backend = backend
+        self.ttl = ttl
+        self._loading = {}
+        self._generations = {}
+
+    @staticmethod
+    def trip_key(trip_id: str) -> str:
+        return f"trip:{trip_id}"
+
+    @staticmethod
+    def user_key(user_id: str) -> str:
+        return f"trips:{user_id}"
+
+    @staticmethod
+    def pages_key(user_id: str) -> str:
+        return f"trip-pages:{user_id}"
+
+    @classmethod
+    def user_keys(cls, user_id: str) -> tuple:
+        """
+        Every key holding a view of the user's trip list
+        """
+        return cls.user_key(user_id), cls.pages_key(user_id)
+
+    async def get_or_load(self, key: str, loader):
+        """
+        Cached value of `key`, else the result of `await loader()`
+        """
+        value = await self._backend.get(key)
+        if value is not None:
+            return value
+
+        async def store(value):
+            await self._backend.set(key, value)
+
+        return await self._load(key, loader, store)
+
+    async def get_or_load_page(self, user_id: str, page: tuple, loader):
+        """
+        Cached list page `page` (any hashable describing the request) of
+        the user's trips, else the result of `await loader()`. A user's
+        pages share one entry so the trip writes drop them all at once
+        """
+        key = self.pages_key(user_id)
+        pages = await self._backend.get(key)
+        # Adding a page re-arms the shared entry, so each page keeps its
+        # own load time to expire on
+        if pages is not None and page in pages:
+            loaded_at, value = pages[page]
+            if time.monotonic() - loaded_at < self.ttl:
+                return value
+
+        async def store(value):
+            pages = dict(await self._backend.get(key) or {})
+            pages.pop(page, None)
+            while len(pages) >= self.MAX_PAGES_PER_USER:
+                del pages[next(iter(pages))]
+            pages[page] = (time.monotonic(), value)
+            await self._backend.set(key, pages)
+
+        return await self._load(key, loader, store)
+
+    async def _load(self, key: str, loader, store):
+        self._loading[key] = self._loading.get(key, 0) + 1
+        try:
+            generation = self._generations.get(key, 0)
+            value = await loader()
+            if value is not None and self._generations.get(key, 0) == generation:
+                await store(value)
+        finally:
+            self._loading[key] -= 1
+            if not self._loading[key]:
+                del self._loading[key]
+                self._generations.pop(key, None)
+        return value
+
+    async def invalidate(self, *keys: str):
+        for key in keys:
+            if key in self._loading:
+                self._generations[key] = self._generations.get(key, 0) + 1
+        await self._backend.delete(*keys)
+
+    def stats(self) -> dict:
+        return self._backend.stats()
+
+
+trip_cache = _TripCache(build_backend(
+    config.TRIP_CACHE_BACKEND,
+    max_entries=config.TRIP_CACHE_MAX_ENTRIES,
+    ttl=config.TRIP_CACHE_TTL_SECONDS
+), ttl=config.TRIP_CACHE_TTL_SECONDS)
@@ -2,119 +2,319 @@
 Trip formatting for export
 """
 
+import re
+from html import escape
+
+from app.services._pdf_writer import PDFWriter
+
+
+_HTML_STYLE = """
+    body {
+        font-family: Arial, sans-serif;
+        margin: 20px;
+        background-color: #f8f9fa;
+        color: #333;
+    }
+    .trip-header {
+        background: #0077cc;
+        color: white;
+        padding: 20px;
+        border-radius: 10px;
+        margin-bottom: 30px;
+    }
+    .trip-header h1 {
+        margin: 0;
+        font-size: 2rem;
+    }
+    .trip-header p {
+        margin: 5px 0;
+    }
+    .itinerary {
+        margin-top: 20px;
+    }
+    .item {
+        background: white;
+        padding: 15px;
+        margin-bottom: 15px;
+        border-radius: 10px;
+        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
+    }
+    .item h2 {
+        margin-top: 0;
+        color: #0077cc;
+    }
+    .meta {
+        font-size: 0.9rem;
+        color: #666;
+    }
+    a {
+        color: #0077cc;
+        text-decoration: none;
+    }
+    a:hover {
+        text-decoration: underline;
+    }
+"""
+
+# Static parts of the document, built once instead of per export
+_HTML_HEAD_START = '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="UTF-8" />\n<title>'
+_HTML_HEAD_END = f"</title>\n<style>{_HTML_STYLE}</style>\n</head>\n<body>\n"
+_HTML_ITINERARY_START = '<div class="itinerary">\n<h1>Itinerary</h1>\n'
+_HTML_END = "</div>\n</body>\n</html>\n"
+
+
+def _e(value) -> str:
+    return escape(str(value), quote=True)
+
+
+_MD_SPECIAL = re.compile(r"([\\`*_\[\]<>|#])")
+
+
+def _md(value) -> str:
+    # One line of inline text with Markdown syntax characters escaped
+    return _MD_SPECIAL.sub(r"\\\1", " ".join(str(value).split()))
+
+
+def _md_link(url) -> str:
+    url = str(url).strip()
+    if url.lower().startswith(("http://", "https://")):
+        return "<" + url.replace(" ", "%20").replace(">", "%3E") + ">"
+    return _md(url)
+
+
+def _title(trip_details: dict, default: str) -> str:
+    return trip_details.get("title") or trip_details.get("name") or default
+
+
+def _cost(item: dict):
+    if item.get("cost_amount") and item.get("cost_currency"):
+        return f"{item['cost_amount']} {item['cost_currency']}"
+    return None
+
 
 class _Formatter:
     """
     Trip Formatter
+
+    Each format builds a (head, item, tail) triple of chunk generators per
+    document, so it can be rendered in one go or streamed item by item
     """
 
     def __init__(self):
-        self._FORMATS = ['html']
+        self._FORMATS = ['html', 'md', 'pdf']
         self._FORMATTERS = {
-            'html': self._format_html
+            'html': lambda: (
+                self._head_html, self._process_item_html, self._tail_html
+            ),
+            'md': lambda: (
+                self._head_md, self._process_item_md, self._tail_md
+            ),
+            'pdf': lambda: _PDFDocument().parts(),
+        }
+        self._MEDIA_TYPES = {
+            'html': "text/html; charset=utf-8",
+            'md': "text/markdown; charset=utf-8",
+            'pdf': "application/pdf",
         }
 
+    @property
+    def formats(self) -> list:
+        return list(self._FORMATS)
+
+    def _parts(self, type: str):
+        if type not in self._FORMATS:
+            raise ValueError(f"Unsupported format type: {type}")
+        return self._FORMATTERS[type]()
+
+    def media_type(self, type: str) -> str:
+        """
+        Content type of an export, ValueError if the format is unsupported
+        """
+        self._parts(type)
+        return self._MEDIA_TYPES[type]
+
     def format(
         self,
         trip_details: dict,
         itinerary: list,
         type: str = 'html'
     ) -> str:
-        if type in self._FORMATS:
-            return self._FORMATTERS[type](trip_details, itinerary)
-        else:
-            raise ValueError(f"Unsupported format type: {type}")
+        head, item, tail = self._parts(type)
+        chunks = list(head(trip_details))
+        for entry in itinerary:
+            chunks.extend(item(entry))
+        chunks.extend(tail(trip_details))
+        return "".join(chunks)
+
+    async def stream(
+        self,
+        trip_details: dict,
+        itinerary,
+        type: str = 'html'
+    ):
+        """
+        Render chunk by chunk from an async iterator of itinerary items;
+        the head goes out before the first item is fetched
+        """
+        head, item, tail = self._parts(type)
+        yield "".join(head(trip_details))
+        async for entry in itinerary:
+            yield "".join(item(entry))
+        yield "".join(tail(trip_details))
+
+    def _head_html(self, trip_details: dict):
+        """
+        Document head and the styled trip header
+        """
+        yield _HTML_HEAD_START
+        yield _e(_title(trip_details, "Trip Itinerary"))
+        yield _HTML_HEAD_END
+        yield from self._process_details_html(trip_details)
+        yield _HTML_ITINERARY_START
+
+    def _tail_html(self, trip_details: dict):
+        yield _HTML_END
 
-    def _format_html(self, trip_details: dict, itinerary: list) -> str:
+    def _process_details_html(self, trip_details: dict):
         """
-        Format trip and itinerary data into a styled HTML structure
+        Process trip details into the styled header block
+        """
+        yield '<div class="trip-header">\n'
+        yield f"<h1>{_e(_title(trip_details, 'Trip'))}</h1>\n"
+        if trip_details.get("start_date") or trip_details.get("end_date"):
+            yield (
+                f"<p>{_e(trip_details.get('start_date') or '')} &rarr; "
+                f"{_e(trip_details.get('end_date') or '')}</p>\n"
+            )
+        if trip_details.get("time_zone"):
+            yield f"<p>Time zone: {_e(trip_details['time_zone'])}</p>\n"
+        if trip_details.get("home_currency"):
+            yield f"<p>Currency: {_e(trip_details['home_currency'])}</p>\n"
+        if trip_details.get("description"):
+            yield f"<p>{_e(trip_details['description'])}</p>\n"
+        if trip_details.get("notes"):
+            yield f"<p><b>Notes:</b> {_e(trip_details['notes'])}</p>\n"
+        yield "</div>\n"
+
+    def _process_item_html(self, item: dict):
+        """
+        Process one itinerary item into a styled HTML card
+        """
+        yield '<div class="item">\n'
+        yield f"<h2>{_e(item.get('name') or 'No Name')}</h2>\n"
+        yield f'<p class="meta">Type: {_e(item.get("type") or "N/A")}</p>\n'
+        if item.get("start_time"):
+            yield f"<p><b>Start:</b> {_e(item['start_time'])}</p>\n"
+        if item.get("end_time"):
+            yield f"<p><b>End:</b> {_e(item['end_time'])}</p>\n"
+        if _cost(item):
+            yield f"<p><b>Cost:</b> {_e(_cost(item))}</p>\n"
+        if item.get("link"):
+            link = _e(item["link"])
+            if str(item["link"]).lower().startswith(("http://", "https://")):
+                yield f"<p><b>Link:</b> <a href=\"{link}\">{link}</a></p>\n"
+            else:
+                yield f"<p><b>Link:</b> {link}</p>\n"
+        if item.get("notes"):
+            yield f"<p><b>Notes:</b> {_e(item['notes'])}</p>\n"
+        yield "</div>\n"
+
+    def _head_md(self, trip_details: dict):
         """
-        trip_header_html = self._process_details_html(trip_details)
-        itinerary_html = self._process_itinerary_html(itinerary)
-
-        return f"""
-            <!DOCTYPE html>
-            <html lang="en">
-            <head>
-                <meta charset="UTF-8" />
-                <title>{trip_details.get("name", "Trip Itinerary")}</title>
-                <style>
-                    body {{
-                        font-family: Arial, sans-serif;
-                        margin: 20px;
-                        background-color: #f8f9fa;
-                        color: #333;
-                    }}
-                    .trip-header {{
-                        background: #0077cc;
-                        color: white;
-                        padding: 20px;
-                        border-radius: 10px;
-                        margin-bottom: 30px;
-                    }}
-                    .trip-header h1 {{
-                        margin: 0;
-                        font-size: 2rem;
-                    }}
-                    .trip-header p {{
-                        margin: 5px 0;
-                    }}
-                    .itinerary {{
-                        margin-top: 20px;
-                    }}
-                    .item {{
-                        background: white;
-                        padding: 15px;
-                        margin-bottom: 15px;
-                        border-radius: 10px;
-                        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-                    }}
-                    .item h2 {{
-                        margin-top: 0;
-                        color: #0077cc;
-                    }}
-                    .meta {{
-                        font-size: 0.9rem;
-                        color: #666;
-                    }}
-                    a {{
-                        color: #0077cc;
-                        text-decoration: none;
-                    }}
-                    a:hover {{
-                        text-decoration: underline;
-                    }}
-                </style>
-            </head>
-            <body>
-                {trip_header_html}
-                <div class="itinerary">
-                    <h1>Itinerary</h1>
-                    {itinerary_html}
-                </div>
-            </body>
-            </html>
+        Markdown title block
         """
+        yield f"# {_md(_title(trip_details, 'Trip Itinerary'))}\n\n"
+        if trip_details.get("start_date") or trip_details.get("end_date"):
+            yield (
+                f"{_md(trip_details.get('start_date') or '')} → "
+                f"{_md(trip_details.get('end_date') or '')}\n\n"
+            )
+        if trip_details.get("time_zone"):
+            yield f"**Time zone:** {_md(trip_details['time_zone'])}  \n"
+        if trip_details.get("home_currency"):
+            yield f"**Currency:** {_md(trip_details['home_currency'])}  \n"
+        if trip_details.get("description"):
+            yield f"\n{_md(trip_details['description'])}\n"
+        if trip_details.get("notes"):
+            yield f"\n**Notes:** {_md(trip_details['notes'])}\n"
+        yield "\n## Itinerary\n\n"
 
-    def _process_itinerary_html(self, itinerary: list) -> str:
+    def _process_item_md(self, item: dict):
         """
-        Process itinerary into styled HTML cards
+        One itinerary item as a Markdown section
         """
-        html_content = ""
-        for item in itinerary:
-            html_content += f"""
-            <div class="item">
-                <h2>{item.get('name', 'No Name')}</h2>
-                <p class="meta">Type: {item.get('type', 'N/A')}</p>
-                {f"<p><b>Start:</b> {item['start_time']}</p>" if item.get("start_time") else ""}
-                {f"<p><b>End:</b> {item['end_time']}</p>" if item.get("end_time") else ""}
-                {f"<p><b>Cost:</b> {item['cost_amount']} {item['cost_currency']}</p>" if item.get("cost_amount") and item.get("cost_currency") else ""}
-                {f"<p><b>Link:</b> <a href='{item['link']}'>{item['link']}</a></p>" if item.get("link") else ""}
-                {f"<p><b>Notes:</b> {item['notes']}</p>" if item.get("notes") else ""}
-            </div>
-            """
-        return html_content
+        yield f"### {_md(item.get('name') or 'No Name')}\n\n"
+        yield f"- **Type:** {_md(item.get('type') or 'N/A')}\n"
+        if item.get("start_time"):
+            yield f"- **Start:** {_md(item['start_time'])}\n"
+        if item.get("end_time"):
+            yield f"- **End:** {_md(item['end_time'])}\n"
+        if _cost(item):
+            yield f"- **Cost:** {_md(_cost(item))}\n"
+        if item.get("link"):
+            yield f"- **Link:** {_md_link(item['link'])}\n"
+        if item.get("notes"):
+            yield f"- **Notes:** {_md(item['notes'])}\n"
+        yield "\n"
 
+    def _tail_md(self, trip_details: dict):
+        return ()
+
+
+class _PDFDocument:
+    """
+    PDF layout state for one export
+    """
+
+    def __init__(self):
+        self._pdf = PDFWriter()
+
+    def parts(self):
+        return self.head, self.item, self.tail
+
+    def head(self, trip_details: dict):
+        pdf = self._pdf
+        yield pdf.start()
+        yield pdf.text(_title(trip_details, "Trip Itinerary"), size=20, bold=True)
+        if trip_details.get("start_date") or trip_details.get("end_date"):
+            yield pdf.text(
+                f"{trip_details.get('start_date') or ''} - "
+                f"{trip_details.get('end_date') or ''}",
+                gap=4
+            )
+        for label, key in (("Time zone", "time_zone"), ("Currency", "home_currency")):
+            if trip_details.get(key):
+                yield pdf.text(f"{label}: {trip_details[key]}")
+        if trip_details.get("description"):
+            yield pdf.text(trip_details["description"], gap=4)
+        if trip_details.get("notes"):
+            yield pdf.text(f"Notes: {trip_details['notes']}", gap=4)
+        yield pdf.text("Itinerary", size=16, bold=True, gap=14)
+
+    def item(self, item: dict):
+        pdf = self._pdf
+        yield pdf.text(item.get("name") or "No Name", size=13, bold=True, gap=10)
+        yield pdf.text(f"Type: {item.get('type') or 'N/A'}", size=10)
+        for label, value in (
+            ("Start", item.get("start_time")),
+            ("End", item.get("end_time")),
+            ("Cost", _cost(item)),
+            ("Link", item.get("link")),
+            ("Notes", item.get("notes")),
+        ):
+            if value:
+                yield pdf.text(f"{label}: {value}", size=10)
+
+    def tail(self, trip_details: dict):
+        yield self._pdf.finish()
 
 
 trip_formatter = _Formatter()
+
+
+def render_export(trip_details: dict, itinerary: list, type: str = 'html') -> bytes:
+    """
+    Module-level entry point so renders can run in a process pool; returns
+    the encoded body, which is what crosses back from the worker
+    """
+    return trip_formatter.format(trip_details, itinerary, type=type).encode()
@@ -2,25 +2,30 @@
 Itinerary Item Service
 """
 
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from postgrest.exceptions import APIError
+
 from app.configs import config
-from app.database import client as db_client
+from app.models import BudgetEntryCreate
+from app.database import client as db_client, execute
+from app.utils import timing
+from app.services._fx_rates import fx_rates, factor as fx_factor
 
 
-async def create_budget_entry(trip_id: str, budget_data: dict):
+async def create_budget_entry(trip_id: str, budget_data):
     """
-    Insert query on budget
+    Insert query on budget; `budget_data` is a BudgetEntryCreate or
+    anything it validates, ValueError if it is invalid
     """
-    entry = {
-        "trip_id": trip_id,
-        "item_id": budget_data.get("item_id", None),
-        "category": budget_data["category"],
-        "amount": budget_data["amount"],
-        "currency": budget_data["currency"]
-    }
+    entry = BudgetEntryCreate.parse(budget_data).row(trip_id=trip_id)
 
-    response = db_client.table(
+    response = await execute(db_client.table(
         config.DB_SCHEMA.BUDGET_ENTRY
-    ).insert(entry).execute()
+    ).insert(entry))
 
     return response.data
 
@@ -28,8 +33,174 @@ async def get_budget(trip_id: str):
     """
     Select query on budget
     """
-    budget = db_client.table(
+    budget = await execute(db_client.table(
         config.DB_SCHEMA.BUDGET_ENTRY
-    ).select("*").eq("trip_id", trip_id).execute()
+    ).select("*").eq("trip_id", trip_id))
+
+    return budget.data
+
+async def _summary_groups(trip_id: str, time_zone: Optional[str]) -> list:
+    """
+    (category, currency, day) totals, grouped by budget_summary_groups in
+    the database; without it, the columns involved are fetched and
+    grouped here
+    """
+    try:
+        groups = await execute(db_client.rpc(
+            "budget_summary_groups", {"p_trip_id": trip_id}
+        ))
+        return groups.data
+    except APIError as e:
+        # PGRST202: no such function
+        if e.code != "PGRST202":
+            raise
+
+    entries, items = await asyncio.gather(
+        execute(db_client.table(
+            config.DB_SCHEMA.BUDGET_ENTRY
+        ).select("category,currency,amount,created_at,item_id").eq("trip_id", trip_id)),
+        execute(db_client.table(
+            config.DB_SCHEMA.ITINERARY_ITEM
+        ).select("id,start_time").eq("trip_id", trip_id))
+    )
+    return group_entries(
+        entries.data,
+        {item["id"]: item["start_time"] for item in items.data},
+        time_zone
+    )
+
+
+def group_entries(entries: list, item_starts: dict, time_zone: Optional[str]) -> list:
+    """
+    Python equivalent of budget_summary_groups, worked column by column:
+    the entries are split into category, currency, amount and timestamp
+    columns, each distinct timestamp is turned into a day once (entries
+    linked to one item share it), and the zipped key column is counted
+    and summed
+    """
+    try:
+        zone = ZoneInfo(time_zone or "UTC")
+    except (ValueError, ZoneInfoNotFoundError):
+        zone = timezone.utc
+
+    categories = [entry.get("category") for entry in entries]
+    currencies = [(entry.get("currency") or "").upper() for entry in entries]
+    amounts = [float(entry.get("amount") or 0) for entry in entries]
+    stamps = [
+        item_starts.get(entry.get("item_id")) or entry.get("created_at")
+        for entry in entries
+    ]
+
+    days = {stamp: _local_day(stamp, zone) for stamp in set(stamps)}
+    keys = list(zip(categories, currencies, map(days.__getitem__, stamps)))
+
+    counts = Counter(keys)
+    totals = dict.fromkeys(counts, 0.0)
+    for key, amount in zip(keys, amounts):
+        totals[key] += amount
+
+    return [
+        {
+            "category": category,
+            "currency": currency,
+            "day": day,
+            "total": total,
+            "entries": counts[category, currency, day],
+        }
+        for (category, currency, day), total in totals.items()
+    ]
+
+
+def _local_day(stamp: Optional[str], zone) -> Optional[str]:
+    if not stamp:
+        return None
+    moment = datetime.fromisoformat(stamp)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(zone).date().isoformat()
 
-    return budget.data
\ No newline at end of file
+
+def _bucket(buckets: dict, name, currency: str, amount: float, converted, entries: int):
+    bucket = buckets.get(name)
+    if bucket is None:
+        bucket = buckets[name] = {"total": 0.0, "by_currency": {}, "entries": 0}
+    bucket["by_currency"][currency] = bucket["by_currency"].get(currency, 0.0) + amount
+    bucket["entries"] += entries
+    if converted is None:
+        bucket["total"] = None
+    elif bucket["total"] is not None:
+        bucket["total"] += converted
+
+
+def _rounded(bucket: dict) -> dict:
+    return {
+        "total": None if bucket["total"] is None else round(bucket["total"], 2),
+        "by_currency": {
+            currency: round(amount, 2)
+            for currency, amount in sorted(bucket["by_currency"].items())
+        },
+        "entries": bucket["entries"],
+    }
+
+
+def summarize(groups: list, home_currency: str, fx: Optional[tuple] = None) -> dict:
+    """
+    Roll grouped totals up per category, currency and day, converting to
+    `home_currency` with the (rates, as_of) FX snapshot `fx`, the current
+    one by default. A total that includes an amount in a currency the FX
+    table lacks is null, and the currency is listed as unconverted
+    """
+    home_currency = (home_currency or "").upper()
+    overall, by_category, by_day = {}, {}, {}
+    unconverted = set()
+    # One table for the whole summary rather than a lookup per group
+    rates, as_of = fx or fx_rates.snapshot()
+
+    for group in groups:
+        currency = (group["currency"] or "").upper()
+        amount = float(group["total"] or 0)
+        factor = fx_factor(rates, currency, home_currency)
+        if factor is None:
+            unconverted.add(currency)
+        converted = None if factor is None else amount * factor
+
+        for buckets, name in (
+            (overall, "all"),
+            (by_category, group["category"] or "uncategorized"),
+            (by_day, group["day"]),
+        ):
+            _bucket(buckets, name, currency, amount, converted, group["entries"])
+
+    total = _rounded(overall.get("all", {"total": 0.0, "by_currency": {}, "entries": 0}))
+    return {
+        "home_currency": home_currency or None,
+        "total": total["total"],
+        "by_currency": total["by_currency"],
+        "entries": total["entries"],
+        "by_category": {
+            category: _rounded(bucket)
+            for category, bucket in sorted(by_category.items())
+        },
+        "by_day": {
+            str(day) if day else None: _rounded(by_day[day])
+            for day in sorted(by_day, key=lambda day: (day is None, str(day)))
+        },
+        "unconverted_currencies": sorted(unconverted),
+        "fx_as_of": as_of,
+    }
+
+
+async def get_budget_summary(trip_id: str, trip: dict) -> dict:
+    """
+    Budget totals of a trip per category, currency and day, plus totals
+    in the trip's home currency
+    """
+    groups, fx = await asyncio.gather(
+        _summary_groups(trip_id, trip.get("time_zone")),
+        fx_rates.snapshot_async()
+    )
+    with timing.stage("rollup"):
+        return {
+            "trip_id": trip_id,
+            **summarize(groups, trip.get("home_currency"), fx)
+        }
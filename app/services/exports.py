@@ -0,0 +1,253 @@
+"""
+Exports Service
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+import contextvars
+from collections import OrderedDict
+from typing import Optional
+from fastapi import HTTPException
+
+from app.configs import config
+import app.services.trips as trips
+
+
+class _ExportJob:
+    __slots__ = (
+        "id", "user_id", "trip_id", "type", "status", "error",
+        "body", "created_at", "finished_at", "expires_at"
+    )
+
+    def __init__(self, user_id: str, trip_id: str, type: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.trip_id = trip_id
+        self.type = type
+        self.status = "pending"
+        self.error = None
+        self.body = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.expires_at = None
+
+    @property
+    def key(self) -> tuple:
+        return self.user_id, self.trip_id, self.type
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "trip_id": self.trip_id,
+            "format": self.type,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.expires_at,
+        }
+
+
+class _ExportJobs:
+    """
+    Export jobs run by a fixed number of worker tasks off a bounded queue.
+    A job identical to one still pending or running returns that job
+    instead of queueing another. Finished jobs (results included) are
+    forgotten `ttl` seconds after they finish, or earlier, oldest first,
+    once more than `max_finished` of them or `max_bytes` of results are kept
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        ttl: float,
+        max_finished: int,
+        max_bytes: int
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.max_bytes = max_bytes
+
+        self._jobs = {}
+        self._active = {}
+        # Finished job ids in the order they finished (and so expire), to
+        # the size of their result
+        self._finished = OrderedDict()
+        self._finished_bytes = 0
+        self._queue = None
+        self._tasks = []
+
+        self.completed = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.evicted = 0
+
+    def _start(self):
+        # Started on first use so the workers live on the serving loop, in
+        # a fresh context: otherwise they would keep the first request's
+        # timings and loader for the life of the process
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._tasks = [
+                asyncio.create_task(
+                    self._worker(), context=contextvars.Context()
+                )
+                for _ in range(self.workers)
+            ]
+
+    def _forget(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._finished_bytes -= self._finished.pop(job_id, 0)
+
+    def _expire(self):
+        now = time.time()
+        while self._finished:
+            job_id = next(iter(self._finished))
+            expired = self._jobs[job_id].expires_at <= now
+            if not expired and (
+                len(self._finished) <= self.max_finished
+                and self._finished_bytes <= self.max_bytes
+            ):
+                break
+            if not expired:
+                self.evicted += 1
+            self._forget(job_id)
+
+    async def submit(self, user_id: str, trip_id: str, type: str) -> dict:
+        """
+        Queue an export, 503 once `max_pending` jobs are waiting
+        """
+        self._start()
+        self._expire()
+
+        job_id = self._active.get((user_id, trip_id, type))
+        if job_id is not None:
+            self.deduplicated += 1
+            return self._jobs[job_id].as_dict()
+
+        job = _ExportJob(user_id, trip_id, type)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Export queue is full")
+
+        self._jobs[job.id] = job
+        self._active[job.key] = job.id
+        return job.as_dict()
+
+    def get(self, job_id: str, user_id: str) -> Optional[_ExportJob]:
+        """
+        A job, if it exists and belongs to the user
+        """
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            try:
+                body = await trips.export_trip_data(job.trip_id, job.type)
+                if len(body) > self.max_bytes:
+                    job.status, job.error = "failed", "Export is too large to keep"
+                    self.failed += 1
+                else:
+                    job.body, job.status = body, "done"
+                    self.completed += 1
+            except HTTPException as e:
+                job.status, job.error = "failed", e.detail
+                self.failed += 1
+            except Exception:
+                logging.exception("Export job %s failed", job.id)
+                job.status, job.error = "failed", "Export failed"
+                self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                job.expires_at = job.finished_at + self.ttl
+                self._active.pop(job.key, None)
+                self._finished[job.id] = len(job.body or b"")
+                self._finished_bytes += self._finished[job.id]
+                self._expire()
+                self._queue.task_done()
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._active.clear()
+
+    def stats(self) -> dict:
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            "workers": self.workers,
+            "pending": statuses.count("pending"),
+            "running": statuses.count("running"),
+            "done": statuses.count("done"),
+            "completed": self.completed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+            "evicted": self.evicted,
+            "result_bytes": self._finished_bytes,
+        }
+
+
+export_jobs = _ExportJobs(
+    workers=config.EXPORT_JOB_WORKERS,
+    max_pending=config.EXPORT_JOB_MAX_PENDING,
+    ttl=config.EXPORT_JOB_TTL_SECONDS,
+    max_finished=config.EXPORT_JOB_MAX_FINISHED,
+    max_bytes=config.EXPORT_JOB_MAX_RESULT_BYTES
+)
+
+
+async def enqueue_export(user_id: str, trip_id: str, export_type: str = 'html') -> dict:
+    """
+    Queue a background export of a trip, ValueError for an unknown format
+    """
+    trips.export_media_type(export_type)
+    return await export_jobs.submit(user_id, trip_id, export_type)
+
+
+def get_export_job(job_id: str, user_id: str) -> Optional[dict]:
+    """
+    Status of a user's export job
+    """
+    job = export_jobs.get(job_id, user_id)
+    return job.as_dict() if job else None
+
+
+def get_export_result(job_id: str, user_id: str):
+    """
+    (body, media type) of a finished job; None if there is no such job,
+    409 while it is not done
+    """
+    job = export_jobs.get(job_id, user_id)
+    if job is None:
+        return None
+    if job.status != "done":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Export is {job.status}" + (f": {job.error}" if job.error else "")
+        )
+    return job.body, trips.export_media_type(job.type)
+
+
+async def shutdown():
+    """
+    Stop the export job workers
+    """
+    await export_jobs.shutdown()
+
+
+def job_stats() -> dict:
+    return export_jobs.stats()
@@ -2,30 +2,175 @@
 Itinerary Item Service
 """
 
+import asyncio
+import httpx
+from postgrest.exceptions import APIError
+
 from app.configs import config
-from app.database import client as db_client
+from app.models import ItineraryItemCreate
+from app.database import client as db_client, execute
+from app.services import places
+from app.services._conflict_cache import add_created_items
 
 
-async def create_itinerary_item(id, item_data):
+def _subtype(item: ItineraryItemCreate):
+    """
+    (table, row) of the subtype payload carried next to the item fields,
+    (None, None) if there is none
     """
-    Insert query on items
-    """
-    item = {
-        "trip_id": id,
-        "type": item_data["type"],
-        "name": item_data.get("name"),
-        "link": item_data.get("link", None),
-        "cost_amount": item_data.get("cost_amount", None),
-        "cost_currency": item_data.get("cost_currency", None),
-        "start_time": item_data.get("start_time", None),
-        "end_time": item_data.get("end_time", None),
-        "all_day": item_data.get("all_day", False),
-        "status": item_data.get("status", "planned"),
-        "notes": item_data.get("notes", None)
+    present = [
+        table for table in config.DB_SCHEMA.ITEM_SUBTYPES
+        if getattr(item, table) is not None
+    ]
+    if not present:
+        return None, None
+    if len(present) > 1:
+        raise ValueError(f"Only one subtype per item, got {', '.join(present)}")
+
+    table = present[0]
+    # The item id is assigned on insert
+    return table, {
+        key: value for key, value in getattr(item, table).items()
+        if key != "item_id"
     }
 
-    response = db_client.table(
-        config.DB_SCHEMA.ITINERARY_ITEM
-    ).insert(item).execute()
 
+def build_item(id, item_data) -> tuple:
+    """
+    (row, subtype table, subtype row) for an itinerary item insert from an
+    ItineraryItemCreate or anything it validates, ValueError if the item
+    is invalid
+    """
+    item = ItineraryItemCreate.parse(item_data)
+    return (item.row(trip_id=id), *_subtype(item))
+
+
+async def create_itinerary_item(id, item_data):
+    """
+    Insert query on items. An item carrying a subtype payload (a
+    `lodging`, `travel_segment`, `transport_rental` or `event_activity`
+    object) is written together with its subtype row by the
+    create_itinerary_items function, in one call and one transaction
+    """
+    item, table, subtype = build_item(id, item_data)
+
+    if table is None:
+        response = await execute(db_client.table(
+            config.DB_SCHEMA.ITINERARY_ITEM
+        ).insert(item))
+    else:
+        response = await execute(db_client.rpc(
+            "create_itinerary_items",
+            {"entries": [{"item": item, "subtype_table": table, "subtype": subtype}]}
+        ))
+
+    add_created_items(id, response.data or [])
     return response.data
+
+
+async def get_itinerary_item(item_id: str):
+    """
+    Select one on items, with its subtype rows and their places embedded
+    """
+    item = await execute(db_client.table(
+        config.DB_SCHEMA.ITINERARY_ITEM
+    ).select(
+        "*" + "".join(f",{table}(*)" for table in config.DB_SCHEMA.ITEM_SUBTYPES)
+    ).eq("id", item_id))
+
+    if not item.data:
+        return None
+
+    item = unwrap_subtypes(item.data)[0]
+    await places.attach_places([item])
+    return item
+
+
+async def get_item_trip_id(item_id: str):
+    """
+    Trip id of an item, None if there is no such item
+    """
+    item = await execute(db_client.table(
+        config.DB_SCHEMA.ITINERARY_ITEM
+    ).select("trip_id").eq("id", item_id))
+    return item.data[0]["trip_id"] if item.data else None
+
+
+def unwrap_subtypes(rows: list) -> list:
+    """
+    Embedded subtype rows as one object (or None) per item, in place
+    """
+    for item in rows:
+        for table in config.DB_SCHEMA.ITEM_SUBTYPES:
+            # One-to-one embeds come back as a list unless item_id is unique
+            if isinstance(item.get(table), list):
+                item[table] = item[table][0] if item[table] else None
+    return rows
+
+
+async def _insert_chunk(rows: list) -> list:
+    """
+    One multi-row insert; (row, error) per input row, in order. Rows with
+    a subtype go through create_itinerary_items, which writes the whole
+    chunk or none of it
+    """
+    try:
+        if any(table for _, table, _ in rows):
+            response = await execute(db_client.rpc("create_itinerary_items", {
+                "entries": [
+                    {"item": item, "subtype_table": table, "subtype": subtype}
+                    for item, table, subtype in rows
+                ]
+            }))
+        else:
+            response = await execute(db_client.table(
+                config.DB_SCHEMA.ITINERARY_ITEM
+            ).insert([item for item, _, _ in rows]))
+    except APIError as e:
+        return [(None, e.message or "Insert failed")] * len(rows)
+    except httpx.HTTPError as e:
+        # A timeout or dropped connection fails this chunk, not the batch
+        return [(None, f"Insert failed: {str(e) or type(e).__name__}")] * len(rows)
+
+    outcomes = [(row, None) for row in response.data or []]
+    return outcomes + [(None, "Row was not inserted")] * (len(rows) - len(outcomes))
+
+
+async def create_itinerary_items(id, items_data: list) -> list:
+    """
+    Validate and insert a batch of items with one multi-row insert (or
+    create_itinerary_items call, when subtypes are involved) per
+    ITEM_BATCH_CHUNK_SIZE rows. Returns a result per input row in input
+    order; invalid rows are reported without being sent, and a chunk the
+    database rejects (or that never reaches it) fails as a whole
+    """
+    if not isinstance(items_data, list):
+        raise ValueError("Expected a list of items")
+    if len(items_data) > config.ITEM_BATCH_MAX_SIZE:
+        raise ValueError(
+            f"A batch is limited to {config.ITEM_BATCH_MAX_SIZE} items"
+        )
+
+    results = [None] * len(items_data)
+    valid = []
+    for index, item_data in enumerate(items_data):
+        try:
+            valid.append((index, build_item(id, item_data)))
+        except ValueError as e:
+            results[index] = {"index": index, "ok": False, "error": str(e)}
+
+    size = config.ITEM_BATCH_CHUNK_SIZE
+    chunks = [valid[i:i + size] for i in range(0, len(valid), size)]
+    inserted = await asyncio.gather(*(
+        _insert_chunk([row for _, row in chunk]) for chunk in chunks
+    ))
+
+    for chunk, outcomes in zip(chunks, inserted):
+        for (index, _), (row, error) in zip(chunk, outcomes):
+            if error is None:
+                results[index] = {"index": index, "ok": True, "item": row}
+            else:
+                results[index] = {"index": index, "ok": False, "error": error}
+
+    add_created_items(id, [result["item"] for result in results if result["ok"]])
+    return results
@@ -0,0 +1,146 @@
+"""
+Places Service
+"""
+
+from typing import Optional
+
+from app.configs import config
+from app.database import client as db_client, execute
+from app.utils.loader import get_loader
+from app.utils.pagination import keyset_filter
+from app.services._places_catalog import PlaceCatalog
+
+
+# Place references of each item subtype; the resolved place is attached
+# under the column name without its `_id` suffix
+PLACE_REFS = {
+    config.DB_SCHEMA.LODGING: ("place_id",),
+    config.DB_SCHEMA.TRAVEL_SEGMENT: ("origin_id", "destination_id"),
+    config.DB_SCHEMA.TRANSPORT_RENTAL: ("pickup_place_id", "dropoff_place_id"),
+    config.DB_SCHEMA.EVENT_ACTIVITY: ("venue_id",),
+}
+
+
+async def _load_places(ids: list) -> dict:
+    places = await execute(db_client.table(
+        config.DB_SCHEMA.PLACE
+    ).select("*").in_("id", ids))
+    return {place["id"]: place for place in places.data}
+
+
+def place_loader():
+    """
+    The request's place loader: `await place_loader().load(place_id)`
+    anywhere in a request and the lookups go out as one in() query
+    """
+    return get_loader(config.DB_SCHEMA.PLACE, _load_places)
+
+
+async def get_place(place_id: str):
+    return await place_loader().load(place_id)
+
+
+async def attach_places(items: list) -> list:
+    """
+    Resolve the place references of the items' embedded subtype rows in
+    place, with one query for all of them
+    """
+    refs = [
+        (row, column)
+        for item in items
+        for table, columns in PLACE_REFS.items()
+        for row in _rows(item.get(table))
+        for column in columns
+        if row.get(column)
+    ]
+    places = await place_loader().load_many([row[column] for row, column in refs])
+    for (row, column), place in zip(refs, places):
+        row[column[:-len("_id")]] = place
+    return items
+
+
+def _rows(value) -> list:
+    # One-to-one embeds are objects, or lists if item_id isn't unique
+    if isinstance(value, dict):
+        return [value]
+    return value or []
+
+
+async def _fetch_changed(watermark: Optional[tuple]) -> list:
+    """
+    Places changed after the (updated_at, id) watermark, all of them if
+    there is none, fetched in keyset pages of PLACE_CATALOG_FETCH_BATCH
+    rows. Paging stops on an empty page rather than a short one, since
+    PostgREST's max-rows may cap a page below the batch size
+    """
+    rows = []
+    while True:
+        query = db_client.table(config.DB_SCHEMA.PLACE).select(
+            "id,name,address,lat,lng,time_zone,updated_at"
+        )
+        if watermark is not None:
+            query = query.or_(keyset_filter("updated_at", *watermark))
+
+        page = await execute(
+            query.order("updated_at", nullsfirst=False).order("id")
+            .limit(config.PLACE_CATALOG_FETCH_BATCH)
+        )
+        if not page.data:
+            return rows
+        rows.extend(page.data)
+        watermark = (page.data[-1].get("updated_at"), page.data[-1]["id"])
+
+
+catalog = PlaceCatalog(
+    _fetch_changed,
+    cell_degrees=config.PLACE_GRID_DEGREES,
+    refresh_seconds=config.PLACE_CATALOG_REFRESH_SECONDS,
+    full_refresh_seconds=config.PLACE_CATALOG_FULL_REFRESH_SECONDS
+)
+
+
+def _check_point(lat: float, lng: float):
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        raise ValueError("lat must be within [-90, 90] and lng within [-180, 180]")
+
+
+async def places_near(lat: float, lng: float, radius_km: float, limit: int = 20) -> list:
+    """
+    Places within `radius_km` of a point, closest first
+    """
+    _check_point(lat, lng)
+    await catalog.ensure_fresh()
+    return catalog.near(lat, lng, radius_km, limit)
+
+
+async def suggest_places(lat: float, lng: float, k: int = 5) -> list:
+    """
+    The `k` places closest to a point, e.g. to offer when adding lodging
+    or an event near another item
+    """
+    _check_point(lat, lng)
+    await catalog.ensure_fresh()
+    return catalog.nearest(lat, lng, k)
+
+
+async def distances_km(lat: float, lng: float, place_ids: list) -> dict:
+    """
+    Distance from a point to each of `place_ids`; unknown places and
+    places without coordinates are None
+    """
+    _check_point(lat, lng)
+    await catalog.ensure_fresh()
+    return catalog.distances_to(lat, lng, place_ids)
+
+
+async def place_ids(limit: int = 1) -> list:
+    """
+    Up to `limit` known place ids, from the catalog rather than a scan of
+    the place table
+    """
+    await catalog.ensure_fresh()
+    return catalog.ids(limit)
+
+
+def catalog_stats() -> dict:
+    return catalog.stats()
@@ -0,0 +1,173 @@
+"""
+Search Service
+"""
+
+import re
+import heapq
+from postgrest.exceptions import APIError
+
+from app.configs import config
+from app.database import client as db_client, execute
+from app.utils import timing
+from app.utils.pagination import quote
+import app.services.trips as trips
+
+
+_WORD = re.compile(r"\w+")
+
+# Field weights, mirroring the A / B / C weights of the search vectors
+_TRIP_FIELDS = (("title", 1.0), ("notes", 0.4))
+_ITEM_FIELDS = (("name", 1.0), ("notes", 0.4), ("link", 0.2))
+
+
+def parse_terms(q: str) -> list:
+    """
+    Lowercased words of a query, deduped, ValueError if there are none
+    """
+    terms = list(dict.fromkeys(_WORD.findall((q or "").lower())))
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    return terms[:config.SEARCH_MAX_TERMS]
+
+
+def _tsquery(terms: list) -> str:
+    # Every word must match, each as a prefix
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+async def search(user_id: str, q: str, limit: int = 20) -> list:
+    """
+    The user's trips and itinerary items matching every word of `q` as a
+    prefix, best matches first. Runs as Postgres full-text search through
+    search_trips; without that function, falls back to ilike filters
+    ranked here
+    """
+    terms = parse_terms(q)
+    limit = max(1, min(limit, config.SEARCH_MAX_RESULTS))
+
+    try:
+        results = await execute(db_client.rpc("search_trips", {
+            "p_user_id": user_id,
+            "p_query": _tsquery(terms),
+            "p_limit": limit,
+        }))
+        return results.data
+    except APIError as e:
+        # PGRST202: no such function
+        if e.code != "PGRST202":
+            raise
+
+    return await _search_unindexed(user_id, terms, limit)
+
+
+def _patterns(terms: list) -> list:
+    # A word starting with the term is the term not preceded by a word
+    # character, since terms are made of word characters only
+    return [re.compile(r"(?<!\w)" + re.escape(term)) for term in terms]
+
+
+def _score(row: dict, fields: tuple, patterns: list) -> float:
+    """
+    Sum of field weights per term, for fields with a word starting with
+    the term; 0 if any term matches nowhere
+    """
+    texts = [
+        (str(row.get(field) or "").lower(), weight) for field, weight in fields
+    ]
+    score = 0.0
+    for pattern in patterns:
+        term_score = sum(weight for text, weight in texts if pattern.search(text))
+        if not term_score:
+            return 0.0
+        score += term_score
+    return score
+
+
+def _snippet(row: dict, fields: tuple) -> str:
+    return " ".join(str(row[field]) for field, _ in fields if row.get(field))[:160]
+
+
+def _hit(kind: str, row: dict, rank: float) -> dict:
+    if kind == "trip":
+        return {
+            "kind": "trip",
+            "id": row["id"],
+            "trip_id": row["id"],
+            "title": row.get("title"),
+            "snippet": _snippet(row, _TRIP_FIELDS),
+            "rank": rank,
+        }
+    return {
+        "kind": "item",
+        "id": row["id"],
+        "trip_id": row["trip_id"],
+        "title": row.get("name"),
+        "snippet": _snippet(row, _ITEM_FIELDS),
+        "rank": rank,
+    }
+
+
+def _best(ranked, limit: int) -> list:
+    """
+    The `limit` best of (rank, kind, row) triples with a positive rank
+    """
+    return heapq.nsmallest(
+        limit,
+        (hit for hit in ranked if hit[0] > 0),
+        key=lambda hit: (-hit[0], hit[2]["id"])
+    )
+
+
+async def _matching_items(user_id: str, terms: list):
+    """
+    Items of the user's trips with every term somewhere in their fields,
+    in keyset pages of PAGE_SIZE_MAX rows ordered by id. Paging stops on
+    an empty page, since PostgREST's max-rows may cap a page below the size
+    """
+    trip = config.DB_SCHEMA.TRIP
+    last_id = None
+    while True:
+        # Scoped by owner through the trip join rather than a list of trip
+        # ids, which would grow the URL with the user's trip count
+        query = db_client.table(config.DB_SCHEMA.ITINERARY_ITEM).select(
+            f"id,trip_id,name,notes,link,{trip}!inner(owner_user_id)"
+        ).eq(f"{trip}.owner_user_id", user_id)
+        for term in terms:
+            pattern = quote(f"*{term}*")
+            query = query.or_(",".join(
+                f"{field}.ilike.{pattern}" for field, _ in _ITEM_FIELDS
+            ))
+        if last_id is not None:
+            query = query.gt("id", last_id)
+
+        page = await execute(query.order("id").limit(config.PAGE_SIZE_MAX))
+        if not page.data:
+            return
+        yield page.data
+        last_id = page.data[-1]["id"]
+
+
+async def _search_unindexed(user_id: str, terms: list, limit: int) -> list:
+    """
+    Every trip and every ilike candidate item ranked here, page by page,
+    keeping only the best `limit` between pages; snippets are built for
+    those alone
+    """
+    user_trips = await trips.get_trips(user_id)
+    if not user_trips:
+        return []
+
+    patterns = _patterns(terms)
+    with timing.stage("rank"):
+        best = _best((
+            (_score(trip, _TRIP_FIELDS, patterns), "trip", trip)
+            for trip in user_trips
+        ), limit)
+
+    async for items in _matching_items(user_id, terms):
+        with timing.stage("rank"):
+            best = _best([*best, *(
+                (_score(item, _ITEM_FIELDS, patterns), "item", item)
+                for item in items
+            )], limit)
+    return [_hit(kind, row, rank) for rank, kind, row in best]
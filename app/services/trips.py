@@ -2,44 +2,129 @@
 Trips Service
 """
 
-from typing import Optional
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence
 from fastapi import HTTPException
+from postgrest.exceptions import APIError
 
 from app.configs import config
-from app.database import client as db_client
+from app.models import TripCreate, TripUpdate
+from app.database import client as db_client, execute
+from app.utils import timing
+from app.utils.pagination import (
+    page_size, decode_cursor, keyset_filter, build_page, quote
+)
+from app.utils.projection import select_columns
+from app.services._trips_cache import trip_cache
+from app.services._exports_cache import export_cache
 from app.services._trips_formatting import trip_formatter
+from app.services import _export_pool
+from app.services import places
+from app.services.items import unwrap_subtypes
+from app.services import _itinerary_calendar as calendar
+from app.services._itinerary_conflicts import ConflictIndex
+from app.services._conflict_cache import conflict_indexes
 
 
-async def get_trips(user_id: str) -> list:
+def _project(row: dict, fields: Optional[Sequence[str]]) -> dict:
+    if not fields:
+        return row
+    return {field: row.get(field) for field in fields}
+
+
+def cache_stats() -> dict:
     """
-    Select multiple query (trip(s) given user)
+    Hit ratio and eviction counters of the trip cache
     """
-    trips = db_client.table(
-        config.DB_SCHEMA.TRIP
-    ).select("*").eq("owner_user_id", user_id).execute()
-    return trips.data
+    return trip_cache.stats()
 
 
-async def create_trip(user_id: str, trip_data: dict):
+async def get_trips(
+    user_id: str,
+    fields: Optional[Sequence[str]] = None
+) -> list:
     """
-    Insert query on trips
+    Select multiple query (trip(s) given user), read through the trip cache
     """
-    try:
-        # Prepare the trip data
-        trip = {
-            "title": trip_data["title"],
-            "description": trip_data["description"],
-            "start_date": trip_data["start_date"],
-            "end_date": trip_data["end_date"],
-            "home_currency": trip_data["home_currency"],
-            "time_zone": trip_data["time_zone"],
-            "notes": trip_data["notes"]
-        }
+    # Validates `fields`; full rows are cached and projected per call
+    select_columns(config.DB_SCHEMA.TRIP, fields)
+
+    async def load():
+        trips = await execute(db_client.table(
+            config.DB_SCHEMA.TRIP
+        ).select("*").eq("owner_user_id", user_id))
+        return trips.data
+
+    trips = await trip_cache.get_or_load(trip_cache.user_key(user_id), load)
+    return [_project(trip, fields) for trip in trips]
+
+
+async def get_trips_page(
+    user_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
+) -> dict:
+    """
+    Keyset page of a user's trips, ordered by (created_at, id), read
+    through the trip cache
+    """
+    size = page_size(limit)
+    columns = select_columns(
+        config.DB_SCHEMA.TRIP, fields, ("id", "created_at", "updated_at")
+    )
+    after = decode_cursor("trip", cursor) if cursor else None
+
+    async def load():
+        query = db_client.table(
+            config.DB_SCHEMA.TRIP
+        ).select(columns).eq("owner_user_id", user_id)
+
+        if after:
+            query = query.or_(keyset_filter("created_at", *after))
+
+        trips = await execute(
+            query.order("created_at").order("id").limit(size + 1)
+        )
+        return build_page("trip", trips.data, size, "created_at")
 
+    return await trip_cache.get_or_load_page(
+        user_id, (size, cursor, columns), load
+    )
+
+
+async def iter_trips(
+    user_id: str,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+):
+    """
+    Stream all of a user's trips page by page
+    """
+    cursor = None
+    while True:
+        page = await get_trips_page(user_id, limit, cursor, fields)
+        for trip in page["items"]:
+            yield trip
+
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+async def create_trip(user_id: str, trip_data):
+    """
+    Insert query on trips; `trip_data` is a TripCreate or anything it
+    validates, ValueError if it is invalid
+    """
+    trip = TripCreate.parse(trip_data).row(owner_user_id=user_id)
+
+    try:
         # Insert the trip into the database
-        response = db_client.table(
+        response = await execute(db_client.table(
             config.DB_SCHEMA.TRIP
-        ).insert({**trip, "owner_user_id": user_id}).execute()
+        ).insert(trip))
 
         # Check if the response contains data or if it's empty
         if not response.data or (
@@ -47,6 +132,8 @@ async def create_trip(user_id: str, trip_data: dict):
         ):
             raise Exception(f"Failed to create trip: No data returned.")
 
+        await trip_cache.invalidate(*trip_cache.user_keys(user_id))
+
         # Return the inserted trip data
         return response.data
 
@@ -58,38 +145,168 @@ async def create_trip(user_id: str, trip_data: dict):
         )
     
 
-async def get_trip(trip_id: str) -> Optional[dict]:
+async def get_trip(
+    trip_id: str,
+    fields: Optional[Sequence[str]] = None
+) -> Optional[dict]:
     """
-    Select one query on trips
+    Select one query on trips, read through the trip cache
     """
-    trip = db_client.table(
-        config.DB_SCHEMA.TRIP
-    ).select("*").eq("id", trip_id).execute()
-    
-    if trip.data is None or (
-        isinstance(trip.data, list) and len(trip.data) == 0
-    ):
-        # no trip found with trip id
+    select_columns(config.DB_SCHEMA.TRIP, fields)
+
+    async def load():
+        trip = await execute(db_client.table(
+            config.DB_SCHEMA.TRIP
+        ).select("*").eq("id", trip_id))
+
+        if trip.data is None or (
+            isinstance(trip.data, list) and len(trip.data) == 0
+        ):
+            # no trip found with trip id
+            return None
+
+        return trip.data[0]
+
+    trip = await trip_cache.get_or_load(trip_cache.trip_key(trip_id), load)
+    return None if trip is None else _project(trip, fields)
+
+
+async def get_owned_trip(trip_id: str, user_id: str) -> Optional[dict]:
+    """
+    The full trip row if it exists and belongs to the user, None otherwise;
+    callers answer 404 either way so other users' trip ids don't leak
+    """
+    trip = await get_trip(trip_id)
+    if trip is None or trip.get("owner_user_id") != user_id:
         return None
-    
-    return trip.data[0]
+    return trip
 
 
-async def update_trip(trip_id: str, trip_data: dict):
+BUNDLE_INCLUDES = ("itinerary", "budget", "documents", "subtypes", "places")
+
+_SUBTYPE_TABLES = config.DB_SCHEMA.ITEM_SUBTYPES
+
+
+def _bundle_select(include: set, fields: Optional[Sequence[str]]) -> str:
+    parts = [select_columns(config.DB_SCHEMA.TRIP, fields)]
+
+    if "itinerary" in include:
+        item_columns = "*"
+        if "subtypes" in include:
+            item_columns += "".join(f",{table}(*)" for table in _SUBTYPE_TABLES)
+        parts.append(f"itinerary:{config.DB_SCHEMA.ITINERARY_ITEM}({item_columns})")
+    if "budget" in include:
+        parts.append(f"budget:{config.DB_SCHEMA.BUDGET_ENTRY}(*)")
+    if "documents" in include:
+        parts.append(f"documents:{config.DB_SCHEMA.REQUIRED_DOCUMENT}(*)")
+
+    return ",".join(parts)
+
+
+async def get_trip_bundle(
+    trip_id: str,
+    include: Sequence[str] = BUNDLE_INCLUDES,
+    fields: Optional[Sequence[str]] = None
+) -> Optional[dict]:
     """
-    Wrapper over update query on trips
+    Trip with its related rows in one round trip, through PostgREST
+    embedded selects. Falls back to concurrent queries if the database
+    doesn't expose the relationships. `places` resolves the subtypes'
+    place references with one more query
     """
+    include = set(include)
+    unknown = include.difference(BUNDLE_INCLUDES)
+    if unknown:
+        raise ValueError(f"Unknown includes: {', '.join(sorted(unknown))}")
+    if "places" in include:
+        include.add("subtypes")
+    if "subtypes" in include:
+        include.add("itinerary")
+
+    query = db_client.table(
+        config.DB_SCHEMA.TRIP
+    ).select(_bundle_select(include, fields)).eq("id", trip_id)
+    if "itinerary" in include:
+        query = query.order("start_time", foreign_table="itinerary")
+
     try:
-        updated_trip = {
-            key: value for key, value in trip_data.items() if value is not None
-        }
+        bundle = await execute(query)
+        bundle = bundle.data[0] if bundle.data else None
+    except APIError as e:
+        # PGRST200: no relationship found between the tables
+        if e.code != "PGRST200":
+            raise
+        bundle = await _get_trip_bundle_concurrently(trip_id, include, fields)
+
+    if bundle and "subtypes" in include:
+        unwrap_subtypes(bundle["itinerary"])
+    if bundle and "places" in include:
+        await places.attach_places(bundle["itinerary"])
+    return bundle
+
+
+async def _get_trip_bundle_concurrently(
+    trip_id: str,
+    include: set,
+    fields: Optional[Sequence[str]]
+) -> Optional[dict]:
+    queries = {
+        "trip": db_client.table(config.DB_SCHEMA.TRIP).select(
+            select_columns(config.DB_SCHEMA.TRIP, fields)
+        ).eq("id", trip_id)
+    }
+    if "itinerary" in include:
+        queries["itinerary"] = db_client.table(
+            config.DB_SCHEMA.ITINERARY_ITEM
+        ).select("*").eq("trip_id", trip_id).order("start_time")
+    if "budget" in include:
+        queries["budget"] = db_client.table(
+            config.DB_SCHEMA.BUDGET_ENTRY
+        ).select("*").eq("trip_id", trip_id)
+    if "documents" in include:
+        queries["documents"] = db_client.table(
+            config.DB_SCHEMA.REQUIRED_DOCUMENT
+        ).select("*").eq("trip_id", trip_id)
+
+    responses = await asyncio.gather(*(execute(q) for q in queries.values()))
+    results = dict(zip(queries, (response.data for response in responses)))
+    if not results["trip"]:
+        return None
+
+    bundle = results.pop("trip")[0]
+    bundle.update(results)
+
+    if "subtypes" in include and bundle["itinerary"]:
+        item_ids = [item["id"] for item in bundle["itinerary"]]
+        subtypes = await asyncio.gather(*(
+            execute(db_client.table(table).select("*").in_("item_id", item_ids))
+            for table in _SUBTYPE_TABLES
+        ))
+        for table, rows in zip(_SUBTYPE_TABLES, subtypes):
+            by_item = {row["item_id"]: row for row in rows.data}
+            for item in bundle["itinerary"]:
+                item[table] = by_item.get(item["id"])
+
+    return bundle
+
+
+async def update_trip(trip_id: str, trip_data):
+    """
+    Wrapper over update query on trips; `trip_data` is a TripUpdate or
+    anything it validates, ValueError if it is invalid
+    """
+    updated_trip = TripUpdate.parse(trip_data).changes()
 
-        if not updated_trip:
-            raise HTTPException(status_code=400, detail="No data to update")
+    if not updated_trip:
+        raise HTTPException(status_code=400, detail="No data to update")
 
-        response = db_client.table(
+    try:
+        # Bumping the version is what changes the trip's ETag
+        updated_trip["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+        response = await execute(db_client.table(
             config.DB_SCHEMA.TRIP
-        ).update(updated_trip).eq("id", trip_id).execute()
+        ).update(updated_trip).eq("id", trip_id))
 
         if not response.data:
             raise HTTPException(
@@ -97,8 +314,16 @@ async def update_trip(trip_id: str, trip_data: dict):
                 detail="Trip not found or failed to update"
             )
 
+        await trip_cache.invalidate(trip_cache.trip_key(trip_id), *(
+            key
+            for trip in response.data if trip.get("owner_user_id")
+            for key in trip_cache.user_keys(trip["owner_user_id"])
+        ))
+
         return response.data
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -106,37 +331,377 @@ async def update_trip(trip_id: str, trip_data: dict):
         )
 
 
-async def get_itinerary(trip_id: str):
+def _date_range(date_from: Optional[str], date_to: Optional[str]):
     """
-    Select multiple on trips, ordered by start
+    Inclusive (first, last) days of a [from, to) query, ValueError if the
+    dates are malformed, reversed or too far apart
     """
-    itinerary = db_client.table(
+    first = calendar.parse_day(date_from, "from")
+    end = calendar.parse_day(date_to, "to")
+    last = end - timedelta(days=1) if end else None
+
+    if first and end:
+        if end <= first:
+            raise ValueError("to must be after from")
+        if (end - first).days > config.ITINERARY_RANGE_MAX_DAYS:
+            raise ValueError(
+                f"Date range is limited to {config.ITINERARY_RANGE_MAX_DAYS} days"
+            )
+    return first, last
+
+
+async def get_itinerary(
+    trip_id: str,
+    fields: Optional[Sequence[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    time_zone: Optional[str] = None
+):
+    """
+    Select multiple on trips, ordered by start. With `date_from` /
+    `date_to` (YYYY-MM-DD, `to` exclusive, days in `time_zone`) only items
+    overlapping that window are returned; the window is pushed down as
+    gte / lt filters, a day wider on each side so all-day items stored
+    in UTC are not cut off, and trimmed exactly here
+    """
+    first, last = _date_range(date_from, date_to)
+    ranged = first is not None or last is not None
+
+    columns = select_columns(
+        config.DB_SCHEMA.ITINERARY_ITEM,
+        fields,
+        ("start_time", "end_time", "all_day") if ranged and fields else ()
+    )
+    query = db_client.table(
         config.DB_SCHEMA.ITINERARY_ITEM
-    ).select("*").eq("trip_id", trip_id).order("start_time").execute()
-    return itinerary.data
+    ).select(columns).eq("trip_id", trip_id)
 
+    zone = calendar.trip_zone(time_zone)
+    if first is not None:
+        lower = quote(calendar.utc_stamp(
+            calendar.local_midnight(first - timedelta(days=1), zone)
+        ))
+        # Items still running at the window start count, not just those
+        # starting inside it
+        query = query.or_(
+            f"end_time.gte.{lower},and(end_time.is.null,start_time.gte.{lower})"
+        )
+    if last is not None:
+        query = query.lt("start_time", calendar.utc_stamp(
+            calendar.local_midnight(last + timedelta(days=2), zone)
+        ))
 
-async def export_trip_data(trip_id: str, export_type: str = 'html'): # should be a base model
+    itinerary = await execute(query.order("start_time"))
+    if not ranged:
+        return itinerary.data
+    return [
+        item for item in itinerary.data
+        if calendar.overlaps(item, zone, first, last)
+    ]
+
+
+async def get_itinerary_buckets(
+    trip_id: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    bucket: str = "day",
+    fields: Optional[Sequence[str]] = None
+) -> Optional[dict]:
     """
-    Export trip data in html format
+    Itinerary grouped into day or week buckets in the trip's time zone,
+    optionally limited to [date_from, date_to). Items spanning several
+    days appear in each of their buckets
     """
-    # Fetch trip details
-    trip = db_client.table(
-        config.DB_SCHEMA.TRIP
-    ).select("*").eq("id", trip_id).single().execute()
-    if not trip.data:
-        raise HTTPException(status_code=404, detail="Trip not found")
+    if bucket not in calendar.BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(calendar.BUCKETS)}")
+    first, last = _date_range(date_from, date_to)
+
+    if fields:
+        fields = list(dict.fromkeys(
+            [*fields, "id", "start_time", "end_time", "all_day"]
+        ))
+
+    trip = await get_trip(trip_id)
+    if trip is None:
+        return None
 
-    # Fetch itinerary items
-    itinerary = db_client.table(
+    itinerary = await get_itinerary(
+        trip_id, fields, date_from, date_to, trip.get("time_zone")
+    )
+    zone = calendar.trip_zone(trip.get("time_zone"))
+    return {
+        "time_zone": trip.get("time_zone") or "UTC",
+        "bucket": bucket,
+        "from": date_from,
+        "to": date_to,
+        **calendar.bucket_items(itinerary, zone, bucket, first, last),
+    }
+
+
+async def get_itinerary_page(
+    trip_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
+) -> dict:
+    """
+    Keyset page of a trip's itinerary, ordered by (start_time, id)
+    """
+    size = page_size(limit)
+    query = db_client.table(
         config.DB_SCHEMA.ITINERARY_ITEM
-    ).select("*").eq("trip_id", trip_id).order("start_time").execute()
+    ).select(
+        select_columns(
+            config.DB_SCHEMA.ITINERARY_ITEM, fields, ("id", "start_time")
+        )
+    ).eq("trip_id", trip_id)
 
-    # Combine all data into a single dictionary
-    export_file = trip_formatter.format(
-        trip.data,
-        itinerary.data,
-        type=export_type
+    if cursor:
+        start_time, last_id = decode_cursor("itinerary", cursor)
+        query = query.or_(keyset_filter("start_time", start_time, last_id))
+
+    itinerary = await execute(
+        query.order("start_time", nullsfirst=False).order("id").limit(size + 1)
     )
+    return build_page("itinerary", itinerary.data, size, "start_time")
+
+
+async def iter_itinerary(
+    trip_id: str,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+):
+    """
+    Stream a trip's itinerary page by page
+    """
+    cursor = None
+    while True:
+        page = await get_itinerary_page(trip_id, limit, cursor, fields)
+        for item in page["items"]:
+            yield item
+
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+_CONFLICT_COLUMNS = "id,type,name,start_time,end_time,all_day,updated_at"
+
+
+async def _conflict_index(trip_id: str, time_zone: Optional[str]) -> ConflictIndex:
+    """
+    The trip's conflict index, kept between requests. Items created
+    through the items service are added to a kept index as they are
+    written, so a kept index is only checked against one counted row
+    (the most recently stamped item); anything changed elsewhere makes it
+    stale and the index is rebuilt from all the trip's items
+    """
+    zone = calendar.trip_zone(time_zone)
+
+    index = conflict_indexes.get(trip_id)
+    if index is not None and index.zone == zone:
+        newest = await execute(db_client.table(
+            config.DB_SCHEMA.ITINERARY_ITEM
+        ).select("id,updated_at", count="exact").eq("trip_id", trip_id).order(
+            "updated_at", desc=True, nullsfirst=False
+        ).limit(1))
+        if index.is_current(
+            getattr(newest, "count", None),
+            newest.data[0] if newest.data else None
+        ):
+            return index
+
+    items = await execute(db_client.table(
+        config.DB_SCHEMA.ITINERARY_ITEM
+    ).select(_CONFLICT_COLUMNS).eq("trip_id", trip_id))
+    with timing.stage("index"):
+        index = ConflictIndex(zone, items.data)
+    conflict_indexes.set(trip_id, index)
+    return index
+
+
+async def get_itinerary_conflicts(trip_id: str) -> Optional[dict]:
+    """
+    Overlapping items and nights without lodging between the trip's
+    start and end dates
+    """
+    trip = await get_trip(trip_id)
+    if trip is None:
+        return None
+
+    index = await _conflict_index(trip_id, trip.get("time_zone"))
+    return {
+        "trip_id": trip_id,
+        "time_zone": trip.get("time_zone") or "UTC",
+        "conflicts": index.conflicts(),
+        "gaps": index.lodging_gaps(trip.get("start_date"), trip.get("end_date")),
+    }
+
+
+async def _export_version(trip_id: str):
+    """
+    Fresh trip row and a content version from the trip's updated_at and
+    its items' count and latest updated_at. The item side is one row
+    counted by the database, so the cost doesn't grow with the itinerary
+    (a delete changes the count, an insert or edit the latest stamp)
+    """
+    trip, latest = await asyncio.gather(
+        execute(db_client.table(
+            config.DB_SCHEMA.TRIP
+        ).select("*").eq("id", trip_id)),
+        execute(db_client.table(
+            config.DB_SCHEMA.ITINERARY_ITEM
+        ).select("updated_at", count="exact").eq("trip_id", trip_id).order(
+            "updated_at", desc=True, nullsfirst=False
+        ).limit(1))
+    )
+    if not trip.data:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    trip = trip.data[0]
+    newest = latest.data[0].get("updated_at") if latest.data else None
+    return trip, f"{trip.get('updated_at')}|{getattr(latest, 'count', None)}|{newest}"
+
+
+async def export_trip_data(trip_id: str, export_type: str = 'html'): # should be a base model
+    """
+    Encoded export body, served from the export cache while nothing
+    changed
+    """
+    trip_formatter.media_type(export_type)
+    trip, version = await _export_version(trip_id)
+
+    with timing.stage("render"):
+        return await _export_one(trip, export_type, version)
 
-    return export_file
+
+async def _export_one(trip: dict, export_type: str, version: str) -> bytes:
+    """
+    Cached render of one trip, rendered in the export process pool on a
+    miss
+    """
+    cached = await export_cache.get(trip["id"], export_type, version)
+    if cached is not None:
+        return cached
+
+    itinerary = [
+        item async for item in iter_itinerary(trip["id"], config.PAGE_SIZE_MAX)
+    ]
+    body = await _export_pool.render(trip, itinerary, export_type)
+    await export_cache.put(trip["id"], export_type, version, body)
+    return body
+
+
+async def export_trips_batch(
+    user_id: str,
+    trip_ids: Optional[Sequence[str]] = None,
+    export_type: str = 'html'
+) -> list:
+    """
+    Export several of a user's trips (all of them by default) as a list of
+    (trip, body) pairs. Unchanged trips come from the export cache; the
+    rest are rendered across the export process pool, a bounded number
+    at a time
+    """
+    trip_formatter.media_type(export_type)
+
+    owned = [trip["id"] async for trip in iter_trips(user_id, fields=["id"])]
+    if trip_ids is not None:
+        wanted = set(trip_ids)
+        owned = [trip_id for trip_id in owned if trip_id in wanted]
+    if len(owned) > config.EXPORT_BATCH_MAX_TRIPS:
+        raise ValueError(
+            f"Batch export is limited to {config.EXPORT_BATCH_MAX_TRIPS} trips"
+        )
+
+    semaphore = asyncio.Semaphore(config.EXPORT_BATCH_CONCURRENCY)
+
+    async def export(trip_id: str):
+        async with semaphore:
+            trip, version = await _export_version(trip_id)
+            return trip, await _export_one(trip, export_type, version)
+
+    with timing.stage("render"):
+        return await asyncio.gather(*(export(trip_id) for trip_id in owned))
+
+
+def shutdown_exports():
+    """
+    Stop the export worker processes
+    """
+    _export_pool.shutdown()
+
+
+def export_media_type(export_type: str) -> str:
+    """
+    Content type of an export format, ValueError if it is unsupported
+    """
+    return trip_formatter.media_type(export_type)
+
+
+async def _cached_chunks(body: bytes):
+    yield body
+
+
+async def _caching_chunks(chunks, trip_id: str, export_type: str, version: str):
+    """
+    Pass chunks through, keeping a copy for the export cache: in memory
+    while the render is small, written through to a spill file beyond
+    that (or given up if the cache doesn't spill)
+    """
+    writer = export_cache.writer(trip_id, export_type, version)
+    try:
+        async for chunk in chunks:
+            await writer.write(chunk.encode())
+            yield chunk
+        await writer.commit()
+    finally:
+        await writer.discard()
+
+
+async def _rendering(chunks):
+    """
+    Count the time spent producing chunks (page queries included, waiting
+    on the client excluded) as the request's render stage
+    """
+    iterator = chunks.__aiter__()
+    while True:
+        with timing.stage("render"):
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+        yield chunk
+
+
+async def stream_trip_export(trip_id: str, export_type: str = 'html'):
+    """
+    Export as an async iterator of chunks; the trip is fetched up front so
+    a missing trip is a 404 before anything is sent, and the itinerary is
+    streamed page by page straight into the formatter. Unchanged trips
+    are served from the export cache without rendering
+    """
+    trip_formatter.media_type(export_type)
+    trip, version = await _export_version(trip_id)
+
+    cached = await export_cache.get(trip_id, export_type, version)
+    if cached is not None:
+        return _cached_chunks(cached)
+
+    return _rendering(_caching_chunks(
+        trip_formatter.stream(
+            trip,
+            iter_itinerary(trip_id, config.PAGE_SIZE_MAX),
+            type=export_type
+        ),
+        trip_id,
+        export_type,
+        version
+    ))
+
+
+def export_cache_stats() -> dict:
+    """
+    Size and hit counters of the rendered export cache
+    """
+    return export_cache.stats()
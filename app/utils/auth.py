@@ -2,13 +2,96 @@
 Auth Utils
 """
 
-import requests
+import time
+import asyncio
+import hashlib
+import logging
+
+import jwt
+import httpx
 from fastapi import Request, HTTPException
 
 from app.configs import config
+from app.utils import http, timing
+from app.utils.cache import TTLCache
+
+
+_ASYMMETRIC_ALGS = ("RS256", "ES256", "EdDSA")
+
+
+class _JWKSCache:
+    """
+    Signing keys published by Supabase Auth, refreshed in the background
+    """
+
+    def __init__(self, url: str, max_age: float, min_refresh_interval: float = 30):
+        self._url = url
+        self._max_age = max_age
+        self._min_refresh_interval = min_refresh_interval
+        self._keys = {}
+        self._fetched_at = float("-inf")
+        self._refresh_task = None
+
+    async def get_key(self, kid: str):
+        """
+        Key for `kid`, fetching the key set again if it was rotated
+        """
+        key = self._keys.get(kid)
+        age = time.monotonic() - self._fetched_at
+
+        if key is None:
+            # Unknown kid, the keys may have rotated; wait for a refresh
+            # unless one just ran
+            if age >= self._min_refresh_interval:
+                await asyncio.shield(self._refresh_in_background())
+                key = self._keys.get(kid)
+        elif age >= self._max_age:
+            # Keep serving the current keys while the refresh runs
+            self._refresh_in_background()
+
+        return key
+
+    def _refresh_in_background(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+        return self._refresh_task
+
+    async def refresh(self):
+        """
+        Re-fetch the key set, keeping the old keys on failure
+        """
+        try:
+            res = await http.get(self._url)
+            res.raise_for_status()
+
+            keys = {}
+            for jwk in res.json().get("keys", []):
+                try:
+                    keys[jwk.get("kid")] = jwt.PyJWK(jwk)
+                except jwt.PyJWTError:
+                    logging.warning("Skipping unusable JWK %s", jwk.get("kid"))
+            self._keys = keys
+        except (httpx.HTTPError, ValueError):
+            logging.exception("Failed to refresh JWKS")
+        finally:
+            self._fetched_at = time.monotonic()
 
 
-def _get_current_user_id(request: Request) -> str:
+_jwks = _JWKSCache(config.JWKS_URL, config.JWKS_MAX_AGE_SECONDS)
+
+# Resolved user ids (or the 401 a token failed with) keyed by token hash
+_token_cache = TTLCache(
+    max_entries=config.AUTH_CACHE_MAX_ENTRIES,
+    ttl=config.AUTH_CACHE_TTL_SECONDS
+)
+_inflight = {}
+
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(status_code=401, detail="Invalid or expired token")
+
+
+def _bearer_token(request: Request) -> str:
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(
@@ -16,9 +99,48 @@ def _get_current_user_id(request: Request) -> str:
             detail="Missing or invalid Authorization header"
         )
 
-    token = auth_header.split(" ")[1]
+    return auth_header.split(" ")[1]
+
+
+async def _verify_locally(token: str) -> dict:
+    """
+    Check signature, expiry, audience and issuer in-process
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError:
+        raise _invalid_token()
+
+    alg, kid = header.get("alg"), header.get("kid")
+    if alg == "HS256" and config.SUPABASE_JWT_SECRET:
+        key = config.SUPABASE_JWT_SECRET
+    elif alg in _ASYMMETRIC_ALGS:
+        jwk = await _jwks.get_key(kid)
+        if jwk is None or jwk.algorithm_name != alg:
+            raise _invalid_token()
+        key = jwk.key
+    else:
+        raise _invalid_token()
+
+    try:
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[alg],
+            audience=config.JWT_AUDIENCE,
+            issuer=config.JWT_ISSUER,
+            leeway=config.JWT_LEEWAY_SECONDS,
+            options={"require": ["exp", "sub"]}
+        )
+    except jwt.PyJWTError:
+        raise _invalid_token()
 
-    res = requests.get(
+
+async def _introspect_remotely(token: str) -> dict:
+    """
+    Ask Supabase Auth who the token belongs to
+    """
+    res = await http.get(
         f"{config.SUPABASE_URL}/auth/v1/user",
         headers={
             "Authorization": f"Bearer {token}",
@@ -27,13 +149,90 @@ def _get_current_user_id(request: Request) -> str:
     )
 
     if res.status_code != 200:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+        raise _invalid_token()
+
+    return res.json()
+
+
+def _seconds_until_expiry(token: str) -> float:
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+        return float(claims["exp"]) - time.time()
+    except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def _verifiable_locally(token: str) -> bool:
+    # HS256 tokens are signed with the project's JWT secret; without it
+    # Supabase Auth checks them instead of every one being rejected
+    if config.SUPABASE_JWT_SECRET:
+        return True
+    try:
+        return jwt.get_unverified_header(token).get("alg") != "HS256"
+    except jwt.PyJWTError:
+        return True
+
+
+async def _resolve_token(token: str) -> str:
+    if config.AUTH_MODE == "remote" or not _verifiable_locally(token):
+        return (await _introspect_remotely(token))["id"]
+
+    return (await _verify_locally(token))["sub"]
+
+
+async def _resolve_and_cache(key: bytes, token: str) -> str:
+    try:
+        user_id = await _resolve_token(token)
+    except HTTPException as e:
+        _token_cache.set(key, e, ttl=config.AUTH_NEGATIVE_TTL_SECONDS)
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+    # Never trust a cached identity past the token's own expiry
+    _token_cache.set(key, user_id, ttl=_seconds_until_expiry(token))
+    return user_id
+
+
+async def _get_current_user_id(request: Request) -> str:
+    token = _bearer_token(request)
+    key = hashlib.sha256(token.encode()).digest()
+
+    cached = _token_cache.get(key)
+    if isinstance(cached, HTTPException):
+        raise HTTPException(status_code=cached.status_code, detail=cached.detail)
+    if cached is not None:
+        return cached
+
+    # Concurrent misses for one token share a single upstream lookup
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_resolve_and_cache(key, token))
+        _inflight[key] = task
+    return await asyncio.shield(task)
+
+
+def check_config():
+    """
+    Warn at startup when local verification lacks the HS256 secret
+    """
+    if config.AUTH_MODE == "local" and not config.SUPABASE_JWT_SECRET:
+        logging.warning(
+            "SUPABASE_JWT_SECRET is not set: HS256 tokens will be checked "
+            "remotely by Supabase Auth instead of in-process"
+        )
+
 
-    return res.json()["id"]
+def token_cache_stats() -> dict:
+    """
+    Hit/miss counters of the token -> user cache
+    """
+    return {**_token_cache.stats(), "inflight": len(_inflight)}
 
-def resolve_user_id(request: Request) -> str:
+async def resolve_user_id(request: Request) -> str:
     try:
-        return _get_current_user_id(request)
+        with timing.stage("auth"):
+            return await _get_current_user_id(request)
     except ValueError as e:
         # Bad/missing auth, surface as 400 (or 401/403 if you prefer)
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,68 @@
+"""
+ETag Utils
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def _tag(*parts) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()}"'
+
+
+def row_etag(row: dict, *variant) -> str:
+    """
+    Strong tag of one row from its id and updated_at; `variant` covers
+    anything else that changes the representation (e.g. fields)
+    """
+    return _tag(row.get("id"), row.get("updated_at"), *variant)
+
+
+def collection_etag(rows: list, *variant) -> str:
+    """
+    Strong tag of a list of rows from each row's id and updated_at
+    """
+    return _tag(
+        *(f"{row.get('id')}@{row.get('updated_at')}" for row in rows),
+        *variant
+    )
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Whether the client's If-None-Match already has `etag`
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    # If-None-Match uses the weak comparison, so ignore W/ prefixes
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=_headers(etag))
+
+
+def tag_response(response: Response, etag: Optional[str]):
+    """
+    Attach validator headers to a 200 response
+    """
+    if etag is not None:
+        response.headers.update(_headers(etag))
+
+
+def _headers(etag: str) -> dict:
+    # Clients may keep the body but have to revalidate before reusing it
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
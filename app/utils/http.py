@@ -0,0 +1,81 @@
+"""
+HTTP Utils
+"""
+
+import asyncio
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.configs import config
+
+
+_client = None
+_host_limits = {}
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=httpx.Timeout(
+            config.HTTP_TIMEOUT_SECONDS,
+            connect=config.HTTP_CONNECT_TIMEOUT_SECONDS
+        )
+    )
+
+
+async def startup():
+    """
+    Open the shared outbound client (app lifespan start)
+    """
+    global _client
+    if _client is None:
+        _client = _build_client()
+
+
+async def shutdown():
+    """
+    Close the shared outbound client (app lifespan end)
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _host_limits.clear()
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Shared keep-alive client, opened lazily outside of the app lifespan
+    """
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send an outbound request through the shared pool, capped per host
+    """
+    host = urlsplit(url).netloc
+    limit = _host_limits.get(host)
+    if limit is None:
+        limit = _host_limits[host] = asyncio.Semaphore(
+            config.HTTP_MAX_CONNECTIONS_PER_HOST
+        )
+
+    async with limit:
+        return await get_client().request(method, url, **kwargs)
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
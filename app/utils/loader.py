@@ -0,0 +1,103 @@
+"""
+Loader Utils
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.configs import config
+
+
+class DataLoader:
+    """
+    Batches and dedupes key lookups. Every `load` issued before the loader
+    next gets to run (e.g. from tasks started by one gather) goes out as a
+    single `batch_fn(keys)` call, at most `max_batch` keys at a time.
+    Results are memoized for the loader's lifetime, so a key is fetched
+    once however many times it is asked for. `batch_fn` returns a dict of
+    key to value; missing keys load as None
+    """
+
+    def __init__(self, batch_fn, max_batch: int = None):
+        self._batch_fn = batch_fn
+        self.max_batch = max_batch or config.LOADER_MAX_BATCH
+        self._futures = {}
+        self._pending = []
+        # The loop only keeps weak references to tasks; without these a
+        # dispatch could be collected before it runs, stranding its loads
+        self._dispatch_tasks = set()
+        self.batches = 0
+
+    async def load(self, key):
+        future = self._futures.get(key)
+        if future is None:
+            future = self._futures[key] = asyncio.get_running_loop().create_future()
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                task = asyncio.ensure_future(self._dispatch())
+                self._dispatch_tasks.add(task)
+                task.add_done_callback(self._dispatch_tasks.discard)
+        # The future is shared with every other caller of the key; a
+        # cancelled caller must not cancel it for them
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys) -> list:
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    async def _dispatch(self):
+        # One more turn of the loop lets loads from sibling tasks join
+        await asyncio.sleep(0)
+        keys, self._pending = self._pending, []
+        await asyncio.gather(*(
+            self._run(keys[i:i + self.max_batch])
+            for i in range(0, len(keys), self.max_batch)
+        ))
+
+    async def _run(self, keys: list):
+        self.batches += 1
+        try:
+            values = await self._batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                # Failures aren't memoized, a later load retries
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+_current = ContextVar("request_loaders", default=None)
+
+
+@contextmanager
+def request_scope():
+    """
+    Share loaders (and what they loaded) across the request handled
+    inside the block
+    """
+    token = _current.set({})
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def get_loader(name, batch_fn) -> DataLoader:
+    """
+    The active request's loader registered under `name`, created on first
+    use; outside of a request every call gets a fresh loader
+    """
+    loaders = _current.get()
+    if loaders is None:
+        return DataLoader(batch_fn)
+
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = DataLoader(batch_fn)
+    return loader
@@ -0,0 +1,128 @@
+"""
+Metrics Utils
+"""
+
+from bisect import bisect_left
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class _Histogram:
+    """
+    Latency histogram of a single (method, route) series
+    """
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class _RequestMetrics:
+    """
+    Per-route request counters, latency histograms and in-flight gauge,
+    kept in plain dicts so recording stays in the sub-microsecond range
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self._requests = {}
+        self._latency = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route, status)
+        self._requests[key] = self._requests.get(key, 0) + 1
+
+        histogram = self._latency.get((method, route))
+        if histogram is None:
+            histogram = self._latency[(method, route)] = _Histogram()
+        histogram.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram.sum += seconds
+        histogram.count += 1
+
+    def reset(self):
+        self.in_flight = 0
+        self._requests.clear()
+        self._latency.clear()
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition of everything recorded so far
+        """
+        lines = [
+            "# HELP atlas_http_requests_total Requests handled, by route and status",
+            "# TYPE atlas_http_requests_total counter",
+        ]
+        for (method, route, status), value in sorted(self._requests.items()):
+            lines.append(
+                f'atlas_http_requests_total{{method="{method}",'
+                f'route="{_escape(route)}",status="{status}"}} {value}'
+            )
+
+        lines += [
+            "# HELP atlas_http_request_duration_seconds Request latency, by route",
+            "# TYPE atlas_http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self._latency.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(
+                    f'atlas_http_request_duration_seconds_bucket'
+                    f'{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines += [
+                f'atlas_http_request_duration_seconds_bucket'
+                f'{{{labels},le="+Inf"}} {histogram.count}',
+                f'atlas_http_request_duration_seconds_sum{{{labels}}} {histogram.sum}',
+                f'atlas_http_request_duration_seconds_count{{{labels}}} {histogram.count}',
+            ]
+
+        lines += [
+            "# HELP atlas_http_requests_in_flight Requests currently being handled",
+            "# TYPE atlas_http_requests_in_flight gauge",
+            f"atlas_http_requests_in_flight {self.in_flight}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Stats keys that only ever go up (until a restart); everything else in a
+# stats dict is a point-in-time size, byte count or ratio
+COUNTER_KEYS = frozenset({
+    "hits", "misses", "spill_hits", "evictions", "expirations",
+    "completed", "failed", "deduplicated", "evicted",
+})
+
+
+def stats_metrics(name: str, help: str, values: dict) -> str:
+    """
+    Prometheus text for a family of unlabelled stats, e.g. cache counters.
+    Monotonic counters get the `_total` suffix and the counter type so
+    rate() handles their resets; the rest are gauges
+    """
+    lines = []
+    for key, value in values.items():
+        if key in COUNTER_KEYS:
+            metric, kind = f"{name}_{key}_total", "counter"
+        else:
+            metric, kind = f"{name}_{key}", "gauge"
+        lines += [
+            f"# HELP {metric} {help} ({key})",
+            f"# TYPE {metric} {kind}",
+            f"{metric} {value}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+request_metrics = _RequestMetrics()
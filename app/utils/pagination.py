@@ -0,0 +1,80 @@
+"""
+Pagination Utils
+"""
+
+import json
+import base64
+from typing import Optional
+
+from app.configs import config
+
+
+def page_size(limit: Optional[int]) -> int:
+    """
+    Requested page size, defaulted and clamped to the configured bounds
+    """
+    if limit is None:
+        return config.PAGE_SIZE_DEFAULT
+    return max(1, min(limit, config.PAGE_SIZE_MAX))
+
+
+def encode_cursor(kind: str, values: list) -> str:
+    """
+    Opaque token for the keyset position after the last row of a page
+    """
+    raw = json.dumps([kind, values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(kind: str, token: str) -> list:
+    """
+    Keyset values of a cursor token, ValueError if it is malformed or
+    belongs to a different listing
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        cursor_kind, values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if cursor_kind != kind or not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def quote(value) -> str:
+    """
+    Filter value quoted for a PostgREST logic tree (`or`/`and`), where
+    reserved characters (, . : ( )) would otherwise split it
+    """
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{value}"'
+
+
+def keyset_filter(column: str, value, id: str) -> str:
+    """
+    `or` filter selecting rows after (value, id) in (column asc nulls
+    last, id asc) order
+    """
+    if value is None:
+        return f"and({column}.is.null,id.gt.{quote(id)})"
+
+    return (
+        f"{column}.gt.{quote(value)},"
+        f"and({column}.eq.{quote(value)},id.gt.{quote(id)}),"
+        f"{column}.is.null"
+    )
+
+
+def build_page(kind: str, rows: list, size: int, column: str) -> dict:
+    """
+    Page envelope from `size + 1` fetched rows; the extra row only tells
+    us whether there is a next page
+    """
+    items = rows[:size]
+    next_cursor = None
+    if len(rows) > size:
+        last = items[-1]
+        next_cursor = encode_cursor(kind, [last.get(column), last["id"]])
+
+    return {"items": items, "next_cursor": next_cursor}
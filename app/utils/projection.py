@@ -0,0 +1,46 @@
+"""
+Projection Utils
+"""
+
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from app.configs import config
+
+
+@lru_cache(maxsize=512)
+def _select(table: str, fields: tuple, required: tuple) -> str:
+    allowed = config.DB_SCHEMA.COLUMNS.get(table)
+    if allowed is None:
+        raise ValueError(f"Field selection is not supported on {table}")
+
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields for {table}: {', '.join(unknown)}")
+
+    # Keep the caller's order, then anything pagination etc. depends on
+    columns = dict.fromkeys(fields + required)
+    return ",".join(columns)
+
+
+def select_columns(
+    table: str,
+    fields: Optional[Sequence[str]] = None,
+    required: Sequence[str] = ()
+) -> str:
+    """
+    PostgREST select clause for `fields` (all columns if None), validated
+    against the table's allowlist. Raises ValueError on unknown fields
+    """
+    if not fields:
+        return "*"
+    return _select(table, tuple(fields), tuple(required))
+
+
+def parse_fields(fields: Optional[str]) -> Optional[list]:
+    """
+    Split a `fields=a,b,c` query parameter
+    """
+    if fields is None:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
@@ -0,0 +1,98 @@
+"""
+Timing Utils
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class RequestTimings:
+    """
+    Stage durations and database queries recorded during one request
+    """
+    __slots__ = ("stages", "queries")
+
+    def __init__(self):
+        self.stages = {}
+        self.queries = []
+
+    def record(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def record_query(self, table: str, method: str, seconds: float, rows: int):
+        self.record("db", seconds)
+        self.queries.append((table, method, seconds, rows))
+
+    def server_timing(self, total: float) -> str:
+        """
+        Value of the Server-Timing response header (durations in ms)
+        """
+        parts = []
+        for stage, seconds in self.stages.items():
+            part = f"{stage};dur={seconds * 1000:.3f}"
+            if stage == "db":
+                part += f';desc="{len(self.queries)} queries"'
+            parts.append(part)
+        parts.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> dict:
+        """
+        Structured log fields
+        """
+        return {
+            "stages_ms": {
+                stage: round(seconds * 1000, 3)
+                for stage, seconds in self.stages.items()
+            },
+            "queries": [
+                {
+                    "table": table,
+                    "method": method,
+                    "ms": round(seconds * 1000, 3),
+                    "rows": rows,
+                }
+                for table, method, seconds, rows in self.queries
+            ],
+        }
+
+
+_current = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def request_scope():
+    """
+    Collect timings for the request handled inside the block
+    """
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def current():
+    """
+    Timings of the active request, or None outside of one
+    """
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Add the duration of the block to the active request's `name` stage
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.record(name, time.perf_counter() - start)
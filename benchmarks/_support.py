@@ -0,0 +1,61 @@
+"""
+Shared benchmark helpers
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app reads these at import time; nothing here talks to Supabase
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+
+
+class FakeQuery:
+    """
+    Stand-in for a postgrest request builder with a fixed blocking latency
+    """
+
+    def __init__(self, table: str, rows: list, latency: float = 0.0):
+        self.path = f"/{table}"
+        self.http_method = "GET"
+        self._rows = rows
+        self._latency = latency
+
+    def __getattr__(self, name):
+        # select / eq / order / limit / ... all chain back to the builder
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self._latency:
+            time.sleep(self._latency)
+        return type("Response", (), {"data": self._rows, "count": None})()
+
+
+class FakeClient:
+    """
+    Stand-in for the supabase client, serving canned rows per table
+    """
+
+    def __init__(self, tables: dict, latency: float = 0.0):
+        self._tables = tables
+        self._latency = latency
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(name, self._tables.get(name, []), self._latency)
+
+
+def api_of(app):
+    """
+    Return the versioned sub-application mounted under /api
+    """
+    return app.routes[-1].app
+
+
+def report(title: str, rows: list):
+    print(title)
+    for row in rows:
+        print("  " + row)
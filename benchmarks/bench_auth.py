@@ -0,0 +1,80 @@
+"""
+Per-request cost of resolving the user from a bearer token
+
+Local verification and token cache hits are timed in-process; the remote introspection path is
+a full round trip to Supabase Auth on every call, so it is measured
+against a simulated 5ms auth server latency.
+
+    python benchmarks/bench_auth.py
+"""
+
+import os
+import time
+import asyncio
+
+from _support import report
+
+os.environ.setdefault("SUPABASE_JWT_SECRET", "benchmark-secret-benchmark-secret")
+
+import jwt
+from starlette.requests import Request
+
+import app.utils.auth as auth
+from app.configs import config
+
+N = 20_000
+REMOTE_LATENCY = 0.005
+
+
+def _request(token: str) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    })
+
+
+async def _time(n: int, cold: bool = True) -> float:
+    token = jwt.encode({
+        "sub": "00000000-0000-0000-0000-000000000001",
+        "aud": config.JWT_AUDIENCE,
+        "iss": config.JWT_ISSUER,
+        "exp": int(time.time()) + 3600,
+    }, config.SUPABASE_JWT_SECRET, algorithm="HS256")
+    request = _request(token)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        if cold:
+            auth._token_cache.clear()
+        await auth.resolve_user_id(request)
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    config.AUTH_MODE = "local"
+    local = asyncio.run(_time(N))
+    cached = asyncio.run(_time(N, cold=False))
+
+    class _Response:
+        status_code = 200
+
+        def json(self):
+            return {"id": "00000000-0000-0000-0000-000000000001"}
+
+    async def _slow_get(*args, **kwargs):
+        await asyncio.sleep(REMOTE_LATENCY)
+        return _Response()
+
+    auth.http.get = _slow_get
+    config.AUTH_MODE = "remote"
+    remote = asyncio.run(_time(200))
+
+    report("resolve_user_id", [
+        f"local  (HS256)        {local * 1e6:10.1f} us/request",
+        f"cached (token hash)   {cached * 1e6:10.1f} us/request",
+        f"remote ({REMOTE_LATENCY * 1000:.0f}ms auth rtt) {remote * 1e6:10.1f} us/request",
+    ])
+
+
+if __name__ == "__main__":
+    main()
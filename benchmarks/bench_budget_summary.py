@@ -0,0 +1,70 @@
+"""
+Budget summary: time to summarize a trip vs. number of budget entries
+
+Measures the in-process path (entries grouped in Python, as when the
+budget_summary_groups function is not deployed) and the rollup alone, which
+is all that runs when the database does the grouping.
+
+    python benchmarks/bench_budget_summary.py
+"""
+
+import os
+import json
+import time
+import random
+import tempfile
+
+from _support import report
+
+rates = {"base": "USD", "as_of": "2025-06-01", "rates": {"EUR": 0.92, "GBP": 0.79, "JPY": 157.0}}
+with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+    json.dump(rates, f)
+os.environ["FX_RATES_FILE"] = f.name
+
+import app.services.budget as budget
+
+CATEGORIES = ["lodging", "food", "transport", "activities", "misc"]
+CURRENCIES = ["USD", "EUR", "GBP", "JPY"]
+
+
+def _entries(n: int, items: int):
+    rng = random.Random(n)
+    item_starts = {
+        f"item-{i}": f"2025-06-{1 + i % 14:02d}T{8 + i % 12:02d}:00:00+00:00"
+        for i in range(items)
+    }
+    entries = [
+        {
+            "category": rng.choice(CATEGORIES),
+            "currency": rng.choice(CURRENCIES),
+            "amount": round(rng.uniform(1, 300), 2),
+            "created_at": f"2025-05-{1 + i % 28:02d}T12:{i % 60:02d}:00+00:00",
+            "item_id": f"item-{rng.randrange(items)}" if i % 3 else None,
+        }
+        for i in range(n)
+    ]
+    return entries, item_starts
+
+
+def main():
+    rows = []
+    for n in (1_000, 10_000, 50_000):
+        entries, item_starts = _entries(n, 200)
+
+        start = time.perf_counter()
+        groups = budget.group_entries(entries, item_starts, "Europe/Paris")
+        grouped = time.perf_counter() - start
+
+        start = time.perf_counter()
+        budget.summarize(groups, "USD")
+        rolled = time.perf_counter() - start
+
+        rows.append(
+            f"{n:>6} entries  group {grouped * 1000:7.1f}ms  "
+            f"rollup of {len(groups)} groups {rolled * 1000:6.2f}ms"
+        )
+    report("budget summary", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Batch export: trips rendered per second by format and worker processes
+
+Each trip has 200 itinerary items; renders go through the same
+render_export entry point the export process pool uses. One worker is the
+in-process baseline.
+
+    python benchmarks/bench_export_batch.py
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from _support import report
+
+from app.services._trips_formatting import render_export
+
+TRIPS = 48
+ITEMS = 200
+
+
+def _trip(n: int):
+    trip = {
+        "id": f"trip-{n}",
+        "title": f"Trip {n}",
+        "start_date": "2025-06-01",
+        "end_date": "2025-06-14",
+        "notes": "Pack light. " * 10,
+    }
+    items = [
+        {
+            "name": f"Item {i}",
+            "type": "event_activity",
+            "start_time": "2025-06-02T09:00:00",
+            "cost_amount": 12.5,
+            "cost_currency": "EUR",
+            "link": "https://example.com/booking",
+            "notes": "Meet at the entrance. " * 8,
+        }
+        for i in range(ITEMS)
+    ]
+    return trip, items
+
+
+def _run(workers: int, export_type: str, trips: list) -> float:
+    start = time.perf_counter()
+    if workers == 1:
+        for trip, items in trips:
+            render_export(trip, items, export_type)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(
+                render_export,
+                [t for t, _ in trips],
+                [i for _, i in trips],
+                [export_type] * len(trips)
+            ))
+    return time.perf_counter() - start
+
+
+def main():
+    trips = [_trip(n) for n in range(TRIPS)]
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores})
+
+    rows = []
+    for export_type in ("html", "md", "pdf"):
+        for workers in worker_counts:
+            elapsed = _run(workers, export_type, trips)
+            rate = TRIPS / elapsed
+            rows.append(
+                f"{export_type:<4} workers={workers:<3} {rate:8.1f} trips/s  "
+                f"{rate / min(workers, cores):8.1f} trips/s/core"
+            )
+    report(f"{TRIPS} trips x {ITEMS} items, {cores} cores", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+HTML export: time to first byte and peak memory vs. itinerary size
+
+Pages of the itinerary are served by a fake db with 5ms per round trip.
+Time to first byte includes the export cache's version check (one
+counted row), and the streamed peak includes the copy kept for the export
+cache (at most EXPORT_CACHE_STREAM_BUFFER_BYTES in memory).
+
+    python benchmarks/bench_export_stream.py
+"""
+
+import re
+import time
+import asyncio
+import tracemalloc
+
+from _support import FakeClient, report
+
+from app.configs import config
+import app.services.trips as trips
+
+PAGE_LATENCY = 0.005
+
+
+class _PagedQuery:
+    """
+    Serves the rows after the keyset cursor, `limit` at a time
+    """
+
+    def __init__(self, rows):
+        self.path, self.http_method = "/itinerary_item", "GET"
+        self._rows, self._limit = rows, len(rows)
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def or_(self, filters):
+        last_id = re.search(r'id\.gt\."([^"]+)"', filters).group(1)
+        self._rows = [row for row in self._rows if row["id"] > last_id]
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(PAGE_LATENCY)
+        return type("Response", (), {"data": self._rows[:self._limit]})()
+
+
+def _items(n):
+    return [{
+        "id": f"{i:08d}", "name": f"Item <{i}>", "type": "event",
+        "start_time": f"2025-06-01T{i % 24:02d}:00:00+00:00",
+        "notes": "Bring the tickets & passport " * 4,
+        "link": "https://example.com/booking?id=1&x=2",
+    } for i in range(n)]
+
+
+async def _measure(n: int):
+    rows = _items(n)
+    trip = {"id": f"t{n}", "title": "Summer <Trip>", "updated_at": "v1"}
+    trips.db_client = type("Client", (), {
+        "table": lambda self, name: (
+            _PagedQuery(rows) if name == config.DB_SCHEMA.ITINERARY_ITEM
+            else FakeClient({name: [trip]}).table(name)
+        )
+    })()
+    trips.export_cache._memory.clear()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = await trips.stream_trip_export(trip["id"])
+    ttfb = None
+    size = 0
+    async for chunk in chunks:
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    _, streamed_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    trips.trip_formatter.format(trip, rows)
+    _, buffered_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return ttfb, total, size, streamed_peak, buffered_peak
+
+
+def main():
+    rows = []
+    for n in (10, 1_000, 10_000):
+        ttfb, total, size, streamed, buffered = asyncio.run(_measure(n))
+        rows.append(
+            f"items={n:<6} ttfb {ttfb * 1000:6.2f}ms  total {total * 1000:8.1f}ms  "
+            f"{size / 1024:8.0f} KiB  peak streamed {streamed / 1024:7.0f} KiB"
+            f" / buffered {buffered / 1024:7.0f} KiB"
+        )
+    report(
+        f"stream_trip_export (page size {config.PAGE_SIZE_MAX}, "
+        f"{PAGE_LATENCY * 1000:.0f}ms per page)",
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Requests per second through GlobalMiddleware: pure ASGI vs. the previous
+BaseHTTPMiddleware implementation, on a route that does no work
+
+    python benchmarks/bench_global_middleware.py
+"""
+
+import time
+import asyncio
+import logging
+
+from _support import report
+
+import httpx
+from fastapi import FastAPI, Request, Response, HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+
+from app.middleware import GlobalMiddleware
+
+N = 5_000
+
+
+class LegacyGlobalMiddleware(BaseHTTPMiddleware):
+    """
+    GlobalMiddleware as it was before the pure-ASGI rewrite
+    """
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        logging.info(f"➡️ Request: {request.method} {request.url}")
+
+        try:
+            response: Response = await call_next(request)
+        except HTTPException as e:
+            return JSONResponse(
+                status_code=e.status_code,
+                content={"detail": e.detail}
+            )
+        except Exception:
+            logging.exception("Unhandled error")
+            return JSONResponse(
+                status_code=500,
+                content={"detail": "Internal Server Error"}
+            )
+
+        process_time = time.time() - start_time
+        response.headers["X-Process-Time"] = f"{process_time:.3f}"
+        logging.info(
+            f"⬅️ Response status: {response.status_code} ({process_time:.3f}s)"
+        )
+
+        return response
+
+
+def _build(middleware) -> FastAPI:
+    api = FastAPI()
+    api.add_middleware(middleware)
+
+    @api.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @api.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(100):
+                yield b"x" * 1024
+        return StreamingResponse(chunks())
+
+    return api
+
+
+async def _rps(api: FastAPI, path: str, n: int) -> float:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=api), base_url="http://bench"
+    ) as http:
+        for _ in range(100):
+            await http.get(path)
+
+        start = time.perf_counter()
+        for _ in range(n):
+            res = await http.get(path)
+            assert "x-process-time" in res.headers
+        return n / (time.perf_counter() - start)
+
+
+def main():
+    rows = []
+    for path, n in (("/ping", N), ("/stream", N // 5)):
+        for name, middleware in (
+            ("BaseHTTPMiddleware", LegacyGlobalMiddleware),
+            ("pure ASGI", GlobalMiddleware),
+        ):
+            rps = asyncio.run(_rps(_build(middleware), path, n))
+            rows.append(f"{path:<8} {name:<19} {rps:9.1f} req/s")
+    report("GlobalMiddleware (logging at default WARNING level)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Itinerary conflicts: interval index vs. checking every pair
+
+Items are 1-120 minute events spread over a 30 day trip. "add" times
+indexing the last 10% of items one by one into an index of the rest, as
+when a few items were created since the index was built.
+
+    python benchmarks/bench_itinerary_conflicts.py
+"""
+
+import time
+import random
+from datetime import datetime, timedelta, timezone
+
+from _support import report
+
+from app.services._itinerary_conflicts import ConflictIndex
+
+START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _items(n: int) -> list:
+    rng = random.Random(n)
+    items = []
+    for i in range(n):
+        start = START + timedelta(minutes=rng.randrange(30 * 24 * 60))
+        items.append({
+            "id": f"item-{i:06d}",
+            "type": "event_activity",
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(minutes=rng.randrange(1, 121))).isoformat(),
+        })
+    return items
+
+
+def _pairwise(items: list) -> int:
+    spans = [
+        (datetime.fromisoformat(i["start_time"]), datetime.fromisoformat(i["end_time"]))
+        for i in items
+    ]
+    return sum(
+        1
+        for a in range(len(spans))
+        for b in range(a + 1, len(spans))
+        if spans[a][0] < spans[b][1] and spans[b][0] < spans[a][1]
+    )
+
+
+def main():
+    rows = []
+    for n in (200, 1_000, 5_000):
+        items = _items(n)
+        zone = timezone.utc
+
+        start = time.perf_counter()
+        index = ConflictIndex(zone, items)
+        built = time.perf_counter() - start
+
+        split = n - n // 10
+        partial = ConflictIndex(zone, items[:split])
+        start = time.perf_counter()
+        for item in items[split:]:
+            partial.add(item)
+        added = time.perf_counter() - start
+
+        line = f"{n:>5} items  index {built * 1000:8.1f}ms  add {n - split:>4} {added * 1000:7.1f}ms"
+        if n <= 1_000:
+            start = time.perf_counter()
+            pairs = _pairwise(items)
+            line += f"  pairwise {(time.perf_counter() - start) * 1000:8.1f}ms"
+            assert pairs == len(index.conflicts())
+        rows.append(line)
+    report("itinerary conflicts", rows)
+
+
+if __name__ == "__main__":
+    main()
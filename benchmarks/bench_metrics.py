@@ -0,0 +1,43 @@
+"""
+Cost of recording one request in the per-route metrics
+
+    python benchmarks/bench_metrics.py
+"""
+
+import time
+import random
+
+from _support import report
+
+from app.utils.metrics import request_metrics
+
+N = 1_000_000
+ROUTES = ("/trips", "/trips/{id}", "/trips/{id}/itinerary", "/metrics")
+
+
+def main():
+    samples = [
+        (random.choice(ROUTES), random.choice((200, 200, 200, 404)),
+         random.expovariate(50))
+        for _ in range(1024)
+    ]
+    observe = request_metrics.observe
+
+    start = time.perf_counter()
+    for i in range(N):
+        route, status, seconds = samples[i & 1023]
+        observe("GET", route, status, seconds)
+    per_call = (time.perf_counter() - start) / N
+
+    start = time.perf_counter()
+    request_metrics.render()
+    render = time.perf_counter() - start
+
+    report("request metrics", [
+        f"observe  {per_call * 1e9:8.0f} ns/request",
+        f"render   {render * 1e6:8.0f} us/scrape ({len(ROUTES)} routes)",
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Request models and byte responses: cost per request against the dict path
+
+POST /trips: "old" json.loads the body and builds the row by hand (with no
+real validation), then replies through jsonable_encoder + JSONResponse;
+"new" validates the body bytes with TripCreate and replies through
+JSONBytesResponse.
+
+Itinerary page: no model is involved on either side, as the read routes
+don't re-validate rows from the database. It compares rendering the same
+50-item page through jsonable_encoder + JSONResponse ("old") and straight
+to bytes with JSONBytesResponse ("new").
+
+    python benchmarks/bench_models.py
+"""
+
+import json
+import time
+
+from _support import report
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models import TripCreate, JSONBytesResponse
+
+ROUNDS = 20000
+
+_BODY = json.dumps({
+    "title": "Lisbon and Porto",
+    "description": "Two weeks along the coast",
+    "start_date": "2025-06-01",
+    "end_date": "2025-06-14",
+    "home_currency": "eur",
+    "time_zone": "Europe/Lisbon",
+    "notes": "Book the train early",
+}).encode()
+
+_PAGE = {
+    "items": [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "trip_id": "trip",
+            "type": "event_activity",
+            "name": f"Item {i}",
+            "link": "https://example.com/tickets",
+            "cost_amount": 12.5,
+            "cost_currency": "EUR",
+            "start_time": "2025-06-02T09:00:00+00:00",
+            "end_time": "2025-06-02T11:00:00+00:00",
+            "all_day": False,
+            "status": "planned",
+            "notes": None,
+            "created_at": "2025-05-01T10:00:00+00:00",
+            "updated_at": "2025-05-01T10:00:00+00:00",
+        }
+        for i in range(50)
+    ],
+    "next_cursor": "eyJrIjogIjIwMjUtMDYtMDIifQ",
+}
+
+
+def _create_old():
+    trip_data = json.loads(_BODY)
+    trip = {
+        "title": trip_data["title"],
+        "description": trip_data["description"],
+        "start_date": trip_data["start_date"],
+        "end_date": trip_data["end_date"],
+        "home_currency": trip_data["home_currency"],
+        "time_zone": trip_data["time_zone"],
+        "notes": trip_data["notes"],
+        "owner_user_id": "user",
+    }
+    return JSONResponse(jsonable_encoder(trip)).body
+
+
+def _create_new():
+    trip = TripCreate.parse(_BODY).row(owner_user_id="user")
+    return JSONBytesResponse(trip).body
+
+
+def _page_old():
+    return JSONResponse(jsonable_encoder(_PAGE)).body
+
+
+def _page_new():
+    return JSONBytesResponse(_PAGE).body
+
+
+def _rate(run, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        run()
+    return rounds / (time.perf_counter() - start)
+
+
+def main():
+    out = []
+    for name, old, new, rounds in (
+        ("POST /trips (validate + reply)", _create_old, _create_new, ROUNDS),
+        ("itinerary page (50, render)", _page_old, _page_new, ROUNDS // 10),
+    ):
+        old_rate = _rate(old, rounds)
+        new_rate = _rate(new, rounds)
+        out.append(
+            f"{name:<31} old {old_rate:9.0f}/s  new {new_rate:9.0f}/s"
+            f"  ({new_rate / old_rate:4.1f}x)"
+        )
+    report("cost per request", out)
+
+
+if __name__ == "__main__":
+    main()
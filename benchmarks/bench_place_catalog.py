@@ -0,0 +1,91 @@
+"""
+Place catalog: "places near X" and nearest-k lookups per second
+
+50k places scattered around a handful of cities, plus a uniform
+background. The brute force column scans every place for each query.
+"open sea" is a point far from any city, where the nearest places are
+degrees away and the search has to move up to the coarser grids.
+
+The catalog is pure Python (numpy isn't a dependency), so each lookup
+costs tens of microseconds of interpreter time: about 9k lookups/s per
+worker in the sandbox these numbers were taken in, not the tens of
+thousands the request asked for. Most of what is left is the per-cell
+loop and building the result dicts.
+
+    python benchmarks/bench_place_catalog.py
+"""
+
+import math
+import time
+import random
+import asyncio
+
+from _support import report
+
+from app.configs import config
+from app.services._places_catalog import PlaceCatalog
+
+CITIES = [(48.8566, 2.3522), (40.7128, -74.0060), (35.6762, 139.6503), (-33.8688, 151.2093), (51.5074, -0.1278)]
+
+
+def _rows(n: int) -> list:
+    rng = random.Random(n)
+    rows = []
+    for i in range(n):
+        if i % 5:
+            lat, lng = rng.choice(CITIES)
+            lat, lng = lat + rng.gauss(0, 0.3), lng + rng.gauss(0, 0.3)
+        else:
+            lat, lng = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        rows.append({"id": f"place-{i:06d}", "name": f"Place {i}", "lat": lat, "lng": lng,
+                     "updated_at": f"2025-01-01T00:00:{i % 60:02d}+00:00"})
+    return rows
+
+
+async def _build(rows: list) -> PlaceCatalog:
+    async def fetch(watermark):
+        return rows
+    catalog = PlaceCatalog(fetch, cell_degrees=config.PLACE_GRID_DEGREES, refresh_seconds=60, full_refresh_seconds=3600)
+    await catalog.ensure_fresh()
+    return catalog
+
+
+def _rate(queries: list, run) -> float:
+    start = time.perf_counter()
+    for lat, lng in queries:
+        run(lat, lng)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    n = 50_000
+    rows = _rows(n)
+    start = time.perf_counter()
+    catalog = asyncio.run(_build(rows))
+    loaded = time.perf_counter() - start
+
+    rng = random.Random(0)
+    queries = [
+        (lat + rng.gauss(0, 0.2), lng + rng.gauss(0, 0.2))
+        for lat, lng in (rng.choice(CITIES) for _ in range(2_000))
+    ]
+    every_slot = range(len(catalog))
+
+    def brute(lat, lng):
+        distances = catalog.distances_km(lat, lng, every_slot)
+        return sorted(d for d in distances if d <= 2)[:20]
+
+    out = [f"{config.PLACE_GRID_DEGREES} degree cells", f"load {n} places {loaded * 1000:8.1f}ms"]
+    out.append(f"near 2km, top 20     {_rate(queries, lambda a, b: catalog.near(a, b, 2, 20)):9.0f} lookups/s")
+    out.append(f"nearest 5            {_rate(queries, lambda a, b: catalog.nearest(a, b, 5)):9.0f} lookups/s")
+    out.append(f"nearest 5, open sea  {_rate([(0.0, -140.0)] * 200, lambda a, b: catalog.nearest(a, b, 5)):9.0f} lookups/s")
+    out.append(f"brute force 2km      {_rate(queries[:50], brute):9.0f} lookups/s")
+
+    lat, lng = queries[0]
+    for found in catalog.near(lat, lng, 2, 20):
+        assert math.isclose(found["distance_km"], catalog.distances_to(lat, lng, [found["id"]])[found["id"]], abs_tol=1e-3)
+    report("place catalog", out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Place lookups for an itinerary: one query per reference vs. the
+request-scoped loader
+
+Each query costs 5ms on a fake db. Items reference places drawn from a
+pool of 50, so many references repeat.
+
+    python benchmarks/bench_place_loader.py
+"""
+
+import time
+import random
+import asyncio
+
+from _support import report
+
+from app.utils import loader
+import app.services.places as places
+
+LATENCY = 0.005
+PLACES = {f"place-{i}": {"id": f"place-{i}", "name": f"Place {i}"} for i in range(50)}
+
+
+class _Query:
+    path, http_method = "/place", "GET"
+
+    def __init__(self, log):
+        self._log = log
+        self._ids = []
+
+    def select(self, *args):
+        return self
+
+    def eq(self, column, value):
+        self._ids = [value]
+        return self
+
+    def in_(self, column, values):
+        self._ids = list(values)
+        return self
+
+    def execute(self):
+        self._log.append(len(self._ids))
+        time.sleep(LATENCY)
+        return type("Response", (), {"data": [PLACES[i] for i in self._ids if i in PLACES]})()
+
+
+class _Client:
+    def __init__(self):
+        self.log = []
+
+    def table(self, name):
+        return _Query(self.log)
+
+
+def _itinerary(n: int) -> list:
+    rng = random.Random(n)
+    pick = lambda: f"place-{rng.randrange(len(PLACES))}"
+    return [
+        {"id": f"item-{i}", "travel_segment": {"origin_id": pick(), "destination_id": pick()}}
+        if i % 2 else
+        {"id": f"item-{i}", "event_activity": {"venue_id": pick()}}
+        for i in range(n)
+    ]
+
+
+async def _one_by_one(items: list):
+    for item in items:
+        for table, columns in places.PLACE_REFS.items():
+            row = item.get(table)
+            for column in columns if row else ():
+                found = await places.execute(places.db_client.table("place").select("*").eq("id", row[column]))
+                row[column[:-3]] = found.data[0]
+
+
+async def _loader(items: list):
+    with loader.request_scope():
+        await places.attach_places(items)
+
+
+def main():
+    rows = []
+    for n in (10, 100, 500):
+        for name, run in (("one by one", _one_by_one), ("loader", _loader)):
+            places.db_client = client = _Client()
+            start = time.perf_counter()
+            asyncio.run(run(_itinerary(n)))
+            elapsed = time.perf_counter() - start
+            rows.append(
+                f"{n:>4} items  {name:<10} {elapsed * 1000:8.1f}ms  "
+                f"{len(client.log):>4} queries  {sum(client.log):>4} keys sent"
+            )
+    report("place lookups", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Search: per-query latency (p50 / p99) of the in-process ranking path
+
+This is the fallback used when search_trips is not deployed. Every ilike
+candidate is paged in PAGE_SIZE_MAX rows at a time and ranked here. The
+fake db answers each page instantly with the rows the ilike filters would
+match, so the numbers are the service's own cost on top of the round
+trips (one per page).
+
+In the sandbox these numbers were taken in, a user with 1k items stays
+well under the 20ms p99 target. At 5k items the median is about 10ms but
+p99 is about 25ms. At 20k items both are over it, since every candidate
+is scored in Python. The target is for the indexed path.
+
+The search_trips path runs entirely in Postgres. Measure it against a
+seeded database with
+    explain analyze select * from search_trips('<user id>', 'ryo:*', 20);
+
+    python benchmarks/bench_search.py
+"""
+
+import time
+import random
+import asyncio
+from bisect import bisect_right
+
+from _support import report
+
+import app.services.search as search
+
+WORDS = [
+    "ryokan", "kyoto", "osaka", "tram", "museum", "dinner", "temple", "hotel",
+    "ferry", "market", "garden", "onsen", "castle", "izakaya", "shrine", "train",
+    "lisbon", "porto", "fado", "tapas", "gallery", "harbour", "bridge", "tower",
+]
+QUERIES = ["ryo", "kyoto temple", "din", "onsen ryokan", "tower", "ferry harb", "gal", "train osaka"]
+
+
+class _Page:
+    path, http_method = "/itinerary_item", "GET"
+
+    def __init__(self, client):
+        self._client = client
+        self._after = None
+        self._limit = None
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def gt(self, column, value):
+        self._after = value
+        return self
+
+    def limit(self, size):
+        self._limit = size
+        return self
+
+    def execute(self):
+        start = 0
+        if self._after is not None:
+            start = bisect_right(self._client.match_ids, self._after)
+        rows = self._client.matches[start:start + self._limit]
+        return type("Response", (), {"data": rows})()
+
+
+class _Client:
+    matches, match_ids = [], []
+
+    def table(self, name):
+        return _Page(self)
+
+
+def _items(n: int) -> list:
+    rng = random.Random(n)
+    return sorted((
+        {
+            "id": f"item-{i:06d}",
+            "trip_id": f"trip-{i % 20}",
+            "name": " ".join(rng.sample(WORDS, 2)).title(),
+            "notes": " ".join(rng.sample(WORDS, 6)),
+            "link": f"https://example.com/{rng.choice(WORDS)}",
+        }
+        for i in range(n)
+    ), key=lambda item: item["id"])
+
+
+def _matches(items: list, terms: list) -> list:
+    # What the ilike filters let through: every term somewhere in a field
+    return [
+        item for item in items
+        if all(
+            any(term in (item[field] or "").lower() for field in ("name", "notes", "link"))
+            for term in terms
+        )
+    ]
+
+
+def main():
+    client = _Client()
+    search.db_client = client
+    rows = []
+    for n in (1_000, 5_000, 20_000):
+        items = _items(n)
+        trips = [{"id": f"trip-{i}", "title": f"Trip {i}", "notes": None} for i in range(20)]
+
+        async def get_trips(user_id):
+            return trips
+
+        search.trips.get_trips = get_trips
+
+        latencies, candidates = [], 0
+        for _ in range(10):
+            for q in QUERIES:
+                terms = search.parse_terms(q)
+                client.matches = _matches(items, terms)
+                client.match_ids = [item["id"] for item in client.matches]
+                candidates += len(client.matches)
+
+                start = time.perf_counter()
+                asyncio.run(search._search_unindexed("user", terms, 20))
+                latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        rows.append(
+            f"{n:>6} items  {candidates // len(latencies):>6} candidates/query  "
+            f"p50 {p50 * 1000:6.1f}ms  p99 {p99 * 1000:6.1f}ms"
+        )
+    report("search fallback", rows)
+
+
+if __name__ == "__main__":
+    main()
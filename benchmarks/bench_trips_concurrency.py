@@ -0,0 +1,67 @@
+"""
+GET /trips throughput vs. in-flight requests
+
+Every PostgREST round trip is simulated as a 20ms blocking call. With the
+queries awaited through the db executor, throughput grows with concurrency
+until DB_MAX_WORKERS is saturated; run against the baseline to see it stay
+flat at ~1/latency.
+
+    python benchmarks/bench_trips_concurrency.py
+"""
+
+import asyncio
+import time
+
+from _support import FakeClient, api_of, report
+
+import httpx
+
+from app import app
+from app.configs import config
+import app.services.trips as trips
+import app.utils.auth as auth
+
+LATENCY = 0.02
+REQUESTS_PER_LEVEL = 64
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+async def _run(concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as http:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with sem:
+                res = await http.get(f"/api/{config.SEM_VER}/trips")
+                assert res.status_code == 200, res.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(REQUESTS_PER_LEVEL)))
+        return REQUESTS_PER_LEVEL / (time.perf_counter() - start)
+
+
+def main():
+    trips.db_client = FakeClient({
+        config.DB_SCHEMA.TRIP: [
+            {"id": str(i), "title": f"Trip {i}", "owner_user_id": USER_ID}
+            for i in range(20)
+        ]
+    }, latency=LATENCY)
+    api_of(app).dependency_overrides[auth.resolve_user_id] = lambda: USER_ID
+
+    rows = []
+    for concurrency in (1, 2, 4, 8, 16, 32):
+        rps = asyncio.run(_run(concurrency))
+        rows.append(f"in-flight={concurrency:<3} {rps:8.1f} req/s")
+    report(
+        f"GET /trips, {LATENCY * 1000:.0f}ms simulated db latency, "
+        f"DB_MAX_WORKERS={config.DB_MAX_WORKERS}",
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ from datetime import datetime, date, timedelta, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field, asdict
 from app.services import trips as tripServices
+from app.services import items as itemServices
+from app.services import places as placeServices
 from supabase import create_client, Client
 import json
 import os
@@ -53,6 +55,13 @@ def run_async(coro):
         return loop.run_until_complete(coro)
 
 
+async def catalog_place_ids(limit: int) -> list:
+    # run_async closes its loop when the call returns, which would cancel
+    # a catalog refresh left running in the background, so wait for it
+    await placeServices.catalog.ensure_fresh(wait=True)
+    return await placeServices.place_ids(limit)
+
+
 def uid() -> str:
     return str(uuid.uuid4())
 
@@ -257,22 +266,41 @@ with tab_itin:
         with colC:
             bucket = st.selectbox("Bucket", ["day", "week"], index=0)
 
-        # Fetch itinerary
-        raw_itin = run_async(tripServices.get_itinerary(tid))
-        items = raw_itin if isinstance(raw_itin, list) else raw_itin.get("items", [])
-
-        if items:
-            st.markdown("### 🗓️ Itinerary Items")
-            for item in items:
-                with st.expander(f"{item.get('name', 'Unnamed')} ({item.get('type', '-')})"):
-                    st.write(f"**Start:** {item.get('start_time')}")
-                    st.write(f"**End:** {item.get('end_time')}")
-                    st.write(f"**Status:** `{item.get('status')}`")
-                    st.write(f"**Cost:** {money_fmt(item.get('cost_amount'), item.get('cost_currency'))}")
-                    if item.get("link"):
-                        st.markdown(f"[🔗 Link]({item.get('link')})")
-                    if item.get("notes"):
-                        st.info(item["notes"])
+        # Fetch itinerary (items in the window, bucketed in the trip's time zone)
+        try:
+            itinerary = run_async(tripServices.get_itinerary_buckets(
+                tid, from_ or None, to_ or None, bucket
+            )) or {}
+        except ValueError as e:
+            st.error(str(e))
+            itinerary = {}
+
+        def show_item(item):
+            with st.expander(f"{item.get('name', 'Unnamed')} ({item.get('type', '-')})"):
+                st.write(f"**Start:** {item.get('start_time')}")
+                st.write(f"**End:** {item.get('end_time')}")
+                st.write(f"**Status:** `{item.get('status')}`")
+                st.write(f"**Cost:** {money_fmt(item.get('cost_amount'), item.get('cost_currency'))}")
+                if item.get("link"):
+                    st.markdown(f"[🔗 Link]({item.get('link')})")
+                if item.get("notes"):
+                    st.info(item["notes"])
+
+        buckets = itinerary.get("buckets", [])
+        unscheduled = itinerary.get("unscheduled", [])
+        if buckets or unscheduled:
+            st.markdown(f"### 🗓️ Itinerary Items ({itinerary.get('time_zone')})")
+            for group in buckets:
+                label = group["start"] if bucket == "day" else f"{group['start']} → {group['end']}"
+                st.markdown(f"#### {label}")
+                if not group["items"]:
+                    st.caption("Nothing planned.")
+                for item in group["items"]:
+                    show_item(item)
+            if unscheduled:
+                st.markdown("#### Unscheduled")
+                for item in unscheduled:
+                    show_item(item)
         else:
             st.warning("No itinerary items found.")
 
@@ -289,15 +317,15 @@ with tab_additem:
         end_time = st.text_input("End time (ISO)", "")
         notes = st.text_area("Notes", "")
         subtype = {}
+        default_place = next(iter(run_async(catalog_place_ids(1))), "")
 
         if itype == "travel":
             st.caption("Travel segment")
             mode = st.selectbox("Mode", TRAVEL_MODES, index=0)
             operator = st.text_input("Operator", "")
             number = st.text_input("Number", "")
-            place_table = get_table(PLACE)
-            origin_id = st.text_input("Origin place_id (UUID)", next(iter(place_table)) if place_table else "")
-            destination_id = st.text_input("Destination place_id (UUID)", next(iter(place_table)) if place_table else "")
+            origin_id = st.text_input("Origin place_id (UUID)", default_place)
+            destination_id = st.text_input("Destination place_id (UUID)", default_place)
             depart_time = st.text_input("Depart time (ISO)", start_time)
             arrive_time = st.text_input("Arrive time (ISO)", end_time)
             subtype = {"travel_segment": {
@@ -307,8 +335,7 @@ with tab_additem:
             }}
         elif itype == "lodging":
             st.caption("Lodging")
-            place_table = get_table(PLACE)
-            place_id = st.text_input("place_id (UUID)", next(iter(place_table)) if place_table else "")
+            place_id = st.text_input("place_id (UUID)", default_place)
             check_in = st.text_input("check_in (YYYY-MM-DD)", "")
             check_out = st.text_input("check_out (YYYY-MM-DD)", "")
             provider = st.text_input("Provider", "")
@@ -325,9 +352,8 @@ with tab_additem:
             vehicle = st.selectbox("Vehicle", VEHICLE_TYPES, index=0)
             vendor = st.text_input("Vendor", "")
             confirmation_code = st.text_input("Confirmation", "")
-            place_table = get_table(PLACE)
-            pickup_place_id = st.text_input("Pickup place_id", next(iter(place_table)) if place_table else "")
-            dropoff_place_id = st.text_input("Dropoff place_id", next(iter(place_table)) if place_table else "")
+            pickup_place_id = st.text_input("Pickup place_id", default_place)
+            dropoff_place_id = st.text_input("Dropoff place_id", default_place)
             pickup_time = st.text_input("Pickup time (ISO)", start_time)
             dropoff_time = st.text_input("Dropoff time (ISO)", end_time)
             subtype = {"transport_rental": {
@@ -337,8 +363,7 @@ with tab_additem:
             }}
         elif itype == "event":
             st.caption("Event/activity")
-            place_table = get_table(PLACE)
-            venue_id = st.text_input("venue_id (UUID)", next(iter(place_table)) if place_table else "")
+            venue_id = st.text_input("venue_id (UUID)", default_place)
             category = st.text_input("Category", "excursion")
             admission = st.text_area("Admission (JSON)", "{}")
             try:
@@ -351,6 +376,21 @@ with tab_additem:
                 "admission": admission_obj
             }}
 
+        # The form's place references, resolved with one batched lookup
+        refs = [
+            value for details in subtype.values()
+            for key, value in details.items() if key.endswith("_id") and value
+        ]
+        if refs:
+            try:
+                found = run_async(placeServices.place_loader().load_many(refs))
+                st.caption("Places: " + ", ".join(
+                    place["name"] if place else f"unknown ({ref})"
+                    for ref, place in zip(refs, found)
+                ))
+            except Exception as e:
+                st.caption(f"Places could not be looked up: {e}")
+
         submitted = st.form_submit_button("Create item")
         if submitted:
             body = {
@@ -363,7 +403,7 @@ with tab_additem:
                 "end_time": end_time or None,
                 "notes": notes or None
             } | subtype
-            created = run_async(tripServices.create_itinerary_item(tid, body))
+            created = run_async(itemServices.create_itinerary_item(tid, body))
             st.success("Item created")
             st.json(created)
             st.rerun()
@@ -431,7 +471,7 @@ with tab_budget:
 with tab_docs:
     st.subheader("📄 Required Documents")
 
-    trips = run_async(tripServices.get_trips(USER_ID))
+    trips = run_async(tripServices.get_trips(USER_ID, fields=("id", "title")))
 
     if not trips:
         st.info("Create a trip first.")
@@ -483,7 +523,7 @@ with tab_docs:
 # ---- Export ----
 with tab_export:
     st.subheader("Export (mock)")
-    trips = run_async(tripServices.get_trips(USER_ID))
+    trips = run_async(tripServices.get_trips(USER_ID, fields=("id", "title")))
     if trips:
         trip_map = {t["title"]: t["id"] for t in trips}
         name = st.selectbox("Trip (export)", list(trip_map.keys()), index=0)
@@ -541,9 +581,9 @@ with tab_console:
             elif "patch_trip" in endpoints[ep_name][1]:
                 resp = run_async(tripServices.update_trip(USER_ID ,trip_id_input, body))
             elif "get_itinerary" in endpoints[ep_name][1]:
-                resp = run_async(tripServices.get_itinerary(trip_id_input))# should update service with this functionality: qs_from or None, qs_to or None, qs_bucket or "day")
+                resp = run_async(tripServices.get_itinerary_buckets(trip_id_input, qs_from or None, qs_to or None, qs_bucket or "day"))
             elif "post_item" in endpoints[ep_name][1]:
-                resp = run_async(tripServices.create_itinerary_item(trip_id_input, body))
+                resp = run_async(itemServices.create_itinerary_item(trip_id_input, body))
             #elif "patch_item" in endpoints[ep_name][1]:
             #    resp = run_async(tripServices.upda(item_id_input, body))
             #elif "post_ticket" in endpoints[ep_name][1]:
@@ -553,7 +593,7 @@ with tab_console:
             elif "post_budget" in endpoints[ep_name][1]:
                 resp = run_async(tripServices.create_budget_entry(trip_id_input, body))
             elif "export_trip" in endpoints[ep_name][1]:
-                resp = run_async(tripServices.export_trip_data(trip_id_input))# should include format aswell, qs_format or "md")
+                resp = run_async(tripServices.export_trip_data(trip_id_input)).decode()# should include format aswell, qs_format or "md")
             else:
                 resp = {"error": "Unknown endpoint"}
             st.success("Response")
@@ -0,0 +1,66 @@
+-- Create itinerary items together with their subtype rows in one call.
+--
+-- `entries` is a JSON array of {"item": {...}, "subtype_table": text,
+-- "subtype": {...}}; subtype_table/subtype may be null. Only the keys
+-- present are inserted, so column defaults still apply. The function body
+-- is one transaction: if any row fails, nothing is written.
+-- Returns the created items, each with its subtype row nested under the
+-- subtype table name.
+
+create or replace function create_itinerary_items(entries jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    entry jsonb;
+    payload jsonb;
+    subtype_table text;
+    columns text;
+    item jsonb;
+    subtype jsonb;
+    created jsonb := '[]'::jsonb;
+begin
+    for entry in select value from jsonb_array_elements(entries)
+    loop
+        payload := entry -> 'item';
+        select string_agg(quote_ident(key), ',')
+          into columns
+          from jsonb_object_keys(payload) as key;
+
+        execute format(
+            'insert into itinerary_item (%1$s) '
+            'select %1$s from jsonb_populate_record(null::itinerary_item, $1) '
+            'returning to_jsonb(itinerary_item.*)',
+            columns
+        ) using payload into item;
+
+        subtype_table := entry ->> 'subtype_table';
+        if subtype_table is not null then
+            if subtype_table not in (
+                'lodging', 'travel_segment', 'transport_rental', 'event_activity'
+            ) then
+                raise exception 'Unknown item subtype: %', subtype_table;
+            end if;
+
+            payload := coalesce(entry -> 'subtype', '{}'::jsonb)
+                || jsonb_build_object('item_id', item -> 'id');
+            select string_agg(quote_ident(key), ',')
+              into columns
+              from jsonb_object_keys(payload) as key;
+
+            execute format(
+                'insert into %1$I (%2$s) '
+                'select %2$s from jsonb_populate_record(null::%1$I, $1) '
+                'returning to_jsonb(%1$I.*)',
+                subtype_table, columns
+            ) using payload into subtype;
+
+            item := item || jsonb_build_object(subtype_table, subtype);
+        end if;
+
+        created := created || jsonb_build_array(item);
+    end loop;
+
+    return created;
+end;
+$$;
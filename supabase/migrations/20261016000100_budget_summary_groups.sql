@@ -0,0 +1,28 @@
+-- Budget totals of a trip grouped by (category, currency, day), the input
+-- of GET /trips/{id}/budget/summary. An entry's day is its linked item's
+-- start (else when it was recorded) as a date in the trip's time zone.
+
+create or replace function budget_summary_groups(p_trip_id uuid)
+returns table (
+    category text,
+    currency text,
+    day date,
+    total numeric,
+    entries bigint
+)
+language sql
+stable
+as $$
+    select
+        e.category,
+        upper(e.currency),
+        (coalesce(i.start_time, e.created_at)
+            at time zone coalesce(t.time_zone, 'UTC'))::date,
+        sum(e.amount),
+        count(*)
+    from budget_entry e
+    join trip t on t.id = e.trip_id
+    left join itinerary_item i on i.id = e.item_id
+    where e.trip_id = p_trip_id
+    group by 1, 2, 3;
+$$;
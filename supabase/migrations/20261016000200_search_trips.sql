@@ -0,0 +1,78 @@
+-- Full-text search over a user's trips (title, notes) and itinerary
+-- items (name, notes, link), for GET /search.
+--
+-- The vectors are expression indexes rather than stored columns, so
+-- `select *` on the tables doesn't start returning them. The 'simple'
+-- configuration doesn't stem, which keeps names and foreign words
+-- ("ryokan") matchable by prefix.
+
+create or replace function trip_search_vector(title text, notes text)
+returns tsvector
+language sql
+immutable
+as $$
+    select setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(notes, '')), 'B');
+$$;
+
+create or replace function item_search_vector(name text, notes text, link text)
+returns tsvector
+language sql
+immutable
+as $$
+    select setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(notes, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(link, '')), 'C');
+$$;
+
+create index if not exists trip_search_idx
+    on trip using gin (trip_search_vector(title, notes));
+
+create index if not exists itinerary_item_search_idx
+    on itinerary_item using gin (item_search_vector(name, notes, link));
+
+-- `p_query` is a to_tsquery expression, e.g. 'kyoto:* & ryo:*'.
+-- Snippets are only built for the rows that make the cut.
+create or replace function search_trips(
+    p_user_id uuid,
+    p_query text,
+    p_limit int default 20
+)
+returns table (
+    kind text,
+    id uuid,
+    trip_id uuid,
+    title text,
+    snippet text,
+    rank real
+)
+language sql
+stable
+as $$
+    with query as (
+        select to_tsquery('simple', p_query) as q
+    ),
+    hits as (
+        select 'trip' as kind, t.id, t.id as trip_id, t.title,
+               concat_ws(' ', t.title, t.notes) as body,
+               ts_rank(trip_search_vector(t.title, t.notes), query.q) as rank
+          from trip t, query
+         where t.owner_user_id = p_user_id
+           and trip_search_vector(t.title, t.notes) @@ query.q
+        union all
+        select 'item', i.id, i.trip_id, i.name,
+               concat_ws(' ', i.name, i.notes, i.link),
+               ts_rank(item_search_vector(i.name, i.notes, i.link), query.q)
+          from itinerary_item i
+          join trip t on t.id = i.trip_id, query
+         where t.owner_user_id = p_user_id
+           and item_search_vector(i.name, i.notes, i.link) @@ query.q
+        order by rank desc, id
+        limit p_limit
+    )
+    select hits.kind, hits.id, hits.trip_id, hits.title,
+           ts_headline('simple', hits.body, query.q, 'MaxFragments=1, MaxWords=12, MinWords=4'),
+           hits.rank
+      from hits, query
+     order by hits.rank desc, hits.id;
+$$;
@@ -0,0 +1,31 @@
+-- Stamp updated_at on every write to trip and itinerary_item.
+--
+-- Export versions, trip ETags and the conflict index all compare
+-- updated_at to tell whether a row changed, so it has to move on every
+-- insert and update, including writes that don't set it (the item insert
+-- paths, create_itinerary_items, edits made outside the API).
+
+create or replace function touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+update trip set updated_at = coalesce(created_at, now())
+    where updated_at is null;
+update itinerary_item set updated_at = coalesce(created_at, now())
+    where updated_at is null;
+
+drop trigger if exists trip_touch_updated_at on trip;
+create trigger trip_touch_updated_at
+    before insert or update on trip
+    for each row execute function touch_updated_at();
+
+drop trigger if exists itinerary_item_touch_updated_at on itinerary_item;
+create trigger itinerary_item_touch_updated_at
+    before insert or update on itinerary_item
+    for each row execute function touch_updated_at();
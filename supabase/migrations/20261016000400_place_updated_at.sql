@@ -0,0 +1,19 @@
+-- Give every place an updated_at, stamped on each write.
+--
+-- The place catalog refreshes incrementally from an (updated_at, id)
+-- watermark in (updated_at nulls last, id) order. Rows without a stamp
+-- sort after every stamped one, so a place that later got one would be
+-- behind the watermark and missed; with the column required and kept
+-- current by the trigger, every change lands after it.
+
+update place set updated_at = coalesce(created_at, now())
+    where updated_at is null;
+
+alter table place
+    alter column updated_at set default now(),
+    alter column updated_at set not null;
+
+drop trigger if exists place_touch_updated_at on place;
+create trigger place_touch_updated_at
+    before insert or update on place
+    for each row execute function touch_updated_at();
@@ -0,0 +1,181 @@
+"""
+Token verification
+"""
+
+import time
+import asyncio
+import hashlib
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.configs import config
+from app.utils import auth
+
+
+SECRET = "test-secret-with-enough-bytes-for-hs256"
+
+
+class _Response:
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self._body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+@pytest.fixture(autouse=True)
+def _auth(monkeypatch):
+    monkeypatch.setattr(config, "AUTH_MODE", "local")
+    monkeypatch.setattr(config, "SUPABASE_JWT_SECRET", SECRET)
+    monkeypatch.setattr(auth, "_jwks", auth._JWKSCache("http://jwks", 600))
+    monkeypatch.setattr(auth, "_token_cache", auth.TTLCache(max_entries=16, ttl=300))
+    monkeypatch.setattr(auth, "_inflight", {})
+
+
+def _token(key=SECRET, algorithm="HS256", headers=None, **claims) -> str:
+    claims = {
+        "sub": "user-1",
+        "aud": config.JWT_AUDIENCE,
+        "iss": config.JWT_ISSUER,
+        "exp": int(time.time()) + 3600,
+        **claims,
+    }
+    return jwt.encode(
+        {name: value for name, value in claims.items() if value is not None},
+        key,
+        algorithm=algorithm,
+        headers=headers
+    )
+
+
+def _resolve(token: str) -> str:
+    return asyncio.run(auth._resolve_token(token))
+
+
+def _rejected(token: str):
+    with pytest.raises(HTTPException) as e:
+        _resolve(token)
+    assert e.value.status_code == 401
+
+
+def test_hs256_signed_with_the_secret():
+    assert _resolve(_token()) == "user-1"
+
+
+def test_hs256_signed_with_another_secret():
+    _rejected(_token(key="another-secret-with-enough-bytes-too"))
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "someone-else"},
+    {"aud": None},
+    {"iss": "https://evil.example/auth/v1"},
+    {"iss": None},
+])
+def test_audience_and_issuer(claims):
+    _rejected(_token(**claims))
+
+
+def test_expired_token():
+    expired = int(time.time()) - config.JWT_LEEWAY_SECONDS - 60
+    _rejected(_token(exp=expired))
+
+
+def test_kid_missing_from_the_jwks(monkeypatch):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    fetches = []
+
+    async def get(url, **kwargs):
+        fetches.append(url)
+        return _Response(200, {"keys": [{**jwk, "kid": "known", "alg": "RS256"}]})
+
+    monkeypatch.setattr(auth.http, "get", get)
+
+    signed = _token(key=private_key, algorithm="RS256", headers={"kid": "known"})
+    assert _resolve(signed) == "user-1"
+
+    _rejected(_token(key=private_key, algorithm="RS256", headers={"kid": "rotated-away"}))
+    assert fetches == ["http://jwks"]
+
+
+def test_hs256_goes_remote_without_the_secret(monkeypatch):
+    monkeypatch.setattr(config, "SUPABASE_JWT_SECRET", None)
+    calls = []
+
+    async def get(url, headers=None, **kwargs):
+        calls.append((url, headers["Authorization"]))
+        return _Response(200, {"id": "remote-user"})
+
+    monkeypatch.setattr(auth.http, "get", get)
+
+    token = _token(key="a-secret-this-process-does-not-know")
+    assert _resolve(token) == "remote-user"
+    assert calls == [(f"{config.SUPABASE_URL}/auth/v1/user", f"Bearer {token}")]
+
+
+def _request(token: str) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    })
+
+
+def _expires_in(token: str) -> float:
+    key = hashlib.sha256(token.encode()).digest()
+    _, expires_at = auth._token_cache._entries[key]
+    return expires_at - time.monotonic()
+
+
+def test_cached_identity_expires_with_the_token():
+    soon = _token(exp=int(time.time()) + 20)
+    later = _token(exp=int(time.time()) + 3600)
+
+    async def run():
+        for token in (soon, later):
+            assert await auth._get_current_user_id(_request(token)) == "user-1"
+
+    asyncio.run(run())
+    assert 0 < _expires_in(soon) <= 20
+    assert 20 < _expires_in(later) <= auth._token_cache.ttl
+
+
+def test_failed_lookups_are_cached_briefly(monkeypatch):
+    monkeypatch.setattr(config, "AUTH_MODE", "remote")
+    monkeypatch.setattr(config, "AUTH_NEGATIVE_TTL_SECONDS", 0.2)
+    calls = []
+
+    async def get(url, **kwargs):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return _Response(401, {})
+
+    monkeypatch.setattr(auth.http, "get", get)
+    token = _token()
+
+    async def attempt():
+        with pytest.raises(HTTPException) as e:
+            await auth._get_current_user_id(_request(token))
+        assert e.value.status_code == 401
+
+    async def run():
+        # Concurrent misses share one lookup, and its failure is reused
+        await asyncio.gather(attempt(), attempt(), attempt())
+        await attempt()
+        assert len(calls) == 1
+
+        await asyncio.sleep(0.3)
+        await attempt()
+        assert len(calls) == 2
+
+    asyncio.run(run())
+    stats = auth.token_cache_stats()
+    assert stats["hits"] == 1 and stats["inflight"] == 0
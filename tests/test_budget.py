@@ -0,0 +1,45 @@
+"""
+Budget rollups
+"""
+
+import json
+import asyncio
+
+from app.services import budget
+from app.services._fx_rates import _FXRates
+
+
+def test_group_entries_by_category_currency_and_local_day():
+    entries = [
+        {"category": "food", "currency": "eur", "amount": 10, "created_at": "2025-06-01T23:30:00+00:00"},
+        {"category": "food", "currency": "EUR", "amount": "2.5", "created_at": "2025-06-01T10:00:00+00:00"},
+        {"category": "lodging", "currency": "USD", "amount": 100, "created_at": "2025-05-01T00:00:00+00:00", "item_id": "hotel"},
+        {"category": None, "currency": None, "amount": None, "created_at": None},
+    ]
+    groups = budget.group_entries(entries, {"hotel": "2025-06-03T15:00:00+00:00"}, "Europe/Paris")
+
+    assert sorted(groups, key=lambda group: str(group["day"])) == [
+        {"category": "food", "currency": "EUR", "day": "2025-06-01", "total": 2.5, "entries": 1},
+        {"category": "food", "currency": "EUR", "day": "2025-06-02", "total": 10.0, "entries": 1},
+        {"category": "lodging", "currency": "USD", "day": "2025-06-03", "total": 100.0, "entries": 1},
+        {"category": None, "currency": "", "day": None, "total": 0.0, "entries": 1},
+    ]
+
+
+def test_summary_converts_with_the_fx_file(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps({"base": "USD", "as_of": "2025-06-01", "rates": {"EUR": 0.5}}))
+    fx = asyncio.run(_FXRates(str(path), ttl=60).snapshot_async())
+
+    summary = budget.summarize([
+        {"category": "food", "currency": "EUR", "day": "2025-06-01", "total": 10, "entries": 2},
+        {"category": "food", "currency": "JPY", "day": "2025-06-01", "total": 500, "entries": 1},
+        {"category": "lodging", "currency": "USD", "day": "2025-06-02", "total": 80, "entries": 1},
+    ], "usd", fx)
+
+    assert summary["fx_as_of"] == "2025-06-01"
+    assert summary["by_category"]["lodging"]["total"] == 80.0
+    assert summary["by_category"]["food"]["total"] is None
+    assert summary["by_day"]["2025-06-01"]["by_currency"] == {"EUR": 10.0, "JPY": 500.0}
+    assert summary["unconverted_currencies"] == ["JPY"]
+    assert summary["entries"] == 4
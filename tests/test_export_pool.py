@@ -0,0 +1,38 @@
+"""
+Export worker processes
+"""
+
+import os
+import asyncio
+import subprocess
+import sys
+
+from app.services import _export_pool
+
+
+def test_renderer_import_does_not_build_the_app():
+    # What a forkserver worker imports to unpickle render_export
+    check = (
+        "import sys, app.services._trips_formatting; "
+        "assert 'app.build' not in sys.modules and 'supabase' not in sys.modules"
+    )
+    subprocess.run(
+        [sys.executable, "-c", check],
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def test_render_returns_bytes():
+    trip = {"id": "t", "title": "Lisbon", "description": "Café"}
+    item = {"id": "i", "name": "Tram 28", "type": "event_activity"}
+
+    async def render():
+        try:
+            return await _export_pool.render(trip, [item], "md")
+        finally:
+            _export_pool.shutdown()
+
+    body = asyncio.run(render())
+    assert isinstance(body, bytes)
+    assert "Café".encode() in body and b"Tram 28" in body
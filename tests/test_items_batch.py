@@ -0,0 +1,32 @@
+"""
+Bulk itinerary item creation
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+from app.configs import config
+from app.services import items
+
+
+def test_a_chunk_that_times_out_fails_only_its_rows(monkeypatch):
+    monkeypatch.setattr(config, "ITEM_BATCH_CHUNK_SIZE", 2)
+
+    async def execute(query):
+        rows = query.json
+        if rows[0]["name"] == "c":
+            raise httpx.ReadTimeout("timed out")
+        return SimpleNamespace(data=[{**row, "id": row["name"]} for row in rows])
+
+    monkeypatch.setattr(items, "execute", execute)
+
+    results = asyncio.run(items.create_itinerary_items("trip", [
+        {"type": "event_activity", "name": name} for name in "abcd"
+    ] + [{"name": "no type"}]))
+
+    assert [result["ok"] for result in results] == [True, True, False, False, False]
+    assert results[1]["item"]["id"] == "b"
+    assert results[2]["error"] == "Insert failed: timed out"
+    assert results[4]["index"] == 4
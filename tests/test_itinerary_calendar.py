@@ -0,0 +1,130 @@
+"""
+Day and week bucketing of itinerary items
+"""
+
+import asyncio
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+from app.services import trips
+from app.services import _itinerary_calendar as calendar
+
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+# Clocks in New York went forward at 2am local on Sunday 2025-03-09
+BEFORE_DST = "2025-03-09T04:30:00+00:00"    # 23:30 EST, Saturday the 8th
+AFTER_DST = "2025-03-10T03:30:00+00:00"     # 23:30 EDT, Sunday the 9th
+
+
+def _item(id, start, end=None, all_day=False):
+    return {"id": id, "start_time": start, "end_time": end, "all_day": all_day}
+
+
+def _ids(result):
+    return {b["start"]: [item["id"] for item in b["items"]] for b in result["buckets"]}
+
+
+def test_trip_zone():
+    assert calendar.trip_zone("America/New_York") == NEW_YORK
+    assert calendar.trip_zone(None) == ZoneInfo("UTC")
+    assert calendar.trip_zone("Nowhere/Special") is timezone.utc
+
+
+def test_local_midnight_across_dst():
+    assert calendar.local_midnight(date(2025, 3, 9), NEW_YORK) \
+        == datetime(2025, 3, 9, 5, tzinfo=timezone.utc)
+    assert calendar.local_midnight(date(2025, 3, 10), NEW_YORK) \
+        == datetime(2025, 3, 10, 4, tzinfo=timezone.utc)
+
+
+def test_item_days_in_the_trip_zone():
+    before, after = _item("a", BEFORE_DST), _item("b", AFTER_DST)
+    assert calendar.item_days(before, NEW_YORK) == (date(2025, 3, 8), date(2025, 3, 8))
+    assert calendar.item_days(after, NEW_YORK) == (date(2025, 3, 9), date(2025, 3, 9))
+    assert calendar.item_days(before, timezone.utc)[0] == date(2025, 3, 9)
+    assert calendar.item_days(after, timezone.utc)[0] == date(2025, 3, 10)
+
+
+def test_item_days_edges():
+    # Ends at local midnight (04:00 UTC, after the change): no spill
+    late = _item("a", "2025-03-10T02:00:00+00:00", "2025-03-10T04:00:00+00:00")
+    assert calendar.item_days(late, NEW_YORK) == (date(2025, 3, 9), date(2025, 3, 9))
+
+    # All-day items keep their dates whatever the zone
+    all_day = _item("b", "2025-03-09T00:00:00+00:00", "2025-03-10T00:00:00+00:00", True)
+    assert calendar.item_days(all_day, NEW_YORK) == (date(2025, 3, 9), date(2025, 3, 10))
+
+    # Naive times are UTC
+    naive = _item("c", "2025-03-09T04:30:00")
+    assert calendar.item_days(naive, NEW_YORK)[0] == date(2025, 3, 8)
+
+    assert calendar.item_days(_item("d", None), NEW_YORK) is None
+
+
+def test_day_buckets_across_dst():
+    items = [
+        _item("before", BEFORE_DST),
+        _item("after", AFTER_DST),
+        # Noon Saturday to noon Monday local, across the change
+        _item("long", "2025-03-08T17:00:00+00:00", "2025-03-10T16:00:00+00:00"),
+        _item("unscheduled", None),
+    ]
+    result = calendar.bucket_items(items, NEW_YORK, "day")
+    assert _ids(result) == {
+        "2025-03-08": ["before", "long"],
+        "2025-03-09": ["after", "long"],
+        "2025-03-10": ["long"],
+    }
+    assert [item["id"] for item in result["unscheduled"]] == ["unscheduled"]
+
+    utc = calendar.bucket_items(items, timezone.utc, "day")
+    assert _ids(utc)["2025-03-09"] == ["before", "long"]
+    assert _ids(utc)["2025-03-10"] == ["after", "long"]
+
+
+def test_day_buckets_with_bounds_keep_empty_days():
+    items = [
+        _item("long", "2025-03-08T17:00:00+00:00", "2025-03-10T16:00:00+00:00"),
+        _item("outside", "2025-03-20T12:00:00+00:00"),
+    ]
+    result = calendar.bucket_items(
+        items, NEW_YORK, "day", date(2025, 3, 9), date(2025, 3, 11)
+    )
+    assert _ids(result) == {
+        "2025-03-09": ["long"],
+        "2025-03-10": ["long"],
+        "2025-03-11": [],
+    }
+    assert result["buckets"][0]["end"] == "2025-03-09"
+
+
+def test_week_buckets_follow_the_zone():
+    # The 9th is a Sunday; in UTC the late item falls on Monday the 10th
+    items = [_item("before", BEFORE_DST), _item("after", AFTER_DST)]
+
+    local = calendar.bucket_items(items, NEW_YORK, "week")
+    assert _ids(local) == {"2025-03-03": ["before", "after"]}
+    assert local["buckets"][0]["end"] == "2025-03-09"
+
+    utc = calendar.bucket_items(items, timezone.utc, "week")
+    assert _ids(utc) == {"2025-03-03": ["before"], "2025-03-10": ["after"]}
+
+
+def test_itinerary_buckets_use_the_trips_time_zone(monkeypatch):
+    items = [_item("before", BEFORE_DST), _item("after", AFTER_DST)]
+
+    async def get_trip(trip_id):
+        return {"id": trip_id, "time_zone": "America/New_York"}
+
+    async def get_itinerary(trip_id, fields, date_from, date_to, time_zone):
+        return items
+
+    monkeypatch.setattr(trips, "get_trip", get_trip)
+    monkeypatch.setattr(trips, "get_itinerary", get_itinerary)
+
+    result = asyncio.run(trips.get_itinerary_buckets(
+        "trip", "2025-03-08", "2025-03-10", "day"
+    ))
+    assert result["time_zone"] == "America/New_York"
+    assert _ids(result) == {"2025-03-08": ["before"], "2025-03-09": ["after"]}
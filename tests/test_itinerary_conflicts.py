@@ -0,0 +1,179 @@
+"""
+Conflict index and lodging gaps
+"""
+
+import asyncio
+from datetime import timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from app.services import trips
+from app.services._itinerary_conflicts import ConflictIndex
+from app.services._conflict_cache import conflict_indexes, add_created_items
+
+
+UTC = timezone.utc
+
+
+def _item(id, type, start, end, all_day=False, name=None):
+    return {
+        "id": id,
+        "type": type,
+        "name": name or id,
+        "start_time": start,
+        "end_time": end,
+        "all_day": all_day,
+        "updated_at": "2025-05-01T00:00:00+00:00",
+    }
+
+
+def _kinds(index):
+    return [(c["kind"], c["items"]) for c in index.conflicts()]
+
+
+def test_overlapping_timed_items():
+    index = ConflictIndex(UTC, [
+        _item("a", "event_activity", "2025-06-02T09:00:00Z", "2025-06-02T11:00:00Z"),
+        _item("b", "event_activity", "2025-06-02T10:00:00Z", "2025-06-02T12:00:00Z"),
+        _item("c", "event_activity", "2025-06-02T12:00:00Z", "2025-06-02T13:00:00Z"),
+    ])
+    conflicts = index.conflicts()
+    assert _kinds(index) == [("overlap", ["a", "b"])]
+    assert conflicts[0]["start"] == "2025-06-02T10:00:00+00:00"
+    assert conflicts[0]["end"] == "2025-06-02T11:00:00+00:00"
+
+
+def test_lodging_and_rentals_only_clash_with_their_own_kind():
+    index = ConflictIndex(UTC, [
+        _item("hotel", "lodging", "2025-06-01", "2025-06-04", all_day=True),
+        _item("hostel", "lodging", "2025-06-03", "2025-06-05", all_day=True),
+        _item("car", "transport_rental", "2025-06-01", "2025-06-02", all_day=True),
+        _item("van", "transport_rental", "2025-06-02", "2025-06-03", all_day=True),
+        _item("tour", "event_activity", "2025-06-03T09:00:00Z", "2025-06-03T17:00:00Z"),
+    ])
+    assert _kinds(index) == [
+        ("double_booked_rental", ["car", "van"]),
+        ("double_booked_lodging", ["hostel", "hotel"]),
+    ]
+    lodging = index.conflicts()[1]
+    assert (lodging["start"], lodging["end"]) == ("2025-06-03", "2025-06-04")
+
+
+def test_flight_across_hotel_check_in():
+    items = [
+        _item("hotel", "lodging", "2025-06-02T15:00:00Z", "2025-06-05T11:00:00Z"),
+        _item("flight", "travel_segment", "2025-06-02T13:00:00Z", "2025-06-02T16:00:00Z"),
+        # Ends right at check-out: not a clash
+        _item("tour", "event_activity", "2025-06-05T09:00:00Z", "2025-06-05T11:00:00Z"),
+    ]
+    index = ConflictIndex(UTC, items)
+    conflicts = index.conflicts()
+    assert _kinds(index) == [("check_in_overlap", ["flight", "hotel"])]
+    assert conflicts[0]["start"] == conflicts[0]["end"] == "2025-06-02T15:00:00+00:00"
+
+
+def test_add_matches_a_full_build():
+    items = [
+        _item("hotel", "lodging", "2025-06-02T15:00:00Z", "2025-06-05T11:00:00Z"),
+        _item("car", "transport_rental", "2025-06-05T10:00:00Z", "2025-06-08T10:00:00Z"),
+        _item("flight", "travel_segment", "2025-06-02T13:00:00Z", "2025-06-02T16:00:00Z"),
+        _item("museum", "event_activity", "2025-06-05T09:00:00Z", "2025-06-05T12:00:00Z"),
+        _item("dinner", "event_activity", "2025-06-05T11:30:00Z", "2025-06-05T13:00:00Z"),
+    ]
+    built = ConflictIndex(UTC, items)
+
+    for order in (items, items[::-1]):
+        index = ConflictIndex(UTC)
+        added = sum(index.add(item) for item in order)
+        assert index.conflicts() == built.conflicts()
+        assert added == len(built.conflicts())
+
+    assert _kinds(built) == [
+        ("check_in_overlap", ["flight", "hotel"]),
+        ("pickup_overlap", ["car", "museum"]),
+        ("check_out_overlap", ["hotel", "museum"]),
+        ("overlap", ["dinner", "museum"]),
+    ]
+
+
+def test_add_ignores_known_items():
+    item = _item("a", "event_activity", "2025-06-02T09:00:00Z", "2025-06-02T11:00:00Z")
+    index = ConflictIndex(UTC, [item])
+    assert index.add(dict(item, start_time="2025-06-02T10:00:00Z")) == 0
+    assert index.conflicts() == []
+
+
+def test_times_are_reported_in_the_trip_zone():
+    index = ConflictIndex(ZoneInfo("Europe/Lisbon"), [
+        _item("a", "event_activity", "2025-06-02T09:00:00Z", "2025-06-02T11:00:00Z"),
+        _item("b", "event_activity", "2025-06-02T10:00:00Z", "2025-06-02T12:00:00Z"),
+    ])
+    assert index.conflicts()[0]["start"] == "2025-06-02T11:00:00+01:00"
+
+
+def test_unscheduled_and_all_day_items_never_clash():
+    index = ConflictIndex(UTC, [
+        _item("a", "event_activity", None, None),
+        _item("b", "event_activity", "2025-06-02", "2025-06-02", all_day=True),
+        _item("c", "event_activity", "2025-06-02T00:00:00Z", "2025-06-03T00:00:00Z"),
+        _item("d", "event_activity", "2025-06-02T10:00:00Z", "2025-06-02T10:00:00Z"),
+    ])
+    assert index.conflicts() == []
+
+
+def test_lodging_gaps():
+    index = ConflictIndex(UTC, [
+        _item("hotel", "lodging", "2025-06-02", "2025-06-04", all_day=True),
+        _item("inn", "lodging", "2025-06-06T15:00:00Z", "2025-06-07T10:00:00Z"),
+    ])
+    assert index.lodging_gaps("2025-06-01", "2025-06-09") == [
+        {"kind": "missing_lodging", "from": "2025-06-01", "to": "2025-06-02", "nights": 1},
+        {"kind": "missing_lodging", "from": "2025-06-04", "to": "2025-06-06", "nights": 2},
+        {"kind": "missing_lodging", "from": "2025-06-07", "to": "2025-06-09", "nights": 2},
+    ]
+
+
+def test_lodging_gaps_without_usable_dates():
+    index = ConflictIndex(UTC)
+    assert index.lodging_gaps(None, "2025-06-09") == []
+    assert index.lodging_gaps("2025-06-09", "2025-06-01") == []
+    assert index.lodging_gaps("June", "2025-06-09") == []
+    assert index.lodging_gaps("2025-06-01", "2025-06-03") == [
+        {"kind": "missing_lodging", "from": "2025-06-01", "to": "2025-06-03", "nights": 2},
+    ]
+
+
+def test_is_current():
+    a = _item("a", "event_activity", "2025-06-02T09:00:00Z", "2025-06-02T11:00:00Z")
+    index = ConflictIndex(UTC, [a])
+    newest = {"id": "a", "updated_at": a["updated_at"]}
+
+    assert index.is_current(1, newest)
+    assert not index.is_current(2, newest)
+    assert not index.is_current(1, dict(newest, updated_at="2025-05-02T00:00:00+00:00"))
+    assert not index.is_current(1, dict(newest, id="b"))
+    assert ConflictIndex(UTC).is_current(0, None)
+
+
+def test_created_items_update_a_kept_index(monkeypatch):
+    a = _item("a", "event_activity", "2025-06-02T09:00:00Z", "2025-06-02T11:00:00Z")
+    b = _item("b", "event_activity", "2025-06-02T10:00:00Z", "2025-06-02T12:00:00Z")
+    kept = ConflictIndex(trips.calendar.trip_zone(None), [a])
+    conflict_indexes.set("trip", kept)
+    add_created_items("trip", [b])
+
+    queries = []
+
+    async def execute(query):
+        queries.append(query)
+        return SimpleNamespace(data=[{"id": "b", "updated_at": b["updated_at"]}], count=2)
+
+    monkeypatch.setattr(trips, "execute", execute)
+    try:
+        index = asyncio.run(trips._conflict_index("trip", None))
+    finally:
+        conflict_indexes.delete("trip")
+
+    # Served from the kept index after a single version check
+    assert index is kept and len(queries) == 1
+    assert _kinds(index) == [("overlap", ["a", "b"])]
@@ -0,0 +1,39 @@
+"""
+Request-scoped DataLoader
+"""
+
+import gc
+import asyncio
+
+from app.utils.loader import DataLoader, request_scope, get_loader
+
+
+def test_loads_are_batched_and_deduped():
+    calls = []
+
+    async def batch(keys):
+        calls.append(keys)
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    async def run():
+        loader = DataLoader(batch)
+        pending = asyncio.ensure_future(loader.load_many(["a", "b", "a", "missing"]))
+        # Let the loads register, then make sure nothing but the loader
+        # keeps the dispatch alive
+        await asyncio.sleep(0)
+        gc.collect()
+        values = await pending
+        assert not loader._dispatch_tasks
+        return values
+
+    assert asyncio.run(run()) == ["A", "B", "A", None]
+    assert calls == [["a", "b", "missing"]]
+
+
+def test_loaders_are_shared_within_a_request():
+    async def batch(keys):
+        return {}
+
+    with request_scope():
+        assert get_loader("place", batch) is get_loader("place", batch)
+    assert get_loader("place", batch) is not get_loader("place", batch)
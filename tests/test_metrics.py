@@ -0,0 +1,48 @@
+"""
+Metrics exposition
+"""
+
+import re
+import asyncio
+
+from app.routers import metrics
+from app.services import places
+from app.utils.metrics import stats_metrics
+
+
+_SAMPLE = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*"'
+    r'(,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*")*\})?'
+    r' [-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?$'
+)
+
+
+def _render() -> str:
+    return asyncio.run(metrics.get_metrics()).body.decode()
+
+
+def test_metrics_body_is_valid_prometheus_text():
+    places.catalog.upsert({"id": "p", "lat": 1, "lng": 1})
+
+    body = _render()
+
+    for line in body.splitlines():
+        if line.startswith("#"):
+            assert re.match(r"^# (HELP|TYPE) [a-zA-Z_:][a-zA-Z0-9_:]* \S", line), line
+        else:
+            assert _SAMPLE.match(line), line
+    assert "atlas_place_catalog_grid_levels " in body
+
+
+def test_stats_counters_are_typed_as_counters():
+    text = stats_metrics("atlas_test_cache", "Test cache", {
+        "size": 3, "bytes": 10, "hit_ratio": 0.5, "hits": 7, "evictions": 1,
+    })
+
+    assert "# TYPE atlas_test_cache_hits_total counter\natlas_test_cache_hits_total 7" in text
+    assert "# TYPE atlas_test_cache_evictions_total counter" in text
+    assert "# TYPE atlas_test_cache_size gauge\natlas_test_cache_size 3" in text
+    assert "# TYPE atlas_test_cache_bytes gauge" in text
+    assert "# TYPE atlas_test_cache_hit_ratio gauge" in text
+    assert "atlas_test_cache_hits " not in text
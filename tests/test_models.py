@@ -0,0 +1,26 @@
+"""
+Request models
+"""
+
+import pytest
+
+from app.models.items import ItineraryItemCreate
+from app.models.budget import BudgetEntryCreate
+
+
+@pytest.mark.parametrize("amount", ["NaN", "Infinity", "-Infinity", "1e999"])
+def test_non_finite_amounts_are_rejected(amount):
+    with pytest.raises(ValueError, match="cost_amount: must be a finite number"):
+        ItineraryItemCreate.parse(f'{{"type": "food", "cost_amount": {amount}}}')
+    with pytest.raises(ValueError, match="amount: must be a finite number"):
+        BudgetEntryCreate.parse(
+            f'{{"category": "food", "amount": {amount}, "currency": "eur"}}'
+        )
+
+
+def test_finite_amounts_are_kept():
+    item = ItineraryItemCreate.parse('{"type": "food", "cost_amount": 12.5}')
+    entry = BudgetEntryCreate.parse({"category": "food", "amount": 3, "currency": "eur"})
+
+    assert item.cost_amount == 12.5
+    assert entry.amount == 3 and entry.currency == "EUR"
@@ -0,0 +1,59 @@
+"""
+Keyset cursors
+"""
+
+import pytest
+
+from app.utils.pagination import (
+    encode_cursor, decode_cursor, keyset_filter, build_page
+)
+
+
+@pytest.mark.parametrize("values", [
+    ["2025-05-01T10:00:00.123456+00:00", "0b6c2f9e-0000-4000-8000-000000000001"],
+    [None, "0b6c2f9e-0000-4000-8000-000000000002"],
+    ["naïve, (odd) \"value\": with=padding?", "id"],
+])
+def test_cursor_round_trip(values):
+    token = encode_cursor("trip", values)
+    assert "=" not in token and "+" not in token and "/" not in token
+    assert decode_cursor("trip", token) == values
+
+
+@pytest.mark.parametrize("token", [
+    encode_cursor("itinerary", ["2025-06-02", "id"]),
+    "not a cursor",
+    "",
+    encode_cursor("trip", "not a list"),
+])
+def test_bad_cursors(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("trip", token)
+
+
+def test_page_cursor_after_null_created_at():
+    rows = [
+        {"id": "a", "created_at": "2025-05-01T10:00:00+00:00"},
+        {"id": "b", "created_at": None},
+        {"id": "c", "created_at": None},
+    ]
+    page = build_page("trip", rows, 2, "created_at")
+    assert [row["id"] for row in page["items"]] == ["a", "b"]
+
+    created_at, last_id = decode_cursor("trip", page["next_cursor"])
+    assert (created_at, last_id) == (None, "b")
+    assert keyset_filter("created_at", created_at, last_id) \
+        == 'and(created_at.is.null,id.gt."b")'
+
+
+def test_last_page_has_no_cursor():
+    page = build_page("trip", [{"id": "a", "created_at": None}], 2, "created_at")
+    assert page["next_cursor"] is None
+
+
+def test_keyset_filter_after_a_value():
+    assert keyset_filter("start_time", "2025-06-02T09:00:00+00:00", "a") == (
+        'start_time.gt."2025-06-02T09:00:00+00:00",'
+        'and(start_time.eq."2025-06-02T09:00:00+00:00",id.gt."a"),'
+        'start_time.is.null'
+    )
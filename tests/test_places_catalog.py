@@ -0,0 +1,72 @@
+"""
+Place catalog
+"""
+
+import asyncio
+import random
+
+from app.services._places_catalog import PlaceCatalog
+
+
+def _catalog(rows, cell_degrees=0.02):
+    fetched = []
+
+    async def fetch(watermark):
+        fetched.append(watermark)
+        return rows
+
+    catalog = PlaceCatalog(fetch, cell_degrees, 60, 3600)
+    asyncio.run(catalog.ensure_fresh())
+    return catalog, fetched
+
+
+def test_watermark_moves_past_rows_without_updated_at():
+    catalog, _ = _catalog([
+        {"id": "a", "lat": 1, "lng": 1, "updated_at": "2025-01-02T00:00:00+00:00"},
+        {"id": "c", "lat": 1, "lng": 1, "updated_at": None},
+        {"id": "b", "lat": 1, "lng": 1, "updated_at": None},
+    ])
+    assert catalog._watermark == (None, "c")
+
+    catalog.upsert({"id": "d", "lat": 1, "lng": 1, "updated_at": "2025-01-03T00:00:00+00:00"})
+    assert catalog._watermark == (None, "c")
+
+
+def test_nearest_and_near_match_a_full_scan():
+    rng = random.Random(7)
+    rows = [
+        {"id": f"city-{i}", "lat": 48.85 + rng.gauss(0, 0.05), "lng": 2.35 + rng.gauss(0, 0.05)}
+        for i in range(500)
+    ] + [
+        {"id": f"far-{i}", "lat": rng.uniform(-80, 80), "lng": rng.uniform(-180, 180)}
+        for i in range(200)
+    ] + [
+        {"id": "east", "lat": 0.0, "lng": 179.99},
+        {"id": "west", "lat": 0.0, "lng": -179.99},
+    ]
+    catalog, _ = _catalog(rows)
+    slots = range(len(catalog))
+
+    for lat, lng in [(48.86, 2.34), (0.0, -140.0), (0.0, 180.0), (89.0, 0.0)]:
+        distances = catalog.distances_km(lat, lng, slots)
+        expected = sorted(round(distance, 3) for distance in distances)
+
+        found = catalog.nearest(lat, lng, 5)
+        assert [place["distance_km"] for place in found] == expected[:5]
+
+        within = [d for d in expected if d <= 500]
+        assert [p["distance_km"] for p in catalog.near(lat, lng, 500, 10_000)] == within
+
+    assert catalog.nearest(0.0, -179.995, 2)[0]["id"] == "west"
+
+
+def test_waiting_refresh_survives_a_closing_loop():
+    rows = [{"id": "a", "lat": 1, "lng": 1, "updated_at": "2025-01-01T00:00:00+00:00"}]
+    catalog, fetched = _catalog(rows)
+    catalog.refresh_seconds = 0
+
+    rows[:] = [{"id": "b", "lat": 2, "lng": 2, "updated_at": "2025-01-02T00:00:00+00:00"}]
+    asyncio.run(catalog.ensure_fresh(wait=True))
+
+    assert fetched == [None, ("2025-01-01T00:00:00+00:00", "a")]
+    assert sorted(catalog.ids(10)) == ["a", "b"]
@@ -0,0 +1,41 @@
+"""
+Search fallback without search_trips
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.configs import config
+from app.services import search
+
+
+def test_fallback_ranks_items_beyond_the_first_page(monkeypatch):
+    monkeypatch.setattr(config, "PAGE_SIZE_MAX", 100)
+    items = [
+        {"id": f"item-{i:04d}", "trip_id": "trip", "name": "Dinner", "notes": "near the ryokan", "link": None}
+        for i in range(250)
+    ]
+    items[-1] = dict(items[-1], name="Ryokan Sawaya")
+
+    async def get_trips(user_id):
+        return [{"id": "trip", "title": "Kyoto", "notes": None}]
+
+    pages = []
+
+    async def execute(query):
+        assert query.params["trip.owner_user_id"] == "eq.user"
+        assert "trip_id" not in query.params
+        assert "trip!inner(owner_user_id)" in query.params["select"]
+        after = query.params.get("id")
+        rows = [item for item in items if not after or item["id"] > after[len("gt."):]]
+        pages.append(after)
+        return SimpleNamespace(data=rows[:int(query.params["limit"])])
+
+    monkeypatch.setattr(search.trips, "get_trips", get_trips)
+    monkeypatch.setattr(search, "execute", execute)
+
+    results = asyncio.run(search._search_unindexed("user", ["ryokan"], 3))
+
+    assert pages == [None, "gt.item-0099", "gt.item-0199", "gt.item-0249"]
+    assert [hit["id"] for hit in results] == ["item-0249", "item-0000", "item-0001"]
+    assert results[0]["rank"] > results[1]["rank"]
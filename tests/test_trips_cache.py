@@ -0,0 +1,126 @@
+"""
+Trip cache invalidation
+"""
+
+import time
+import asyncio
+
+from app.utils.cache import MemoryBackend
+from app.services._trips_cache import _TripCache
+
+
+def _cache():
+    return _TripCache(MemoryBackend(max_entries=16, ttl=60), ttl=60)
+
+
+def test_invalidation_during_a_load_is_not_undone():
+    cache = _cache()
+    key = cache.trip_key("t")
+
+    async def run():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def stale_load():
+            started.set()
+            await release.wait()
+            return {"id": "t", "title": "old"}
+
+        load = asyncio.create_task(cache.get_or_load(key, stale_load))
+        await started.wait()
+        await cache.invalidate(key)
+        release.set()
+        assert (await load)["title"] == "old"
+
+        async def fresh_load():
+            return {"id": "t", "title": "new"}
+
+        return await cache.get_or_load(key, fresh_load)
+
+    assert asyncio.run(run())["title"] == "new"
+    assert not cache._generations and not cache._loading
+
+
+def test_generations_are_not_kept_without_loads():
+    cache = _cache()
+
+    async def run():
+        await cache.invalidate(*(cache.trip_key(str(i)) for i in range(100)))
+        await cache.get_or_load(cache.user_key("u"), lambda: asyncio.sleep(0, []))
+
+    asyncio.run(run())
+    assert not cache._generations and not cache._loading
+
+
+def test_a_failed_load_releases_the_key():
+    cache = _cache()
+
+    async def failing():
+        raise RuntimeError("down")
+
+    async def run():
+        try:
+            await cache.get_or_load(cache.trip_key("t"), failing)
+        except RuntimeError:
+            pass
+
+    asyncio.run(run())
+    assert not cache._loading
+
+
+def test_pages_are_cached_until_the_user_is_invalidated():
+    cache = _cache()
+    loads = []
+
+    def loader(page):
+        async def load():
+            loads.append(page)
+            return {"items": [page], "next_cursor": None}
+        return load
+
+    async def run():
+        first = await cache.get_or_load_page("u", (2, None), loader("a"))
+        again = await cache.get_or_load_page("u", (2, None), loader("b"))
+        other = await cache.get_or_load_page("u", (2, "c1"), loader("c"))
+        await cache.invalidate(*cache.user_keys("u"))
+        fresh = await cache.get_or_load_page("u", (2, None), loader("d"))
+        return first, again, other, fresh
+
+    first, again, other, fresh = asyncio.run(run())
+    assert first is again and first["items"] == ["a"]
+    assert other["items"] == ["c"] and fresh["items"] == ["d"]
+    assert loads == ["a", "c", "d"]
+
+
+def test_pages_expire_on_their_own_load_time(monkeypatch):
+    cache = _cache()
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    async def load():
+        return {"items": [now[0]], "next_cursor": None}
+
+    async def run():
+        await cache.get_or_load_page("u", (2, None), load)
+        now[0] += 59
+        # Adding another page must not extend the first one
+        await cache.get_or_load_page("u", (2, "c1"), load)
+        now[0] += 2
+        return await cache.get_or_load_page("u", (2, None), load)
+
+    assert asyncio.run(run())["items"] == [1061.0]
+
+
+def test_pages_per_user_are_bounded():
+    cache = _cache()
+
+    async def load():
+        return {"items": [], "next_cursor": None}
+
+    async def run():
+        for i in range(cache.MAX_PAGES_PER_USER + 5):
+            await cache.get_or_load_page("u", (2, str(i)), load)
+        return await cache._backend.get(cache.pages_key("u"))
+
+    pages = asyncio.run(run())
+    assert len(pages) == cache.MAX_PAGES_PER_USER
+    assert (2, "0") not in pages
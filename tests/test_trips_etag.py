@@ -0,0 +1,67 @@
+"""
+Trip ETags and conditional GETs
+"""
+
+import asyncio
+
+from starlette.requests import Request
+
+from app.routers import trips as trips_router
+from app.services import trips
+
+
+TRIP = {
+    "id": "t1", "owner_user_id": "u1", "name": "Lisbon",
+    "updated_at": "2026-10-01T00:00:00+00:00",
+}
+
+
+def _request(if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers})
+
+
+def _get(monkeypatch, request: Request, fields: str = None):
+    fetched = []
+
+    async def get_owned_trip(trip_id, user_id):
+        return TRIP if user_id == TRIP["owner_user_id"] else None
+
+    async def get_trip(trip_id, fields=None):
+        fetched.append(fields)
+        return {key: TRIP[key] for key in fields} if fields else TRIP
+
+    monkeypatch.setattr(trips, "get_owned_trip", get_owned_trip)
+    monkeypatch.setattr(trips, "get_trip", get_trip)
+    response = asyncio.run(trips_router.get_trip(
+        id="t1", request=request, fields=fields, include=None, user_id="u1"
+    ))
+    return response, fetched
+
+
+def test_get_trip_tags_the_response(monkeypatch):
+    response, fetched = _get(monkeypatch, _request())
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert fetched == [None]
+
+
+def test_matching_if_none_match_is_answered_before_the_fetch(monkeypatch):
+    etag = _get(monkeypatch, _request())[0].headers["etag"]
+
+    response, fetched = _get(monkeypatch, _request(etag))
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert fetched == []
+
+
+def test_etag_differs_per_field_projection(monkeypatch):
+    etag = _get(monkeypatch, _request())[0].headers["etag"]
+
+    response, fetched = _get(monkeypatch, _request(etag), fields="id,name")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert fetched == [["id", "name"]]